@@ -6,6 +6,7 @@ It is also used to define hooks that can be used to modify the behavior of pytes
 
 import logging
 import os
+import re
 from pathlib import Path
 import typing
 from collections.abc import MutableMapping
@@ -15,12 +16,17 @@ import pytest
 from dotenv import load_dotenv
 from _pytest.python import Function
 from pytest_html.report_data import ReportData
-from playwright.sync_api import Page, sync_playwright
+from playwright.sync_api import Browser, Error as PlaywrightError, Page
+from psycopg_pool import ConnectionPool
 
 from pages.main_menu import MainMenuPage
 from pages.ni_ri_sp_batch_page import NiRiSpBatchPage
 
+from utils.context_pool import ContextPool
 from utils.db_util import DbUtil
+from utils.environment_info import EnvironmentInfoCache
+from utils.har_replay import HarReplay
+from utils.resource_blocker import ResourceBlocker
 from utils.db_restore import DbRestore
 from pages.rlp_cohort_list_page import CohortListPage
 from pages.rlp_location_list_page import ScreeningLocationListPage
@@ -31,6 +37,19 @@ logger = logging.getLogger(__name__)
 LOCAL_ENV_PATH = Path(os.getcwd()) / "local.env"
 
 
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addini(
+        "resource_blocking",
+        "The resource blocking profile for UI tests (off, assets or strict), overridden by the resource_blocking marker",
+        default="off",
+    )
+    parser.addini(
+        "har_mode",
+        "Whether UI tests record their requests to HAR files, or replay them from HAR files (off, record or replay)",
+        default="off",
+    )
+
+
 @pytest.fixture(autouse=True, scope="session")
 def import_local_env_file() -> None:
     """
@@ -50,6 +69,131 @@ def user_tools() -> UserTools:
     return UserTools()
 
 
+@pytest.fixture(autouse=True)
+def resource_blocker(
+    request: pytest.FixtureRequest,
+) -> typing.Generator[ResourceBlocker | None, None, None]:
+    """
+    Applies the resource blocking profile (from the resource_blocking marker, or from pytest.ini) to the test's browser
+    context, and reports the requests and bytes saved. Does nothing for tests that do not use a browser.
+    """
+    marker = request.node.get_closest_marker("resource_blocking")
+    profile = marker.args[0] if marker else request.config.getini("resource_blocking")
+    if profile == "off":
+        yield None
+        return
+
+    blocker = ResourceBlocker(profile)
+    if "context" in request.fixturenames:
+        blocker.attach(request.getfixturevalue("context"))
+    yield blocker
+    logger.info(f"Resource blocking ({profile}): {blocker.summary()}")
+    request.node.user_properties.append(("resource_blocking", dict(blocker.stats)))
+
+
+@pytest.fixture(autouse=True)
+def har_replay(
+    request: pytest.FixtureRequest, resource_blocker: ResourceBlocker | None
+) -> typing.Generator[HarReplay | None, None, None]:
+    """
+    Records the test's requests to a HAR file, or replays them from one, depending on the har_mode ini option.
+    Depends on resource_blocker so its routes are added afterwards, and so handle requests first.
+    Does nothing for tests that do not use a browser.
+    """
+    mode = request.config.getini("har_mode")
+    if mode == "off" or not {"context", "leased_page"} & set(request.fixturenames):
+        yield None
+        return
+
+    har = HarReplay.for_test(mode, request.node.nodeid)
+    if "context" in request.fixturenames:
+        har.attach(request.getfixturevalue("context"))
+    yield har
+    har.save()
+    logger.info(f"HAR {mode}: {har.summary()}")
+    request.node.user_properties.append(("har", dict(har.stats)))
+
+
+@pytest.fixture(scope="session")
+def context_pool(
+    browser: Browser, browser_context_args: dict
+) -> typing.Generator[ContextPool, None, None]:
+    """
+    Logged in browser contexts kept warm for each user, shared by every test in the session (or xdist worker).
+    """
+    pool = ContextPool(browser, **browser_context_args)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def leased_page(
+    context_pool: ContextPool,
+    resource_blocker: ResourceBlocker | None,
+    har_replay: HarReplay | None,
+    output_path: str,
+    request: pytest.FixtureRequest,
+) -> typing.Generator[typing.Callable[[str], Page], None, None]:
+    """
+    Leases a page that is already logged in as the user provided from the context pool, e.g. leased_page("BSO User - BS1").
+    Leasing the same user again within a test returns the same page.
+    Leased contexts are traced and screenshotted as set by --tracing and --screenshot, in the same way as the page fixture.
+    Contexts are reset and returned to the pool at teardown, or closed if the test failed.
+    """
+    pages: dict[str, Page] = {}
+    tracing = request.config.getoption("--tracing")
+
+    def lease(username: str) -> Page:
+        if username not in pages:
+            pages[username] = context_pool.lease(username)
+            if resource_blocker is not None:
+                # Routes are removed when a context is reset, so the profile is applied on every lease
+                resource_blocker.attach(pages[username].context)
+            if har_replay is not None:
+                har_replay.attach(pages[username].context)
+            if tracing != "off":
+                pages[username].context.tracing.start(
+                    title=request.node.nodeid, screenshots=True, snapshots=True, sources=True
+                )
+        return pages[username]
+
+    yield lease
+    failed = any(
+        getattr(getattr(request.node, f"rep_{when}", None), "failed", False)
+        for when in ("setup", "call")
+    )
+    for username, page in pages.items():
+        save_leased_page_artifacts(page, username, Path(output_path), request.config, failed)
+        context_pool.release(page, discard=failed)
+
+
+def save_leased_page_artifacts(
+    page: Page, username: str, output_path: Path, config: pytest.Config, failed: bool
+) -> None:
+    """
+    Stops tracing the leased page's context and takes a screenshot, keeping them in the test's output folder
+    according to the --tracing and --screenshot options (as pytest-playwright does for the page fixture).
+    """
+    name = re.sub(r"[^a-z0-9]+", "-", username.lower()).strip("-")
+    screenshot = config.getoption("--screenshot")
+    if screenshot == "on" or (failed and screenshot == "only-on-failure"):
+        status = "failed" if failed else "finished"
+        try:
+            page.screenshot(
+                path=output_path / f"test-{status}-{name}.png",
+                timeout=5000,
+                full_page=config.getoption("--full-page-screenshot"),
+            )
+        except PlaywrightError as e:
+            logger.warning(f"Unable to take a screenshot of the page leased for [{username}]: {e}")
+
+    tracing = config.getoption("--tracing")
+    if tracing == "on" or (failed and tracing == "retain-on-failure"):
+        page.context.tracing.stop(path=output_path / f"trace-{name}.zip")
+    elif tracing != "off":
+        page.context.tracing.stop()
+
+
 @pytest.fixture
 def main_menu(page: Page) -> MainMenuPage:
     return MainMenuPage(page)
@@ -75,15 +219,46 @@ def ni_ri_sp_batch_page(page: Page) -> NiRiSpBatchPage:
     return NiRiSpBatchPage(page)
 
 
-## Fixture for ci-infra
+## Fixtures for ci-infra
+@pytest.fixture(scope="session")
+def db_pool() -> typing.Generator[ConnectionPool, None, None]:
+    """
+    A connection pool for the ci-infra database, shared by every test in the session (or xdist worker).
+    The pool size can be set using CI_INFRA_DB_POOL_MIN_SIZE and CI_INFRA_DB_POOL_MAX_SIZE.
+    """
+    pool = DbUtil.create_pool(
+        min_size=int(os.getenv("CI_INFRA_DB_POOL_MIN_SIZE", "1")),
+        max_size=int(os.getenv("CI_INFRA_DB_POOL_MAX_SIZE", "4")),
+        host=os.getenv("CI_INFRA_DB_HOST"),
+        port=os.getenv("CI_INFRA_DB_PORT"),
+        dbname=os.getenv("CI_INFRA_DBNAME"),
+        user=os.getenv("CI_INFRA_DB_USER"),
+        password=os.getenv("CI_INFRA_DB_PASSWORD"),
+    )
+    yield pool
+    pool.close()
+
+
 @pytest.fixture
-def db_util():
-    db = DbUtil(host = os.getenv("CI_INFRA_DB_HOST"),
-                port=os.getenv("CI_INFRA_DB_PORT"),
-                dbname=os.getenv("CI_INFRA_DBNAME"),
-                user=os.getenv("CI_INFRA_DB_USER"),
-                password=os.getenv("CI_INFRA_DB_PASSWORD"))
-    return db
+def db_util(db_pool: ConnectionPool) -> typing.Generator[DbUtil, None, None]:
+    """Borrows a connection from the pool for the test, and returns it to the pool at teardown."""
+    db = DbUtil(pool=db_pool)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def isolated_db_util(db_pool: ConnectionPool) -> typing.Generator[DbUtil, None, None]:
+    """
+    Borrows a connection from the pool for the test, with everything done through it rolled back at teardown.
+    Changes are not visible to the application under test, so only use this for tests that change data solely through DbUtil.
+    """
+    db = DbUtil(pool=db_pool)
+    db.begin_isolation()
+    yield db
+    db.end_isolation()
+    db.close()
+
 
 # This variable is used for JSON reporting only
 ENVIRONMENT_DATA = None
@@ -105,28 +280,12 @@ def environment_info(metadata: object, base_url: str) -> None:
 
     if base_url is not None:
         try:  # Try to get metadata first using a playwright object, but don't fail if it can't retrieve it
-            with sync_playwright() as playwright:
-                browser = playwright.chromium.launch(headless=True)
-                context = browser.new_context(base_url=base_url)
-                result = context.request.get(
-                    "/bss/info",
-                    headers={
-                        "Host": f"{base_url}".replace("https://", "").replace("/", ""),
-                        "Accept": "*/*",
-                        "Accept-Encoding": "gzip, deflate, br",
-                    },
-                    ignore_https_errors=True,
-                )
-                metadata[APPLICATION_DETAILS] = filter_result(
-                    result.json(), APPLICATION_DETAILS
-                )
-                metadata[DATABASE_DETAILS] = filter_result(
-                    result.json(), DATABASE_DETAILS
-                )
-                global ENVIRONMENT_DATA
-                ENVIRONMENT_DATA = result.json()
-                context.close()
-                browser.close()
+            # No browser is needed, and the result is cached briefly so xdist workers and reruns share it
+            info = EnvironmentInfoCache().get(base_url)
+            metadata[APPLICATION_DETAILS] = filter_result(info, APPLICATION_DETAILS)
+            metadata[DATABASE_DETAILS] = filter_result(info, DATABASE_DETAILS)
+            global ENVIRONMENT_DATA
+            ENVIRONMENT_DATA = info
 
         except Exception as ex:
             logger.warning("Not been able to capture environment data for this run.")
@@ -173,29 +332,30 @@ def pytest_runtest_makereport(item: Function) -> typing.Generator[None, None, No
     if outcome is not None:
         report = outcome.get_result()
         report.description = str(item.function.__doc__)
+        # Kept against the test so fixtures can check the outcome at teardown
+        setattr(item, f"rep_{report.when}", report)
 
 
 @pytest.fixture(scope="function", autouse=False)
-def check_and_create_unit_test_data(
-    page: Page, rlp_cohort_list_page: CohortListPage, context
-):
-    """Create unit test data for User2 BS2. Fixture to log in and ensure specific unit test data is created."""
-    UserTools().login_and_navigate(page, "Read Only BSO User - BS2", "Round Planning", "Screening Unit List")
+def check_and_create_unit_test_data(leased_page: typing.Callable[[str], Page]):
+    """Create unit test data for User2 BS2. Fixture to ensure specific unit test data is created."""
+    # Uses a pooled context, which is already logged in, so the test's own page is left untouched
+    page = leased_page("Read Only BSO User - BS2")
+    page.goto("/bss")
+    MainMenuPage(page).select_menu_option("Round Planning", "Screening Unit List")
     unit_names = ["Batman", "Captain"]
     for unit_name in unit_names:
-        rlp_cohort_list_page.create_unit_if_not_exists(unit_name)
-    context.clear_cookies()
+        CohortListPage(page).create_unit_if_not_exists(unit_name)
 
 @pytest.fixture(scope="function", autouse=False)
-def check_and_create_location_test_data_for_outcode(
-    page: Page, rlp_cohort_list_page: CohortListPage, context
-):
-    """Generate location test data for User2 BS2. Fixture to log in and ensure specific location test data is created."""
-    UserTools().login_and_navigate(page, "Read Only BSO User - BS2", "Round Planning", "Screening Location List")
+def check_and_create_location_test_data_for_outcode(leased_page: typing.Callable[[str], Page]):
+    """Generate location test data for User2 BS2. Fixture to ensure specific location test data is created."""
+    page = leased_page("Read Only BSO User - BS2")
+    page.goto("/bss")
+    MainMenuPage(page).select_menu_option("Round Planning", "Screening Location List")
     locations = [
         "Aldi - Caldecott County Retail Park",
         "Poundland Car Park - Alberta Retail Park",
     ]
     for location in locations:
         ScreeningLocationListPage(page).create_location_if_not_exists(location)
-    context.clear_cookies()
@@ -1,5 +1,25 @@
 import logging
-from playwright.sync_api import Page, expect
+import time
+from collections.abc import Callable
+from re import Pattern
+from playwright.sync_api import Locator, Page, Response, expect
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from utils.table_utils import TableUtils
+
+WAIT_TIMEOUT = 10000
+
+# True once no DataTables processing indicator is visible and no table is showing a loading message
+SPINNER_GONE_SCRIPT = """
+() => {
+    const processing = Array.from(document.querySelectorAll(".dataTables_processing"));
+    if (processing.some(element => element.offsetParent !== null)) {
+        return false;
+    }
+    return Array.from(document.querySelectorAll("table")).every(
+        table => !table.innerText.includes("Waiting for typing to finish...") && !table.innerText.includes("Searching...")
+    );
+}
+"""
 
 
 class BasePage:
@@ -26,3 +46,118 @@ class BasePage:
 
     def logout(self) -> None:
         self.page.get_by_role("link", name="Logout").click()
+
+    # Waits
+    # These replace fixed wait_for_timeout() calls. Each logs how long it waited, and fails the test
+    # (raising a Playwright TimeoutError) if the condition is not met within the timeout.
+
+    def wait_for_response(
+        self,
+        url_or_predicate: str | Pattern[str] | Callable[[Response], bool],
+        action: Callable[[], None],
+        timeout: float = WAIT_TIMEOUT,
+        description: str | None = None,
+    ) -> None:
+        """
+        Performs the action provided and waits for a matching response to be received.
+
+        Args:
+            url_or_predicate (str | Pattern[str] | Callable[[Response], bool]): The URL glob or regex the response
+                should match (e.g. "**/bss/report/ceasing/search**"), or a function returning True for the response.
+            action (Callable[[], None]): The action that triggers the request.
+            timeout (float): The maximum time to wait, in milliseconds.
+            description (str | None): What is being waited for, for the log (defaults to the URL glob or regex).
+
+        Raises:
+            TimeoutError: If no matching response is received within the timeout.
+        """
+        if description is None:
+            description = f"response matching {getattr(url_or_predicate, 'pattern', url_or_predicate)}"
+        start_time = time.perf_counter()
+        try:
+            with self.page.expect_response(url_or_predicate, timeout=timeout):
+                action()
+        except PlaywrightTimeoutError:
+            self._log_wait(description, start_time, timed_out=True)
+            raise
+        self._log_wait(description, start_time)
+
+    def wait_for_table_redraw(
+        self, table_locator: str, action: Callable[[], None], timeout: float = WAIT_TIMEOUT
+    ) -> None:
+        """
+        Performs the action provided and waits for the DataTables table to redraw.
+
+        Args:
+            table_locator (str): The locator value to use to find the table.
+            action (Callable[[], None]): The action that causes the table to redraw (e.g. filtering or sorting).
+            timeout (float): The maximum time to wait, in milliseconds.
+
+        Raises:
+            TimeoutError: If the table is not redrawn within the timeout.
+        """
+        start_time = time.perf_counter()
+        try:
+            TableUtils(self.page, table_locator).perform_and_wait_for_redraw(action, timeout)
+        except PlaywrightTimeoutError:
+            self._log_wait(f"{table_locator} redraw", start_time, timed_out=True)
+            raise
+        self._log_wait(f"{table_locator} redraw", start_time)
+
+    def wait_for_select_options(
+        self, select: Locator, min_options: int = 2, timeout: float = WAIT_TIMEOUT
+    ) -> None:
+        """
+        Waits for a dropdown to have loaded its options.
+
+        Args:
+            select (Locator): The select element to check.
+            min_options (int): The number of options to wait for (defaults to 2, so at least one option beyond the empty one).
+            timeout (float): The maximum time to wait, in milliseconds.
+
+        Raises:
+            TimeoutError: If the options have not loaded within the timeout.
+        """
+        start_time = time.perf_counter()
+        try:
+            select.locator("option").nth(max(min_options, 1) - 1).wait_for(
+                state="attached", timeout=timeout
+            )
+        except PlaywrightTimeoutError:
+            self._log_wait("select options to load", start_time, timed_out=True)
+            raise
+        self._log_wait("select options to load", start_time)
+
+    def wait_for_spinner_gone(self, timeout: float = WAIT_TIMEOUT) -> None:
+        """
+        Waits until no table on the page is processing or showing a "Waiting for typing to finish..." / "Searching..." message.
+
+        Args:
+            timeout (float): The maximum time to wait, in milliseconds.
+
+        Raises:
+            TimeoutError: If the tables are still loading after the timeout.
+        """
+        start_time = time.perf_counter()
+        try:
+            self.page.wait_for_function(SPINNER_GONE_SCRIPT, timeout=timeout)
+        except PlaywrightTimeoutError:
+            self._log_wait("tables to finish loading", start_time, timed_out=True)
+            raise
+        self._log_wait("tables to finish loading", start_time)
+
+    @staticmethod
+    def _log_wait(description: str, start_time: float, timed_out: bool = False) -> None:
+        """
+        Logs how long a wait took.
+
+        Args:
+            description (str): A description of what was being waited for.
+            start_time (float): The time.perf_counter() value from when the wait started.
+            timed_out (bool): True if the wait timed out before the condition was met.
+        """
+        elapsed = time.perf_counter() - start_time
+        if timed_out:
+            logging.error(f"Timed out after {elapsed:.2f}s waiting for {description}")
+        else:
+            logging.info(f"Waited {elapsed:.2f}s for {description}")
@@ -1,5 +1,4 @@
-import logging
-from playwright.sync_api import Page, expect
+from playwright.sync_api import Page
 from pages.report_page import ReportPage
 
 
@@ -65,25 +64,35 @@ class CeasedUnceasedPage(ReportPage):
         self.page.get_by_role("button", name=self.SEARCH_BUTTON).click()
 
     def set_done_drop_down(self, value: str) -> None:
-        self.page.locator(self.ACTION_LIST).select_option(value)
-        self.page.wait_for_timeout(5000)
+        self.wait_for_response(
+            self.API_REQUEST,
+            lambda: self.page.locator(self.ACTION_LIST).select_option(value),
+        )
 
     def sort_date_added_to_BSO(self) -> None:
         self.page.locator(self.ACTION_LIST).select_option("")
-        self.page.get_by_label("Date Added To BSO: activate").click()
-        self.page.wait_for_timeout(5000)
+        self.wait_for_response(
+            self.API_REQUEST, lambda: self.page.get_by_label("Date Added To BSO: activate").click()
+        )
+        self.wait_for_spinner_gone()
 
     def sort_born(self) -> None:
         self.page.locator(self.ACTION_LIST).select_option("")
-        self.page.get_by_label("Born: activate to sort column").click()
-        self.page.wait_for_timeout(5000)
+        self.wait_for_response(
+            self.API_REQUEST, lambda: self.page.get_by_label("Born: activate to sort column").click()
+        )
+        self.wait_for_spinner_gone()
 
     def sort_date_ceased(self) -> None:
         self.page.locator(self.ACTION_LIST).select_option("")
-        self.page.get_by_label("Date Ceased: activate to sort").click()
-        self.page.wait_for_timeout(5000)
+        self.wait_for_response(
+            self.API_REQUEST, lambda: self.page.get_by_label("Date Ceased: activate to sort").click()
+        )
+        self.wait_for_spinner_gone()
 
     def sort_date_unceased(self) -> None:
         self.page.locator(self.ACTION_LIST).select_option("")
-        self.page.get_by_label("Date Unceased: activate to").click()
-        self.page.wait_for_timeout(5000)
+        self.wait_for_response(
+            self.API_REQUEST, lambda: self.page.get_by_label("Date Unceased: activate to").click()
+        )
+        self.wait_for_spinner_gone()
@@ -11,8 +11,9 @@ class SSPIUpdateWarningsBasePage(ReportPage):
         self.API_REQUEST = ""  # This is set by specific action or information page
 
     def set_done_drop_down(self, value: str) -> None:
-        self.action_list.select_option(value)
-        self.page.wait_for_timeout(5000)
+        self.wait_for_response(
+            self.API_REQUEST, lambda: self.action_list.select_option(value)
+        )
 
     def enter_nhs_number(self, selected_nhs: str) -> None:
         self.page.locator("#nhsNumberFilter").get_by_role("textbox").fill(selected_nhs)
@@ -32,8 +33,11 @@ class SSPIUpdateWarningsBasePage(ReportPage):
 
     def sort_received(self) -> None:
         self.action_list.select_option("")
-        self.page.get_by_label("Received: activate to sort").click()
-        self.page.wait_for_timeout(5000)
+        self.wait_for_response(
+            self.API_REQUEST,
+            lambda: self.page.get_by_label("Received: activate to sort").click(),
+        )
+        self.wait_for_spinner_gone()
 
     def table_filtered_by_age(self, selected_age: str) -> None:
         self.page.locator("#ageTodayList").select_option(selected_age)
@@ -49,8 +53,11 @@ class SSPIUpdateWarningsBasePage(ReportPage):
 
     def sort_add_info(self) -> None:
         self.action_list.select_option("")
-        self.page.get_by_label("Additional Info: activate to").click()
-        self.page.wait_for_timeout(5000)
+        self.wait_for_response(
+            self.API_REQUEST,
+            lambda: self.page.get_by_label("Additional Info: activate to").click(),
+        )
+        self.wait_for_spinner_gone()
 
     def await_api_response(self) -> None:
         """
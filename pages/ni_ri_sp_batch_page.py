@@ -1,15 +1,17 @@
 from __future__ import annotations
 from datetime import datetime, timedelta
-from playwright.sync_api import Page, expect
+from playwright.sync_api import Page, Response, expect
 import logging
 from utils.table_utils import TableUtils
 from utils.screenshot_tool import ScreenshotTool
+from pages.base_page import BasePage
 
 
-class NiRiSpBatchPage:
+class NiRiSpBatchPage(BasePage):
+    BATCH_TABLE = "table.dataTable"
 
     def __init__(self, page: Page) -> None:
-
+        BasePage.__init__(self, page)
         self.page = page
         self.bso_batch_id_input = page.locator("#bsoBatchId")
         self.selection_date_input = page.locator("#rispSelectionDate")
@@ -171,8 +173,14 @@ class NiRiSpBatchPage:
         self.month_of_birth_to_input.fill(month_of_birth_to)
 
     def click_count_button(self) -> NiRiSpBatchPage:
-        self.count_button.click()
-        self.page.wait_for_timeout(3000)
+        self.wait_for_response(
+            self._is_form_post, self.count_button.click, description="the count request"
+        )
+
+    @staticmethod
+    def _is_form_post(response: Response) -> bool:
+        # The count and select buttons send the batch form to the server, whereas the page's other requests are Gets
+        return response.request.method == "POST"
 
     def assert_text_visible(self, text: str) -> NiRiSpBatchPage:
         locator = self.page.locator(f"p:has-text('{text}')")
@@ -190,40 +198,26 @@ class NiRiSpBatchPage:
         self, bso_batch_id: str
     ) -> NiRiSpBatchPage:
         self.bso_batch_id_filter_text_box.fill(bso_batch_id)
-        self.page.wait_for_timeout(3000)
-        first_row_second_cell_value = self.page.locator(
-            "//tbody/tr[1]/td[2]"
-        ).text_content()
-        assert bso_batch_id == first_row_second_cell_value
+        expect(self.page.locator("//tbody/tr[1]/td[2]")).to_have_text(bso_batch_id)
 
     def search_by_batch_title(self, batch_title: str) -> NiRiSpBatchPage:
         self.page.locator("#batchTitleFilter input[type='text']").fill(batch_title)
-        self.page.wait_for_timeout(2000)
-        filtered_cell_value = self.page.locator("//tbody/tr[1]/td[11]").text_content()
-        assert batch_title == filtered_cell_value
+        expect(self.page.locator("//tbody/tr[1]/td[11]")).to_have_text(batch_title)
 
     def search_by_bso_batch_id_and_batch_title(
         self, bso_batch_id: str, batch_title: str
     ) -> NiRiSpBatchPage:
         self.bso_batch_id_filter_text_box.fill(bso_batch_id)
         self.search_by_batch_title(batch_title)
-        self.page.wait_for_timeout(3000)
-        first_row_second_cell_value = self.page.locator(
-            "//tbody/tr[1]/td[2]"
-        ).text_content()
-        assert bso_batch_id == first_row_second_cell_value
+        expect(self.page.locator("//tbody/tr[1]/td[2]")).to_have_text(bso_batch_id)
 
     def assert_select_date_cell_value_is_not_null(
         self, cell_value: str
     ) -> NiRiSpBatchPage:
-        self.page.wait_for_timeout(2000)
-        select_date_cell_value = self.page.locator("//tbody/tr[1]/td[6]").text_content()
-        assert select_date_cell_value.strip() != cell_value
+        expect(self.page.locator("//tbody/tr[1]/td[6]")).not_to_have_text(cell_value)
 
     def assert_select_date_cell_value(self, cell_value: str) -> NiRiSpBatchPage:
-        self.page.wait_for_timeout(2000)
-        select_date_cell_value = self.page.locator("//tbody/tr[1]/td[6]").text_content()
-        assert select_date_cell_value == cell_value
+        expect(self.page.locator("//tbody/tr[1]/td[6]")).to_have_text(cell_value)
 
     def select_ri_sp_yob_from_drop_down(self) -> NiRiSpBatchPage:
         self.page.locator("#batchTypeList").select_option(label="RISP by Year of Birth")
@@ -238,32 +232,25 @@ class NiRiSpBatchPage:
         select_btn = self.page.locator("#selectButton")
         confirm_btn_pop_up = self.page.locator("#confirmButtonInSelectPopupText")
         select_btn.click()
-        confirm_btn_pop_up.click()
-        self.page.wait_for_timeout(3000)
+        self.wait_for_response(
+            self._is_form_post, confirm_btn_pop_up.click, description="the select request"
+        )
 
     def assert_selected_cell_value(self, cell_value: str) -> NiRiSpBatchPage:
-        self.page.wait_for_timeout(2000)
-        selected_cell_value = self.page.locator("//tbody/tr[1]/td[7]").text_content()
-        assert selected_cell_value == cell_value
+        expect(self.page.locator("//tbody/tr[1]/td[7]")).to_have_text(cell_value)
 
     def assert_selected_cell_value_is_not_null(
         self, cell_value: str
     ) -> NiRiSpBatchPage:
-        self.page.wait_for_timeout(2000)
-        selected_cell_value = self.page.locator("//tbody/tr[1]/td[7]").text_content()
-        assert selected_cell_value.strip() != cell_value
+        expect(self.page.locator("//tbody/tr[1]/td[7]")).not_to_have_text(cell_value)
 
     def assert_rejected_cell_value(self, cell_value: str) -> NiRiSpBatchPage:
-        self.page.wait_for_timeout(2000)
-        rejected_cell_value = self.page.locator("//tbody/tr[1]/td[8]").text_content()
-        assert rejected_cell_value == cell_value
+        expect(self.page.locator("//tbody/tr[1]/td[8]")).to_have_text(cell_value)
 
     def assert_rejected_cell_value_is_not_null(
         self, cell_value: str
     ) -> NiRiSpBatchPage:
-        self.page.wait_for_timeout(2000)
-        rejected_cell_value = self.page.locator("//tbody/tr[1]/td[8]").text_content()
-        assert rejected_cell_value.strip() != cell_value
+        expect(self.page.locator("//tbody/tr[1]/td[8]")).not_to_have_text(cell_value)
 
     def validate_batch_id_error(self, batch_id: str, expected_error: str) -> None:
         self.enter_bso_batch_id(batch_id)
@@ -286,8 +273,9 @@ class NiRiSpBatchPage:
     def verify_table_sort(self, column_header, sort_type, table: TableUtils, column_index, ascending) -> None:
         sort_order = "ascending" if ascending else "descending"
         table.go_to_first_page()
-        self.page.click(f'//th[text()="{column_header}"]')
-        self.page.wait_for_timeout(2000)
+        table.perform_and_wait_for_redraw(
+            lambda: self.page.click(f'//th[text()="{column_header}"]')
+        )
         ScreenshotTool(self.page).take_screenshot(f"additional_testing_TC_5_{column_header}_{sort_order}")
         all_data = table.get_all_table_data(column_index)
         # Normalize values if column is "Batch Title"
@@ -327,10 +315,15 @@ class NiRiSpBatchPage:
 
     def click_on_search_btn_in_search_batches(self, bso_batch_id:str, batch_title:str) -> None:
         self.page.locator("#reportButton").click()
-        self.page.wait_for_timeout(1000)
-        self.page.locator("#batchIdFilter > input").fill(bso_batch_id)
-        self.page.locator("#batchTitleFilter > input").fill(batch_title)
-        self.page.wait_for_timeout(2000)
+        self.wait_for_spinner_gone()
+        self.wait_for_table_redraw(
+            self.BATCH_TABLE,
+            lambda: self.page.locator("#batchIdFilter > input").fill(bso_batch_id),
+        )
+        self.wait_for_table_redraw(
+            self.BATCH_TABLE,
+            lambda: self.page.locator("#batchTitleFilter > input").fill(batch_title),
+        )
 
     def assert_bso_batch_id(self, expected_id: str, should_exist: bool = True):
         # Locator for all rows in the BSO Batch ID column
@@ -2,13 +2,17 @@ from __future__ import annotations
 import re
 import playwright
 from playwright.sync_api import Page, expect
+from pages.base_page import BasePage
 
 
-class CohortListPage:
+class CohortListPage(BasePage):
     CANCEL_BUTTON = "a#cancelButton"
     ENTRIES_SHOWN = r"Showing (\d+) to (\d+) of (\d+) entries"
+    COHORT_TABLE = "#screeningCohortList"
+    UNIT_TABLE = "#screeningUnitList"
 
     def __init__(self, page: Page) -> None:
+        BasePage.__init__(self, page)
         self.page = page
 
         self.create_screening_cohort_by_gp_practice_btn = page.locator(
@@ -67,10 +71,17 @@ class CohortListPage:
 
     def click_create_screening_cohort_by_gp_practice_btn(self) -> CohortListPage:
         self.create_screening_cohort_by_gp_practice_btn.click()
+        expect(self.create_screening_cohort_save_btn).to_be_visible()
         return self
 
     def click_create_screening_cohort_by_outcode_btn(self) -> CohortListPage:
         self.create_screening_cohort_by_outcode_btn.click()
+        expect(self.save_cohort_by_outcode_btn).to_be_visible()
+        return self
+
+    def wait_for_cohort_list(self) -> CohortListPage:
+        expect(self.page.locator(self.COHORT_TABLE)).to_be_visible()
+        self.wait_for_spinner_gone()
         return self
 
     def enter_outcode_filter(self, out_code: str) -> CohortListPage:
@@ -79,6 +90,7 @@ class CohortListPage:
 
     def click_cancel_cohort_by_outcode_btn(self) -> CohortListPage:
         self.cancel_cohort_by_outcode_btn.click()
+        self.wait_for_cohort_list()
         return self
 
     def click_save_cohort_by_outcode_btn(self) -> CohortListPage:
@@ -90,7 +102,7 @@ class CohortListPage:
         return self
 
     def number_of_location_dropdown_count(self) -> CohortListPage:
-        self.page.wait_for_timeout(5000)
+        self.wait_for_select_options(self.default_screening_location_dropdown)
         return self.location_dropdown_count.count() - 1  # excluding empty option
 
     def number_of_unit_dropdown_count(self) -> CohortListPage:
@@ -176,6 +188,7 @@ class CohortListPage:
 
     def click_on_cancel_creating_screening_cohort(self) -> CohortListPage:
         self.cancel_creating_screening_cohort.click()
+        self.wait_for_cohort_list()
         return self
 
     def click_add_btn_gp_practices_to_include(self) -> CohortListPage:
@@ -219,7 +232,7 @@ class CohortListPage:
             "A00009"
         ).click_add_btn_gp_practices_to_include().click_done_btn_gp_practices_include_popup()
         self.click_create_screening_cohort_save_btn()
-        self.page.wait_for_timeout(3000)
+        self.wait_for_cohort_list()
         return self
 
     def create_cohort(self, cohort_name, location_name) -> CohortListPage:
@@ -234,7 +247,7 @@ class CohortListPage:
             "A00005"
         ).click_add_btn_gp_practices_to_include().click_done_btn_gp_practices_include_popup()
         self.click_create_screening_cohort_save_btn()
-        self.page.wait_for_timeout(3000)
+        self.wait_for_cohort_list()
         return self
 
     def create_cohort_without_gp(
@@ -248,7 +261,7 @@ class CohortListPage:
             location_name
         ).select_default_screening_unit_dropdown(unit_name)
         self.click_create_screening_cohort_save_btn()
-        self.page.wait_for_timeout(3000)
+        self.wait_for_cohort_list()
         return self
 
     def create_cohort_outcode_without_gp(
@@ -262,83 +275,91 @@ class CohortListPage:
             location_name
         ).select_default_screening_unit_dropdown(unit_name)
         self.click_save_cohort_by_outcode_btn()
-        self.page.wait_for_timeout(3000)
+        self.wait_for_cohort_list()
         return self
 
     def value_of_filtered_cohort_name(self):
-        filtered_value = self.filtered_cohort_name.text_content()
-        self.page.wait_for_timeout(4000)
-        return filtered_value
+        self.wait_for_spinner_gone()
+        return self.filtered_cohort_name.text_content()
 
     def value_of_filtered_attendance(self):
-        filtered_value = self.amend_attendance_rate_txtbox.input_value()
-        self.page.wait_for_timeout(4000)
-        return filtered_value
+        return self.amend_attendance_rate_txtbox.input_value()
 
     def click_done_btn_gp_practices_include_popup(self) -> CohortListPage:
         self.done_btn_gp_practices_include_popup.click()
         return self
 
     def enter_screening_cohort_name_filter(self, cohort_name: str) -> CohortListPage:
-        self.screening_cohort_name_filter.fill(cohort_name)
-        self.page.wait_for_timeout(4000)
+        self.wait_for_table_redraw(
+            self.COHORT_TABLE, lambda: self.screening_cohort_name_filter.fill(cohort_name)
+        )
         return self
 
     def enter_screening_location_filter(self, location_name: str) -> CohortListPage:
-        self.screening_location_filter.fill(location_name)
-        self.page.wait_for_timeout(3000)
+        self.wait_for_table_redraw(
+            self.COHORT_TABLE, lambda: self.screening_location_filter.fill(location_name)
+        )
         return self
 
     def enter_screening_unit_filter(self, unit_name: str) -> CohortListPage:
-        self.screening_unit_filter.fill(unit_name)
-        self.page.wait_for_timeout(3000)
+        self.wait_for_table_redraw(
+            self.COHORT_TABLE, lambda: self.screening_unit_filter.fill(unit_name)
+        )
         return self
 
     def select_cohort_type_dropdown(self, cohort_type: str) -> CohortListPage:
-        self.page.locator("select#cohortTypeList").select_option(label=cohort_type)
-        self.page.wait_for_timeout(3000)
+        self.wait_for_table_redraw(
+            self.COHORT_TABLE,
+            lambda: self.page.locator("select#cohortTypeList").select_option(
+                label=cohort_type
+            ),
+        )
         return self
 
     def dbl_click_on_filtered_cohort(self) -> CohortListPage:
         self.filtered_cohort_name.dblclick()
+        expect(self.amend_save_btn).to_be_visible()
         return self
 
     def extract_cohort_paging_info(self) -> int:
+        self.wait_for_spinner_gone()
         self.cohort_paging_info.scroll_into_view_if_needed()
         paging_info_text = self.cohort_paging_info.text_content()
-        self.page.wait_for_timeout(3000)
         re_search_result = re.search(self.ENTRIES_SHOWN, paging_info_text)
         return int(re_search_result.group(3))
 
     def screening_cohorts_count_in_db(self, db_util) -> int:
-        result = db_util.get_results(
+        return db_util.fetch_scalar(
             """select count(1)
                     from rlp_cohorts where bso_organisation_id in(
                             select bso_organisation_id from bso_organisations where bso_organisation_code = 'LAV')
                     """
         )
-        return result["count"][0]
 
     def extract_location_paging_list_count(self) -> int:
+        self.wait_for_spinner_gone()
         self.location_paging_info.scroll_into_view_if_needed()
         paging_info_text = self.location_paging_info.text_content()
-        self.page.wait_for_timeout(5000)
         re_search_result = re.search(self.ENTRIES_SHOWN, paging_info_text)
         return int(re_search_result.group(3))
 
     def extract_paging_unit_list_count(self) -> int:
-        self.page.locator("#screeningStatusList").select_option(label="All")
+        self.wait_for_table_redraw(
+            self.UNIT_TABLE,
+            lambda: self.page.locator("#screeningStatusList").select_option(label="All"),
+        )
         self.unit_paging_info.scroll_into_view_if_needed()
         paging_info_text = self.unit_paging_info.text_content()
-        self.page.wait_for_timeout(5000)
         re_search_result = re.search(self.ENTRIES_SHOWN, paging_info_text)
         return int(re_search_result.group(3))
 
     def extract_paging_unit_list_count_active_only(self) -> int:
-        self.page.locator("#screeningStatusList").select_option(label="Active")
+        self.wait_for_table_redraw(
+            self.UNIT_TABLE,
+            lambda: self.page.locator("#screeningStatusList").select_option(label="Active"),
+        )
         self.unit_paging_info.scroll_into_view_if_needed()
         paging_info_text = self.unit_paging_info.text_content()
-        self.page.wait_for_timeout(5000)
         re_search_result = re.search(self.ENTRIES_SHOWN, paging_info_text)
         return int(re_search_result.group(3))
 
@@ -362,7 +383,7 @@ class CohortListPage:
         except playwright._impl._errors.TimeoutError:
             # If no error message appears, assume the Unit was added successfully
             pass
-        self.page.wait_for_timeout(5000)
+        self.wait_for_spinner_gone()
 
     def create_unit_for_test_data(self, unit_name: str) -> None:
         self.page.get_by_role("button", name="Add Screening Unit").click()
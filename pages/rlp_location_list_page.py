@@ -2,12 +2,14 @@ from __future__ import annotations
 import re
 import playwright
 from playwright.sync_api import Page, expect
+from pages.base_page import BasePage
 
 
-class ScreeningLocationListPage:
+class ScreeningLocationListPage(BasePage):
+    LOCATION_TABLE = "#screeningLocationList"
 
     def __init__(self, page: Page) -> None:
-
+        BasePage.__init__(self, page)
         self.page = page
         self.add_screening_location_btn = page.locator("button#addLocationButton")
         self.screening_location_name_textbox = page.locator("input#locationNameText")
@@ -58,7 +60,7 @@ class ScreeningLocationListPage:
 
     def click_add_screening_location_btn_on_popup(self) -> ScreeningLocationListPage:
         self.add_screening_location_btn_on_popup.click()
-        self.page.wait_for_timeout(3000)
+        self.wait_for_spinner_gone()
         return self
 
     def click_cancel_add_screening_location_btn(self) -> ScreeningLocationListPage:
@@ -68,19 +70,20 @@ class ScreeningLocationListPage:
     def enter_screening_location_filter_textbox(
         self, location_name: str
     ) -> ScreeningLocationListPage:
-        self.location_name_filter.fill(location_name)
-        self.page.wait_for_timeout(4000)
+        self.wait_for_table_redraw(
+            self.LOCATION_TABLE, lambda: self.location_name_filter.fill(location_name)
+        )
         return self
 
     def extract_paging_info(self) -> int:
+        self.wait_for_spinner_gone()
         self.paging_info.scroll_into_view_if_needed()
         paging_info_text = self.paging_info.text_content()
-        self.page.wait_for_timeout(5000)
         re_search_result = re.search(r"\b(\d{1,5}) entries\b", paging_info_text)
         return int(re_search_result.group(1))
 
     def invoke_filtered_screening_location(self) -> None:
-        self.page.wait_for_timeout(4000)
+        self.wait_for_spinner_gone()
         self.filtered_location.dblclick()
 
     def enter_amend_screening_location_name_fn(self) -> str:
@@ -96,13 +99,12 @@ class ScreeningLocationListPage:
         return self
 
     def screening_location_count_in_db(self, db_util) -> int:
-        result = db_util.get_results(
+        return db_util.fetch_scalar(
             """select count(1)
                     from rlp_locations where bso_organisation_id in(
                             select bso_organisation_id from bso_organisations where bso_organisation_code = 'LAV')
                     """
         )
-        return result["count"][0]
 
     def click_amend_screening_location_btn(self) -> None:
         self.amend_screening_location_btn.click()
@@ -111,9 +113,8 @@ class ScreeningLocationListPage:
         self.cancel_amend_location_btn.click()
 
     def value_of_filtered_location_name(self):
-        filtered_value = self.filtered_location.text_content()
-        self.page.wait_for_timeout(4000)
-        return filtered_value
+        self.wait_for_spinner_gone()
+        return self.filtered_location.text_content()
 
     def click_log_out_btn(self) -> None:
         self.log_out_btn.click()
@@ -190,4 +191,4 @@ class ScreeningLocationListPage:
         except playwright._impl._errors.TimeoutError:
             # If no error message appears, assume the location was added successfully
             pass
-        self.page.wait_for_timeout(500)
+        self.wait_for_spinner_gone()
@@ -1,12 +1,14 @@
 from __future__ import annotations
 import re
 from playwright.sync_api import Page, expect, playwright
-import pytest
+from pages.base_page import BasePage
 
 
-class ScreeningUnitListPage:
+class ScreeningUnitListPage(BasePage):
+    UNIT_TABLE = "#screeningUnitList"
 
     def __init__(self, page: Page) -> None:
+        BasePage.__init__(self, page)
         self.page = page
         self.screening_unit_name_txt_box = page.locator("input#unitNameText")
         self.add_screening_unit_btn_on_pop_up_window = page.locator(
@@ -41,7 +43,9 @@ class ScreeningUnitListPage:
         return self
 
     def select_status_dropdown(self, status_value: str) -> ScreeningUnitListPage:
-        self.status_dropdown.select_option(label=status_value)
+        self.wait_for_table_redraw(
+            self.UNIT_TABLE, lambda: self.status_dropdown.select_option(label=status_value)
+        )
         return self
 
     def click_add_screening_unit_btn_on_pop_up_window(self) -> ScreeningUnitListPage:
@@ -100,12 +104,16 @@ class ScreeningUnitListPage:
         self.cancel_btn_on_pop_up.click()
         return self
 
+    def wait_for_pop_up_window_to_close(self) -> ScreeningUnitListPage:
+        expect(self.add_screening_unit_btn_on_pop_up_window).to_be_hidden()
+        expect(self.page.locator("#amendButtonInAmendUnitPopupText")).to_be_hidden()
+        self.wait_for_spinner_gone()
+        return self
+
     def verify_unit_has_no_matching_records_available_in_the_table(
         self, unit_name: str
     ) -> ScreeningUnitListPage:
-        self.status_dropdown.select_option(label="All")
-        self.input_name_filter.fill(unit_name)
-        self.page.wait_for_timeout(3000)
+        self.filter_all_units_by_name(unit_name)
         self.no_matching_records_found_msg.is_visible()
         return self
 
@@ -158,17 +166,23 @@ class ScreeningUnitListPage:
         self.page.locator("//span[@id='amendButtonInAmendUnitPopupText']").click()
 
     def filter_unit_by_name(self, unit_name) -> ScreeningUnitListPage:
-        self.status_dropdown.select_option(label="All")
-        self.input_name_filter.fill(unit_name)
-        self.page.wait_for_timeout(5000)
+        self.filter_all_units_by_name(unit_name)
+        return self
+
+    def filter_all_units_by_name(self, unit_name: str) -> ScreeningUnitListPage:
+        self.wait_for_table_redraw(
+            self.UNIT_TABLE, lambda: self.status_dropdown.select_option(label="All")
+        )
+        # The table is only redrawn if the filter value changes
+        if self.input_name_filter.input_value() != unit_name:
+            self.wait_for_table_redraw(
+                self.UNIT_TABLE, lambda: self.input_name_filter.fill(unit_name)
+            )
         return self
 
     def verify_screening_unit_by_name(self, expected_notes) -> ScreeningUnitListPage:
-        self.status_dropdown.select_option(label="All")
-        self.input_name_filter.fill(expected_notes)
-        self.page.wait_for_timeout(3000)
+        self.filter_all_units_by_name(expected_notes)
         note_values = self.page.wait_for_selector("//tr//td[4]").text_content()
-        self.page.wait_for_timeout(3000)
         assert note_values == expected_notes
         return self
 
@@ -182,7 +196,7 @@ class ScreeningUnitListPage:
         self.enter_screening_unit_name_txt_box(unit_name)
         self.select_status_mobile_radio_btn()
         self.click_add_screening_unit_btn_on_pop_up_window()
-        self.page.wait_for_timeout(3000)
+        self.wait_for_spinner_gone()
         return self
 
     def add_screening_unit(
@@ -207,18 +221,15 @@ class ScreeningUnitListPage:
         self.click_amend_screening_unit_btn_on_pop_up_window()
 
     def screening_unit_list_count_in_db(self, db_util) -> int:
-        result = db_util.get_results(
+        return db_util.fetch_scalar(
             """select count(1)
                     from rlp_units where bso_organisation_id in(
                             select bso_organisation_id from bso_organisations where bso_organisation_code = 'LAV')
                     """
         )
-        return result["count"][0]
 
     def extract_paging_unit_list_count(self):
-        self.input_name_filter.fill("")
-        self.status_dropdown.select_option(label="All")
-        self.page.wait_for_timeout(4000)
+        self.filter_all_units_by_name("")
         self.unit_paging_info.scroll_into_view_if_needed()
         paging_info_text = self.unit_paging_info.text_content()
         re_search_result = re.search(r"\b(\d{1,5}) entries\b", paging_info_text)
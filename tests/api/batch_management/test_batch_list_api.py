@@ -34,6 +34,8 @@ def test_batch_list_search_all(api_bso_user_session: BrowserContext) -> None:
             assert batch["bsoCode"] == batch["bsoBatchId"][:3]
 
 
+# ci-infra only has 2 RISP_AGEX batches visible to National users, but at least 10 for BS1
+@pytest.mark.ci_infra_data
 def test_bso_search_national_all(api_national_user_session: BrowserContext) -> None:
     """
     API test to check search Batch List on all BSO's
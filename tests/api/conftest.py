@@ -1,34 +1,112 @@
+import os
+import typing
 import pytest
+from utils.api_stand_in import LOGIN_PATH, ApiStandIn
 from utils.user_tools import UserTools
-from playwright.sync_api import Playwright, BrowserContext
+from playwright.sync_api import Playwright, APIRequestContext, BrowserContext
+
+
+def use_stand_in() -> bool:
+    return os.getenv("API_STAND_IN", "false").lower() == "true"
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    """
+    When running against the stand-in, marks the tests marked ci_infra_data as strict xfails,
+    so the run passes only if exactly those tests fail.
+    """
+    if not use_stand_in():
+        return
+    for item in items:
+        if item.get_closest_marker("ci_infra_data") is not None:
+            item.add_marker(
+                pytest.mark.xfail(
+                    reason="Asserts on ci-infra data, which the API stand-in does not serve",
+                    strict=True,
+                )
+            )
 
 
 def persist_browser_context(playwright: Playwright, base_url: str) -> BrowserContext:
     return playwright.chromium.launch_persistent_context("", base_url=base_url)
 
 
+def api_session(
+    user_tools: UserTools, playwright: Playwright, base_url: str, user: str
+) -> APIRequestContext | BrowserContext:
+    """
+    Logs in as the user provided and returns a session ready to use with ApiUtils.
+    By default this logs in via HTTP requests only, but setting API_BROWSER_LOGIN=true
+    will log in through a browser instead.
+    """
+    if os.getenv("API_BROWSER_LOGIN", "false").lower() == "true":
+        context = persist_browser_context(playwright, base_url)
+        user_tools.user_login(context.new_page(), user, use_cached_session=False)
+        return context
+    return user_tools.api_user_login(playwright, base_url, user)
+
+
+def stand_in_session(playwright: Playwright, base_url: str, user: str) -> APIRequestContext:
+    """
+    Logs in to the API stand-in as the user provided and returns a session ready to use with ApiUtils.
+    """
+    session = playwright.request.new_context(base_url=base_url)
+    assert session.post(LOGIN_PATH, form={"user": user}).ok
+    return session
+
+
+@pytest.fixture(scope="session")
+def api_stand_in() -> typing.Generator[ApiStandIn | None, None, None]:
+    """
+    If API_STAND_IN is "true", runs a local stand-in serving synthetic data for the API tests to use instead of
+    base_url (see docs/utility-guides/ApiStandIn.md). Otherwise this is None.
+    """
+    if not use_stand_in():
+        yield None
+        return
+    with ApiStandIn.from_file() as stand_in:
+        yield stand_in
+
+
+@pytest.fixture(scope="session")
+def api_base_url(base_url: str, api_stand_in: ApiStandIn | None) -> str:
+    """
+    The base URL for the API tests, which is the stand-in's when API_STAND_IN is "true".
+    """
+    return api_stand_in.base_url if api_stand_in is not None else base_url
+
+
+@pytest.fixture(scope="session")
+def api_login(
+    user_tools: UserTools,
+    playwright: Playwright,
+    api_base_url: str,
+    api_stand_in: ApiStandIn | None,
+) -> typing.Callable[[str], APIRequestContext | BrowserContext]:
+    """
+    Logs in to the API as the user provided, e.g. api_login("BSO User - BS1"), using the stand-in if it is running.
+    """
+    if api_stand_in is not None:
+        return lambda user: stand_in_session(playwright, api_base_url, user)
+    return lambda user: api_session(user_tools, playwright, api_base_url, user)
+
+
 @pytest.fixture(scope="session")
 def api_bso_user_session(
-    user_tools: UserTools, playwright: Playwright, base_url: str
-) -> BrowserContext:
-    context = persist_browser_context(playwright, base_url)
-    user_tools.user_login(context.new_page(), "BSO User - BS1")
-    return context
+    api_login: typing.Callable[[str], APIRequestContext | BrowserContext],
+) -> APIRequestContext | BrowserContext:
+    return api_login("BSO User - BS1")
 
 
 @pytest.fixture(scope="session")
 def api_national_user_session(
-    user_tools: UserTools, playwright: Playwright, base_url: str
-) -> BrowserContext:
-    context = persist_browser_context(playwright, base_url)
-    user_tools.user_login(context.new_page(), "National User")
-    return context
+    api_login: typing.Callable[[str], APIRequestContext | BrowserContext],
+) -> APIRequestContext | BrowserContext:
+    return api_login("National User")
 
 
 @pytest.fixture(scope="session")
 def api_helpdesk_session(
-    user_tools: UserTools, playwright: Playwright, base_url: str
-) -> BrowserContext:
-    context = persist_browser_context(playwright, base_url)
-    user_tools.user_login(context.new_page(), "Helpdesk User")
-    return context
+    api_login: typing.Callable[[str], APIRequestContext | BrowserContext],
+) -> APIRequestContext | BrowserContext:
+    return api_login("Helpdesk User")
@@ -87,51 +87,56 @@ def test_sspi_action_all(api_bso_user_session: BrowserContext) -> None:
         assert name["bsoCode"] == "BS1"
 
 
-def test_sspi_action_nhs_number(api_bso_user_session: BrowserContext) -> None:
-    """
-    API test to check search on NHS Number on the SSPI Update Warnings Action report
-    """
-    data = {
-        "draw": "1",
-        "start": "0",
-        "length": "10",
-        "searchText": "",
-        "columnSearchText[actioned]": "NOT_ACTIONED",
-        "columnSearchText[nhsNumber]": "930 000 0002",
-        "columnSortDirectionWithOrder[0receivedDateTime]": "desc",
-        "searchSpecification": "",
-    }
-    response_data = ApiUtils(api_bso_user_session, API_URL).get_request(data)
-    assert response_data["draw"] == 1
-    assert len(response_data["results"]) == 1
-    for nhs in response_data["results"]:
-        assert len(nhs["nhsNumber"]) == 10
-
-
-def test_sspi_action_first_given_name(api_bso_user_session: BrowserContext) -> None:
-    """
-    API test to check search on First Given Name "Coleen" entries on the SSPI Update Warnings Action report
-    """
-    data = {
-        "draw": "1",
-        "start": "0",
-        "length": "10",
-        "searchText": "",
-        "columnSearchText[actioned]": "NOT_ACTIONED",
-        "columnSearchText[firstNames]": "coleen",
-        "columnSortDirectionWithOrder[0receivedDateTime]": "desc",
-        "searchSpecification": "",
-    }
-    response_data = ApiUtils(api_bso_user_session, API_URL).get_request(data)
-    assert response_data["draw"] == 1
-    assert len(response_data["results"]) == 1
-    for name in response_data["results"]:
-        assert str(name["firstNames"]).startswith("Coleen")
-
-
-def test_sspi_action_family_name(api_bso_user_session: BrowserContext) -> None:
-    """
-    API test to check search on Family Name "Smith" entries on the SSPI Update Warnings Action report
+@pytest.mark.parametrize(
+    "search, expected_count, check_row",
+    [
+        pytest.param(
+            {"columnSearchText[nhsNumber]": "930 000 0002"},
+            1,
+            lambda row: len(row["nhsNumber"]) == 10,
+            id="nhs_number",
+        ),
+        pytest.param(
+            {"columnSearchText[firstNames]": "coleen"},
+            1,
+            lambda row: str(row["firstNames"]).startswith("Coleen"),
+            id="first_given_name",
+        ),
+        pytest.param(
+            {"columnSearchText[familyName]": "smith"},
+            1,
+            lambda row: str(row["familyName"]).startswith("SMITH"),
+            id="family_name",
+        ),
+        pytest.param(
+            {"columnSearchText[ageInYears]": "under80"},
+            3,
+            lambda row: row["bsoCode"] == "BS1",
+            id="age_today",
+        ),
+        pytest.param(
+            {
+                "columnSearchText[event]": "DATE_OF_DEATH_SET",
+                "columnSortDirectionWithOrder[0nhsNumber]": "asc",
+            },
+            1,
+            lambda row: row["event"]["description"] == "Date of death set",
+            id="event",
+        ),
+        pytest.param(
+            {"columnSearchText[reason]": "SUBJECT_IS_HR"},
+            1,
+            lambda row: row["reason"]["description"] == "Subject has HR status",
+            id="warning",
+        ),
+    ],
+)
+def test_sspi_action_column_search(
+    api_bso_user_session: BrowserContext, search: dict, expected_count: int, check_row
+) -> None:
+    """
+    API test to check search on each column (NHS Number, First Given Name "Coleen", Family Name "Smith",
+    Age Today "Under 80", Event and Warning) on the SSPI Update Warnings Action report
     """
     data = {
         "draw": "1",
@@ -139,75 +144,13 @@ def test_sspi_action_family_name(api_bso_user_session: BrowserContext) -> None:
         "length": "10",
         "searchText": "",
         "columnSearchText[actioned]": "NOT_ACTIONED",
-        "columnSearchText[familyName]": "smith",
         "columnSortDirectionWithOrder[0receivedDateTime]": "desc",
         "searchSpecification": "",
     }
-    response_data = ApiUtils(api_bso_user_session, API_URL).get_request(data)
-    assert response_data["draw"] == 1
-    assert len(response_data["results"]) == 1
-    for name in response_data["results"]:
-        assert str(name["familyName"]).startswith("SMITH")
-
-
-def test_sspi_action_age_today(api_bso_user_session: BrowserContext) -> None:
-    """
-    API test to check search on Age Today "Under 80" entries on the SSPI Update Warnings Action report
-    """
-    data = {
-        "draw": "1",
-        "start": "0",
-        "length": "10",
-        "searchText": "",
-        "columnSearchText[actioned]": "NOT_ACTIONED",
-        "columnSearchText[ageInYears]": "under80",
-        "columnSortDirectionWithOrder[0receivedDateTime]": "desc",
-        "searchSpecification": "",
-    }
-    response_data = ApiUtils(api_bso_user_session, API_URL).get_request(data)
-    assert response_data["draw"] == 1
-    assert len(response_data["results"]) == 3
-    for age in response_data["results"]:
-        assert age["bsoCode"] == "BS1"
-
-
-def test_sspi_action_event(api_bso_user_session: BrowserContext) -> None:
-    """
-    API test to check search on Event entries on the SSPI Update Warnings Action report
-    """
-    data = {
-        "draw": "1",
-        "start": "0",
-        "length": "10",
-        "searchText": "",
-        "columnSearchText[actioned]": "NOT_ACTIONED",
-        "columnSearchText[event]": "DATE_OF_DEATH_SET",
-        "columnSortDirectionWithOrder[0nhsNumber]": "asc",
-        "searchSpecification": "",
-    }
-    response_data = ApiUtils(api_bso_user_session, API_URL).get_request(data)
-    assert response_data["draw"] == 1
-    assert len(response_data["results"]) == 1
-    for event in response_data["results"]:
-        assert event["event"]["description"] == "Date of death set"
-
-
-def test_sspi_action_warning(api_bso_user_session: BrowserContext) -> None:
-    """
-    API test to check search on Warning entries on the SSPI Update Warnings Action report
-    """
-    data = {
-        "draw": "1",
-        "start": "0",
-        "length": "10",
-        "searchText": "",
-        "columnSearchText[actioned]": "NOT_ACTIONED",
-        "columnSearchText[reason]": "SUBJECT_IS_HR",
-        "columnSortDirectionWithOrder[0receivedDateTime]": "desc",
-        "searchSpecification": "",
-    }
-    response_data = ApiUtils(api_bso_user_session, API_URL).get_request(data)
+    if "columnSortDirectionWithOrder[0nhsNumber]" in search:
+        del data["columnSortDirectionWithOrder[0receivedDateTime]"]
+    response_data = ApiUtils(api_bso_user_session, API_URL).get_request(data | search)
     assert response_data["draw"] == 1
-    assert len(response_data["results"]) == 1
-    for warning in response_data["results"]:
-        assert warning["reason"]["description"] == "Subject has HR status"
+    assert len(response_data["results"]) == expected_count
+    for row in response_data["results"]:
+        assert check_row(row)
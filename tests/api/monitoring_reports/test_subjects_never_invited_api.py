@@ -3,6 +3,7 @@ Subjects Never Invited for Screening report Tests: These tests cover the Subject
 """
 
 import pytest
+from itertools import islice
 from utils.api_utils import ApiUtils
 from playwright.sync_api import BrowserContext
 
@@ -10,6 +11,7 @@ from playwright.sync_api import BrowserContext
 pytestmark = [pytest.mark.subjects_never_invited, pytest.mark.uiapi]
 
 API_URL = "/bss/report/subjectsNeverInvited/search"
+MAX_ROWS_CHECKED = 1000
 
 
 def test_subjects_never_invited_default(api_bso_user_session: BrowserContext) -> None:
@@ -31,6 +33,23 @@ def test_subjects_never_invited_default(api_bso_user_session: BrowserContext) ->
         assert code["bso"]["code"] == "BS1"
 
 
+def test_subjects_never_invited_all_pages_bso_code(
+    api_bso_user_session: BrowserContext,
+) -> None:
+    """
+    API test to check every entry across the first pages of the Subjects Never Invited for Screening report belongs to BS1
+    """
+    data = {
+        "searchText": "",
+        "columnSortDirectionWithOrder[0dateOfBirth]": "asc",
+        "searchSpecification": "",
+    }
+    rows = ApiUtils(api_bso_user_session, API_URL).iter_results(data)
+    # Capped, so the test does not walk the whole report on a shared environment
+    for row in islice(rows, MAX_ROWS_CHECKED):
+        assert row["bso"]["code"] == "BS1"
+
+
 def test_invalid_national_user(api_national_user_session: BrowserContext) -> None:
     """
     API test to check an invaild user (National user) doesn't have access to the Subjects Never Invited for Screening report, so returns a 403 error.
@@ -2,8 +2,7 @@ def subject_count_by_nhs_number(db_util, nhs_number, table_name):
     subject_search = (
         f"""select count(1) as count from {table_name} where nhs_number = %s """
     )
-    df = db_util.get_results(subject_search, [nhs_number])
-    return df["count"][0]
+    return db_util.fetch_scalar(subject_search, [nhs_number])
 
 
 def fetch_all_audit_subjects(db_util, nhs_number):
@@ -14,8 +13,16 @@ def fetch_all_audit_subjects(db_util, nhs_number):
     return pd.DataFrame(results)
 
 
+def iter_audit_subjects(db_util, nhs_number, chunk_size=1000):
+    """Streams the audit_subjects rows (as dicts) for the NHS number, latest first, without loading them all at once."""
+    subject_search = """select * from audit_subjects where nhs_number = %s order by transaction_db_date_time desc"""
+    return db_util.stream(
+        subject_search, [nhs_number], as_dict=True, chunk_size=chunk_size
+    )
+
+
 def fetch_subject_column_value(db_util, nhs_number, table_column):
     subject_search = f"""select {table_column} from subjects where nhs_number = %s """
-    results = db_util.get_results(subject_search, [nhs_number])
+    results = db_util.fetch_column(subject_search, [nhs_number])
     assert len(results) == 1, f"Expected only 1 but returned {len(results)}"
-    return results[table_column][0]
+    return results[0]
@@ -1,19 +1,56 @@
-import json
 import logging
-import time
-import boto3
+from collections.abc import Iterator
+import pytest
 from pandas import DataFrame
 from playwright.sync_api import expect, Page
+from psycopg_pool import ConnectionPool
 from tests.ui.cohort_manager.cohort_manager_util import (
     fetch_subject_column_value,
     subject_count_by_nhs_number,
 )
-from utils.db_util import DbUtil
+from utils.db_util import DbUtil, change_notifications_enabled
+from utils.lambda_invoker import LambdaInvoker
 from utils.user_tools import UserTools
 
 logging.getLogger("botocore").setLevel(logging.WARNING)
 
+# Created on first use, so the backend can be selected using LAMBDA_BACKEND
+LAMBDA_INVOKER = None
+
+
+@pytest.fixture(scope="module", autouse=True)
+def change_notifications(db_pool: ConnectionPool) -> Iterator[None]:
+    """
+    If CI_INFRA_DB_NOTIFY_TRIGGERS is "true", installs triggers so that wait_for_assertion wakes up as soon as
+    pi_changes or subjects change, rather than waiting for the next poll. The triggers are removed again at teardown.
+    """
+    installed = []
+    if change_notifications_enabled():
+        with DbUtil(pool=db_pool) as db:
+            installed = [
+                table
+                for table in ["pi_changes", "subjects"]
+                if db.install_change_notifications(table)
+            ]
+    yield
+    if installed:
+        with DbUtil(pool=db_pool) as db:
+            for table in installed:
+                db.remove_change_notifications(table)
+
+
+@pytest.fixture(autouse=True)
+def cohort_manager_lambda_lock(db_pool: ConnectionPool) -> Iterator[None]:
+    """
+    The Lambda processes every pending pi_changes row, and these tests use message IDs that the cohort manager stub
+    has fixed responses for, so only one of them can run at a time (on any xdist worker, or in any other run).
+    """
+    with DbUtil(pool=db_pool) as db, db.advisory_lock("cohort_manager_lambda"):
+        yield
+
+
 ## Run this cmd before running these tests - aws sso login --profile bs-select-rw-user-730319765130
+## (not needed when LAMBDA_BACKEND is set to local, inprocess or stub, see docs/utility-guides/LambdaInvoker.md)
 
 
 ################ CM Lambda Positive tests ####################
@@ -78,6 +115,7 @@ def test_validate_max_field_length_in_db_pi_changes(db_util: DbUtil) -> None:
     ), "field not matched: request_id"
     nhs_number = "9470082060"
     wait_for_assertion(
+        db_util,
         lambda: fetch_pi_changes_column_value(db_util, nhs_number, "state")
                 == "PROCESSED"
     )
@@ -227,6 +265,7 @@ def test_to_add_and_update_participant_in_the_pi_changes(db_util: DbUtil) -> Non
         str(inserted["message_id"]) == stub_data["request_id"]
     ), "field not matched: request_id"
     wait_for_assertion(
+        db_util,
         lambda: fetch_pi_changes_column_value(db_util, nhs_number, "state")
                 == "PROCESSED"
     )
@@ -314,6 +353,7 @@ def test_to_add_and_update_participant_in_the_pi_changes(db_util: DbUtil) -> Non
         str(updated["message_id"]) == expected["request_id"]
     ), "field not matched: request_id"
     wait_for_assertion(
+        db_util,
         lambda: fetch_pi_changes_column_value(db_util, nhs_number, "state")
                 == "PROCESSED"
     )
@@ -423,25 +463,31 @@ def test_where_nhs_num_and_superseded_nhs_num_both_does_exists(
         str(inserted["message_id"]) == stub_data["request_id"]
     ), "field not matched: request_id"
     wait_for_assertion(
+        db_util,
         lambda: fetch_pi_changes_column_value(db_util, nhs_number_before, "state")
                 == "PROCESSED"
     )
     wait_for_assertion(
+        db_util,
         lambda: subject_count_by_nhs_number(db_util, nhs_number_before, "subjects") == 1
     )
     wait_for_assertion(
+        db_util,
         lambda: fetch_latest_removal_reason(db_util, nhs_number_before, "subjects")
                 == "NOT_PROVIDED"
     )
     wait_for_assertion(
+        db_util,
         lambda: fetch_latest_removal_reason(db_util, superseded_nhs_number, "subjects")
                 is None
     )
     wait_for_assertion(
+        db_util,
         lambda: subject_count_by_nhs_number(db_util, superseded_nhs_number, "subjects")
                 == 1
     )
     wait_for_assertion(
+        db_util,
         lambda: subject_count_by_nhs_number(
             db_util, superseded_nhs_number, "audit_subjects"
         )
@@ -593,14 +639,17 @@ def test_death_date_and_reason_for_removal_populated_using_dummy_gp_practice_cod
         str(inserted_data["message_id"]) == stub_data_with_reasons[0]["request_id"]
     ), "field not matched: request_id"
     wait_for_assertion(
+        db_util,
         lambda: fetch_pi_changes_column_value(db_util, nhs_number_15, "state")
                 == "PROCESSED"
     )
     wait_for_assertion(
+        db_util,
         lambda: fetch_pi_changes_column_value(db_util, nhs_number_16, "state")
                 == "PROCESSED"
     )
     wait_for_assertion(
+        db_util,
         lambda: fetch_pi_changes_column_value(db_util, nhs_number_17, "state")
                 == "PROCESSED"
     )
@@ -678,26 +727,25 @@ def test_status_500(db_util: DbUtil) -> None:
 
 #####################################################
 # Function to invoke AWS Lambda
-def invoke_lambda(function_name, payload, region="eu-west-2") -> dict:
+def get_lambda_invoker() -> LambdaInvoker:
     """
-    Invokes an AWS Lambda function and validates the response.
+    Returns the invoker for the backend selected by LAMBDA_BACKEND (the deployed function by default).
     """
-    # Initialize the Lambda
-    session = boto3.Session(profile_name="bs-select-rw-user-730319765130")
-    lambda_client = session.client("lambda", region_name=region)
-    response = lambda_client.invoke(
-        FunctionName=function_name,
-        InvocationType="RequestResponse",
-        Payload=json.dumps(payload),
-    )
-    response_payload = json.loads(response["Payload"].read())
-    return response_payload
+    global LAMBDA_INVOKER
+    if LAMBDA_INVOKER is None:
+        LAMBDA_INVOKER = LambdaInvoker.from_env()
+    return LAMBDA_INVOKER
+
+
+def invoke_lambda(function_name, payload) -> dict:
+    return get_lambda_invoker().invoke(function_name, payload)
 
 
 def insert_data(db_util, message_id) -> None:
     insert_query = """INSERT INTO pi_changes (inserted_date_time, message_id) values (current_timestamp, %s)"""
     params = (message_id,)
     db_util.insert(insert_query, params)
+    get_lambda_invoker().message_inserted(message_id)
 
 
 def trigger_lambda_and_verify_success(inserted) -> None:
@@ -743,22 +791,15 @@ def get_latest_records_by_nhs_number(db_conn, nhs_number, limit) -> DataFrame |
     return db_conn.get_results(query, [nhs_number, limit])
 
 
-def wait_for_assertion(assert_func, timeout=90, interval=3):
-    end_time = time.time() + timeout
-
-    while time.time() < end_time:
-        if assert_func():
-            return
-        time.sleep(interval)
-
-    result = assert_func()
+def wait_for_assertion(db_util, assert_func, timeout=90):
+    # Wakes as soon as pi_changes or subjects change (if notifications are installed), otherwise backs off up to 3s
+    result = db_util.wait_for(assert_func, timeout=timeout, max_interval=3)
     assert result, "Expected TRUE"
 
 
 def fetch_latest_removal_reason(db_util, nhs_number, table_name):
-    return fetch_latest_record_by_nhs_number(
-        db_util, nhs_number, table_name, "transaction_db_date_time"
-    )["removal_reason"][0]
+    query = f"""SELECT removal_reason FROM {table_name} WHERE nhs_number = %s order by transaction_db_date_time desc limit 1"""
+    return db_util.fetch_scalar(query, [nhs_number])
 
 
 def fetch_latest_record_by_nhs_number(
@@ -771,10 +812,7 @@ def fetch_latest_record_by_nhs_number(
 
 def fetch_pi_changes_column_value(db_util, nhs_number, table_column):
     query = f"""SELECT {table_column} FROM pi_changes WHERE nhs_number = %s order by inserted_date_time desc limit 1"""
-    df = db_util.get_results(query, [nhs_number])
-    # Extract the column value
-    column_value = df[table_column][0]
-    return column_value
+    return db_util.fetch_scalar(query, [nhs_number])
 
 
 def verify_subject_and_audit_counts(
@@ -790,17 +828,21 @@ def verify_subject_and_audit_counts(
         str(inserted["message_id"]) == request_id
     ), "field not matched: request_id"
     wait_for_assertion(
+        db_util,
         lambda: fetch_pi_changes_column_value(db_util, nhs_number_before, "state")
                 == "PROCESSED"
     )
     wait_for_assertion(
+        db_util,
         lambda: subject_count_by_nhs_number(db_util, nhs_number_before, "subjects") == 0
     )
     wait_for_assertion(
+        db_util,
         lambda: subject_count_by_nhs_number(db_util, superseded_nhs_number, "subjects")
                 == 1
     )
     wait_for_assertion(
+        db_util,
         lambda: subject_count_by_nhs_number(
             db_util, superseded_nhs_number, "audit_subjects"
         )
@@ -827,8 +869,7 @@ def perform_ui_subject_search_assertions(
     page.locator("#nhsNumberFilter input").fill(superseded_nhs_number)
     page.locator("#nhsNumberFilter input").press("Enter")
     expected_superseded_text = format_nhs_number_for_ui(superseded_nhs_number)
-    page.wait_for_timeout(3000)  # Wait for the page to load
-    expect(page.locator(f"//td[text()='{expected_superseded_text}']")).to_be_visible()
+    expect(page.locator(f"//td[text()='{expected_superseded_text}']")).to_be_visible(timeout=10000)
 
 def format_nhs_number_for_ui(nhs_number: str) -> str:
         """Format NHS number as 'XXX XXX XXXX' for UI display."""
@@ -64,7 +64,6 @@ def test_ni_bso_user_is_able_to_create_ri_sp_batch_by_year_of_birth(
         "ni_bso_user_able_to_create_ri_sp_batch_by_yob"
     )
     page.locator("#deleteButton").click()
-    page.wait_for_timeout(3000)
     page.locator("#confirmButtonInDeletePopupText").click()
 
 
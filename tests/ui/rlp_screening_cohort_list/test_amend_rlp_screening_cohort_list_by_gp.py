@@ -166,7 +166,6 @@ def test_amend_cohort_location(
     cohort_name = f"cohort_name-{datetime.now()}"
     unit_name = "Batman"
     rlp_cohort_list_page.create_cohort_without_gp(cohort_name, location_name, unit_name)
-    page.wait_for_timeout(3000)
     rlp_cohort_list_page.enter_screening_cohort_name_filter(cohort_name)
     rlp_cohort_list_page.dbl_click_on_filtered_cohort()
 
@@ -199,7 +198,6 @@ def test_amend_cohort_unit_list(
     cohort_name = f"cohort_name-{datetime.now()}"
     location_name = "Aldi - Caldecott County Retail Park"
     rlp_cohort_list_page.create_cohort_without_gp(cohort_name, location_name, unit_name)
-    page.wait_for_timeout(3000)
     rlp_cohort_list_page.enter_screening_cohort_name_filter(cohort_name)
     rlp_cohort_list_page.dbl_click_on_filtered_cohort()
 
@@ -297,7 +295,6 @@ def test_amend_cancel_adding_gp_practices(
 
     rlp_cohort_list_page.enter_screening_cohort_name_filter(cohort_name)
     rlp_cohort_list_page.dbl_click_on_filtered_cohort()
-    page.wait_for_timeout(3000)
     # clicking on amend page cancel button
     rlp_cohort_list_page.click_amend_cohort_cancel_button()
     expect(page.get_by_text("Screening cohort list", exact=True)).to_be_visible()
@@ -342,7 +339,6 @@ def create_cohort_and_add_gp_practices(
     rlp_cohort_list_page.create_cohort(cohort_name, location_name)
     rlp_cohort_list_page.enter_screening_cohort_name_filter(cohort_name)
     rlp_cohort_list_page.dbl_click_on_filtered_cohort()
-    page.wait_for_timeout(3000)
     for gp_code in gp_codes:
         rlp_cohort_list_page.click_select_gp_practices_btn()
         rlp_cohort_list_page.enter_gp_code_field(gp_code)
@@ -214,7 +214,6 @@ def test_outcode_amend_included_outcodes_are_visible(
     )
     rlp_cohort_list_page.enter_screening_cohort_name_filter(cohort_name)
     rlp_cohort_list_page.dbl_click_on_filtered_cohort()
-    page.wait_for_timeout(3000)
     rlp_cohort_list_page.click_select_outcodes_btn()
     rlp_cohort_list_page.enter_outcode_filter(out_code1)
     rlp_cohort_list_page.click_add_btn_to_select_outcode(out_code1)
@@ -256,7 +255,6 @@ def test_outcode_amend_remove_added_outcodes(
     )
     rlp_cohort_list_page.enter_screening_cohort_name_filter(cohort_name)
     rlp_cohort_list_page.dbl_click_on_filtered_cohort()
-    page.wait_for_timeout(3000)
     rlp_cohort_list_page.click_select_outcodes_btn()
     rlp_cohort_list_page.enter_outcode_filter(out_code1)
     rlp_cohort_list_page.click_add_btn_to_select_outcode(out_code1)
@@ -63,7 +63,6 @@ def test_defaults_are_set_and_displayed_correctly(
 
     # Create Screening Cohort screen is displayed
     rlp_cohort_list_page.click_create_screening_cohort_by_gp_practice_btn()
-    page.wait_for_timeout(3000)
     expect(page.get_by_text("Create Screening Cohort")).to_be_visible()
 
     # All defaults are set & displayed correctly
@@ -94,10 +93,8 @@ def test_invoke_cancel_btn_return_to_screening_cohort_list(
 
     # Create Screening Cohort screen is displayed
     rlp_cohort_list_page.click_create_screening_cohort_by_gp_practice_btn()
-    page.wait_for_timeout(3000)
 
     rlp_cohort_list_page.click_on_cancel_creating_screening_cohort()
-    page.wait_for_timeout(5000)
     expect(page.get_by_text("Screening cohort list", exact=True)).to_be_visible()
 
 
@@ -151,7 +148,6 @@ def test_try_to_create_screening_cohort_with_invalid_data(
 
     # try to create cohort using create cohort method with invalid data
     rlp_cohort_list_page.click_create_screening_cohort_by_gp_practice_btn()
-    page.wait_for_timeout(3000)
     rlp_cohort_list_page.enter_screening_cohort_name_field(cohort_name)
     rlp_cohort_list_page.enter_expected_attendance_rate("25")
     rlp_cohort_list_page.select_default_screening_location_dropdown(
@@ -179,7 +175,6 @@ def test_expected_attendance_rate_valid_data(
 
     cohort_name = f"cohort_name-{datetime.now()}"
     rlp_cohort_list_page.click_create_screening_cohort_by_gp_practice_btn()
-    page.wait_for_timeout(3000)
     rlp_cohort_list_page.enter_screening_cohort_name_field(cohort_name)
     rlp_cohort_list_page.enter_expected_attendance_rate(str(input_value))
     rlp_cohort_list_page.select_default_screening_location_dropdown(
@@ -214,7 +209,6 @@ def test_expected_attendance_rate_invalid_data(
     # try to create cohort using invalid attendance rate
     cohort_name = f"cohort_name-{datetime.now()}"
     rlp_cohort_list_page.click_create_screening_cohort_by_gp_practice_btn()
-    page.wait_for_timeout(3000)
     rlp_cohort_list_page.enter_screening_cohort_name_field(cohort_name)
     rlp_cohort_list_page.enter_expected_attendance_rate(attendance_rate)
     rlp_cohort_list_page.select_default_screening_location_dropdown(
@@ -237,7 +231,6 @@ def test_default_location_dropdown(page: Page, rlp_cohort_list_page: CohortListP
     )
 
     rlp_cohort_list_page.click_create_screening_cohort_by_gp_practice_btn()
-    page.wait_for_timeout(3000)
     # extracting the drop-down location count
     rlp_cohort_list_page.select_default_screening_location_dropdown(None)
     dropdown_count = rlp_cohort_list_page.number_of_location_dropdown_count()
@@ -259,7 +252,6 @@ def test_default_unit_dropdown(page: Page, rlp_cohort_list_page: CohortListPage)
     )
 
     rlp_cohort_list_page.click_create_screening_cohort_by_gp_practice_btn()
-    page.wait_for_timeout(3000)
     # extracting the drop-down location count
     rlp_cohort_list_page.select_default_screening_unit_dropdown(None)
     dropdown_count = rlp_cohort_list_page.number_of_unit_dropdown_count()
@@ -284,7 +276,6 @@ def test_added_gp_practices_are_visible(
     )
 
     rlp_cohort_list_page.click_create_screening_cohort_by_gp_practice_btn()
-    page.wait_for_timeout(3000)
     # including gp practice
     rlp_cohort_list_page.click_select_gp_practices_btn()
     rlp_cohort_list_page.enter_gp_code_field("A00002")
@@ -317,7 +308,6 @@ def test_gp_practices_removed_from_included_gp_practices(
     )
 
     rlp_cohort_list_page.click_create_screening_cohort_by_gp_practice_btn()
-    page.wait_for_timeout(3000)
     # including gp practice
     rlp_cohort_list_page.click_select_gp_practices_btn()
     rlp_cohort_list_page.enter_gp_code_field("A00002")
@@ -366,7 +356,6 @@ def test_click_save_without_filling_all_mandatory_fields(
     )
     # Create Screening Cohort screen is displayed
     rlp_cohort_list_page.click_create_screening_cohort_by_gp_practice_btn()
-    page.wait_for_timeout(3000)
     rlp_cohort_list_page.click_create_screening_cohort_save_btn()
     # expected error messages to be visible
     expect(page.get_by_text("Screening Cohort Name must be populated")).to_be_visible()
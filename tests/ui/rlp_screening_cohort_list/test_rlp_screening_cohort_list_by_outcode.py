@@ -40,7 +40,6 @@ def test_for_outcode_defaults_are_set_and_displayed_correctly(
 
     # Create Screening Cohort screen is displayed
     rlp_cohort_list_page.click_create_screening_cohort_by_outcode_btn()
-    page.wait_for_timeout(3000)
     expect(page.get_by_text("Create screening cohort", exact=True)).to_be_visible()
 
     # All defaults are set & displayed correctly
@@ -66,9 +65,7 @@ def test_for_outcode_cancel_function(page: Page, rlp_cohort_list_page: CohortLis
     UserTools().login_and_navigate(page, "Read Only BSO User - BS2", "Round Planning", "Screening Cohort List")
 
     rlp_cohort_list_page.click_create_screening_cohort_by_outcode_btn()
-    page.wait_for_timeout(3000)
     rlp_cohort_list_page.click_cancel_cohort_by_outcode_btn()
-    page.wait_for_timeout(3000)
     expect(page.get_by_text("Screening cohort list", exact=True)).to_be_visible()
 
 
@@ -93,7 +90,6 @@ def test_create_screening_cohort_outcode_valid_data(
     attendance_rate = "25"
     # checking uniqueness of the name
     rlp_cohort_list_page.enter_screening_cohort_name_filter(cohort_name)
-    page.wait_for_timeout(3000)
     expect(page.locator("td.dataTables_empty")).to_be_visible()
     # creating cohort using create cohort method
     rlp_cohort_list_page.create_cohort_outcode_without_gp(
@@ -224,7 +220,6 @@ def test_outcode_default_location_dropdown(
     UserTools().login_and_navigate(page, "Read Only BSO User - BS2", "Round Planning", "Screening Cohort List")
 
     rlp_cohort_list_page.click_create_screening_cohort_by_outcode_btn()
-    page.wait_for_timeout(3000)
     # extracting the drop_down location count
     rlp_cohort_list_page.select_default_screening_location_dropdown(None)
     dropdown_count = rlp_cohort_list_page.number_of_location_dropdown_count()
@@ -244,7 +239,6 @@ def test_outcode_default_unit_dropdown(
     UserTools().login_and_navigate(page, "Read Only BSO User - BS2", "Round Planning", "Screening Cohort List")
 
     rlp_cohort_list_page.click_create_screening_cohort_by_outcode_btn()
-    page.wait_for_timeout(3000)
     rlp_cohort_list_page.select_default_screening_unit_dropdown(None)
     dropdown_count = rlp_cohort_list_page.number_of_unit_dropdown_count()
 
@@ -265,17 +259,15 @@ def test_outcode_added_gp_practices_are_visible(
     UserTools().login_and_navigate(page, "Read Only BSO User - BS2", "Round Planning", "Screening Cohort List")
 
     rlp_cohort_list_page.click_create_screening_cohort_by_outcode_btn()
-    page.wait_for_timeout(3000)
     # including outcode
     rlp_cohort_list_page.click_select_outcodes_btn()
     rlp_cohort_list_page.enter_outcode_filter("EX1")
     rlp_cohort_list_page.click_add_btn_to_select_outcode("EX1")
     rlp_cohort_list_page.click_done_btn_gp_practices_include_popup()
-    page.wait_for_timeout(3000)
     included_outcodes = page.locator(
         "//table[@id='practicesToIncludeList']//tr//td[2]"
-    ).count()
-    assert included_outcodes == 1
+    )
+    expect(included_outcodes).to_have_count(1)
 
     # attempt to add the same outcode the add btn is not present 2nd time - negative test
     rlp_cohort_list_page.click_select_outcodes_btn()
@@ -292,7 +284,6 @@ def test_selects_to_remove_outcodes(page: Page, rlp_cohort_list_page: CohortList
     UserTools().login_and_navigate(page, "Read Only BSO User - BS2", "Round Planning", "Screening Cohort List")
 
     rlp_cohort_list_page.click_create_screening_cohort_by_outcode_btn()
-    page.wait_for_timeout(3000)
     # including outcodes
     rlp_cohort_list_page.click_select_outcodes_btn()
     rlp_cohort_list_page.enter_outcode_filter("EX1")
@@ -339,7 +330,6 @@ def test_outcode_click_save_without_filling_all_mandatory_fields(
     UserTools().login_and_navigate(page, "Read Only BSO User - BS2", "Round Planning", "Screening Cohort List")
 
     rlp_cohort_list_page.click_create_screening_cohort_by_outcode_btn()
-    page.wait_for_timeout(3000)
     rlp_cohort_list_page.click_create_screening_cohort_save_btn()
     # expected error messages to be visible
     expect(page.get_by_text("Screening Cohort Name must be populated")).to_be_visible()
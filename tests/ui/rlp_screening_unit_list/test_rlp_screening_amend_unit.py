@@ -22,7 +22,6 @@ def test_amend_screening_unit_name_verify_the_paging_count(
     UserTools().user_login(page, "BSO User - BS1")
     MainMenuPage(page).select_menu_option("Round Planning", "Screening Unit List")
     rlp_unit_list_page.select_status_dropdown("All")
-    page.wait_for_timeout(3000)
     db_row_count = rlp_unit_list_page.screening_unit_list_count_in_db(db_util)
     ui_row_count = rlp_unit_list_page.extract_paging_unit_list_count()
     assert db_row_count == int(ui_row_count)
@@ -34,7 +33,7 @@ def test_amend_screening_unit_name_verify_the_paging_count(
     amend_unit_name = f"amend_name-{datetime.now()}"
     rlp_unit_list_page.enter_amend_screening_unit_name(amend_unit_name)
     rlp_unit_list_page.click_amend_screening_unit_btn_on_pop_up_window()
-    page.wait_for_timeout(3000)
+    rlp_unit_list_page.wait_for_pop_up_window_to_close()
     ScreenshotTool(page).take_screenshot("rlp_unit_amend_tc_16_18_21.1")
     amend_db_row_count = rlp_unit_list_page.screening_unit_list_count_in_db(
         db_util
@@ -53,7 +52,6 @@ def test_amend_screening_unit_name_using_min_max_char_length(
     UserTools().user_login(page, "BSO User - BS1")
     MainMenuPage(page).select_menu_option("Round Planning", "Screening Unit List")
     rlp_unit_list_page.select_status_dropdown("All")
-    page.wait_for_timeout(3000)
     unit_name = f"unit_name-{datetime.now()}"
     rlp_unit_list_page.create_unit(unit_name)
     ScreenshotTool(page).take_screenshot("rlp_unit_amend_tc_18_19_20")
@@ -65,7 +63,7 @@ def test_amend_screening_unit_name_using_min_max_char_length(
     rlp_unit_list_page.select_amend_unit_status_radio_btn("INACTIVE")
     rlp_unit_list_page.select_amend_unit_type_radio_btn("STATIC")
     rlp_unit_list_page.click_amend_screening_unit_btn_on_pop_up_window()
-    page.wait_for_timeout(3000)
+    rlp_unit_list_page.wait_for_pop_up_window_to_close()
     rlp_unit_list_page.filter_unit_by_name(amend_unit_name)
     ScreenshotTool(page).take_screenshot("rlp_unit_amend_tc_18_19_20.1")
     assert page.wait_for_selector("//tr//td[4]").text_content() == amend_unit_name
@@ -84,7 +82,6 @@ def test_cancel_amend_screening_unit(
     UserTools().user_login(page, "BSO User - BS1")
     MainMenuPage(page).select_menu_option("Round Planning", "Screening Unit List")
     rlp_unit_list_page.select_status_dropdown("All")
-    page.wait_for_timeout(3000)
     db_row_count = rlp_unit_list_page.screening_unit_list_count_in_db(db_util)
     ui_row_count = rlp_unit_list_page.extract_paging_unit_list_count()
     assert db_row_count == int(ui_row_count)
@@ -95,7 +92,7 @@ def test_cancel_amend_screening_unit(
     amend_unit_name = f"amend_name-{datetime.now()}"
     rlp_unit_list_page.enter_amend_screening_unit_name(amend_unit_name)
     rlp_unit_list_page.click_cancel_btn_on_amend_screening_unit_pop_up_window()
-    page.wait_for_timeout(3000)
+    rlp_unit_list_page.wait_for_pop_up_window_to_close()
     ScreenshotTool(page).take_screenshot("rlp_unit_amend_tc_16")
     amend_db_row_count = rlp_unit_list_page.screening_unit_list_count_in_db(
         db_util
@@ -132,7 +129,7 @@ def test_amend_screening_unit_days_and_notes(
     )
     rlp_unit_list_page.enter_amend_screening_unit_notes(amend_notes)
     rlp_unit_list_page.click_amend_screening_unit_btn_on_pop_up_window()
-    page.wait_for_timeout(3000)
+    rlp_unit_list_page.wait_for_pop_up_window_to_close()
     rlp_unit_list_page.filter_unit_by_name(amend_unit_name)
     rlp_unit_list_page.dbl_click_on_filtered_unit_name()
     amended_day_values = rlp_unit_list_page.get_day_appointment_value()
@@ -249,8 +246,8 @@ def test_user2_from_same_bso_can_access_the_user1_amended_data(
     amend_unit_name = f"amend_name-{datetime.now()}"
     rlp_unit_list_page.enter_amend_screening_unit_name(amend_unit_name)
     rlp_unit_list_page.click_amend_screening_unit_btn_on_pop_up_window()
+    rlp_unit_list_page.wait_for_pop_up_window_to_close()
     context.clear_cookies()
-    page.wait_for_timeout(500)
     # Logged on as BSS_SO1 user2
     UserTools().user_login(page, "BSO User2 - BS1")
     MainMenuPage(page).select_menu_option("Round Planning", "Screening Unit List")
@@ -56,7 +56,7 @@ def test_screening_unit_creation(
     }
     rlp_unit_list_page.add_screening_unit(unit_data, unit_type, unit_status)
     rlp_unit_list_page.click_add_screening_unit_btn_on_pop_up_window()
-    page.wait_for_timeout(3000)
+    rlp_unit_list_page.wait_for_pop_up_window_to_close()
     rlp_unit_list_page.verify_screening_unit_by_name(unit_name)
     ScreenshotTool(page).take_screenshot(f"rlp_unit_tc_4_7_8_9_10_{unit_type}_{unit_status}")
     count_after = rlp_unit_list_page.screening_unit_list_count_in_db(db_util)
@@ -78,7 +78,7 @@ def test_screening_unit_cancellation(
     rlp_unit_list_page.enter_screening_unit_name_txt_box(unit_name)
     rlp_unit_list_page.select_status_mobile_radio_btn()
     rlp_unit_list_page.click_cancel_btn_on_pop_up_window()
-    page.wait_for_timeout(3000)
+    rlp_unit_list_page.wait_for_pop_up_window_to_close()
     rlp_unit_list_page.verify_unit_has_no_matching_records_available_in_the_table(
         unit_name
     )
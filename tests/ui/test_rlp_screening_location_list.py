@@ -110,7 +110,6 @@ def test_create_location_valid_data_positive(
     rlp_location_list_page.enter_screening_location_name(location_name)
     rlp_location_list_page.click_add_screening_location_btn_on_popup()
     rlp_location_list_page.enter_screening_location_filter_textbox(location_name)
-    page.wait_for_timeout(4000)
     # Capturing the search value and stored it in the search_value
     search_value = page.locator("//tbody/tr/td[2]").text_content()
     # asserting the location_name and search_value
@@ -358,7 +357,7 @@ def test_location_linked_to_multiple_cohorts(
         rlp_cohort_list_page.select_default_screening_location_dropdown(location_name)
         rlp_cohort_list_page.select_default_screening_unit_dropdown("Batman")
         rlp_cohort_list_page.click_create_screening_cohort_save_btn()
-        page.wait_for_timeout(3000)
+        rlp_cohort_list_page.wait_for_cohort_list()
 
     location_name = "Aldi - Caldecott County Retail Park"
     cohort_name = f"Multiple_cohorts-{datetime.now()}"
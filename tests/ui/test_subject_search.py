@@ -255,15 +255,15 @@ def ensure_sorted_column(page, header_selector, column_index, value_type, screen
             return [datetime.strptime(val.strip(), "%d-%b-%Y") for val in cells]
         return [val.strip() for val in cells]
 
+    table = TableUtils(page, "#subjectList")
+
     # Initial click
-    page.click(header_selector)
-    page.wait_for_timeout(1000)
+    table.perform_and_wait_for_redraw(lambda: page.click(header_selector))
     values = get_values()
 
     if values != sorted(values):
         # Try again in case the table was sorted in descending order by default
-        page.click(header_selector)
-        page.wait_for_timeout(1000)
+        table.perform_and_wait_for_redraw(lambda: page.click(header_selector))
         values = get_values()
 
     ScreenshotTool(page).take_screenshot(screenshot_name)
@@ -0,0 +1,121 @@
+import time
+import pytest
+from playwright.sync_api import Playwright
+from utils.api_stand_in import LOGIN_PATH, ApiStandIn, DataTablesEndpoint, generate_row, meets
+from utils.api_utils import ApiUtils
+
+
+pytestmark = [pytest.mark.utils]
+
+BSO_USER = {"role_type": "BSO User", "hub": "BS1"}
+NATIONAL_USER = {"role_type": "National User"}
+HELPDESK_USER = {"role_type": "Helpdesk User"}
+
+
+def practices_endpoint() -> DataTablesEndpoint:
+    return DataTablesEndpoint.from_config(
+        "/bss/gpPractice/search",
+        {
+            "bso_field": "bso.code",
+            "forbidden_role_types": ["Helpdesk User"],
+            "rows": [{"code": "A12345", "name": "Mega Practice", "bso": {"code": "BS1"}, "active": False}],
+            "filters": {"columnSearchText[active]": {"NO": {"field": "active", "equals": False}}},
+            "generate": [
+                {
+                    "count": 60,
+                    "template": {
+                        "code": "A82{index:03d}",
+                        "name": "Practice {number}",
+                        "bso": {"code": ["BS1", "BS2", "BS3"]},
+                        "active": True,
+                    },
+                },
+            ],
+        },
+    )
+
+
+def test_generate_row() -> None:
+    template = {"code": "GP{index:03d}", "bso": {"code": ["BS1", "BS2"]}, "date": "2024-{month:02d}-{day:02d}", "age": 50}
+    assert generate_row(template, 0) == {"code": "GP000", "bso": {"code": "BS1"}, "date": "2024-01-01", "age": 50}
+    assert generate_row(template, 29) == {"code": "GP029", "bso": {"code": "BS2"}, "date": "2024-06-02", "age": 50}
+
+
+def test_data_tables_search() -> None:
+    endpoint = practices_endpoint()
+
+    status, data = endpoint.search({"draw": "3", "start": "0", "length": "10"}, BSO_USER)
+    assert status == 200
+    assert data["draw"] == 3
+    assert data["recordsTotal"] == data["recordsFiltered"] == 21
+    assert len(data["results"]) == 10
+    assert all(row["bso"]["code"] == "BS1" for row in data["results"])
+    assert endpoint.search({}, NATIONAL_USER)[1]["recordsTotal"] == 61
+    assert endpoint.search({}, HELPDESK_USER) == (403, None)
+
+    # Column searches match the start of the value (ignoring case), and booleans exactly
+    status, data = endpoint.search(
+        {"columnSearchText[code]": "a82", "columnSearchText[bso.code]": "BS2", "length": "-1"}, NATIONAL_USER
+    )
+    assert data["recordsFiltered"] == 20
+    assert data["recordsTotal"] == 61
+    _, data = endpoint.search({"columnSearchText[active]": "false"}, NATIONAL_USER)
+    assert [row["name"] for row in data["results"]] == ["Mega Practice"]
+
+    # Filtered values apply their condition instead, and NHS numbers are searched without their spaces
+    _, data = endpoint.search({"columnSearchText[active]": "NO"}, NATIONAL_USER)
+    assert [row["name"] for row in data["results"]] == ["Mega Practice"]
+    assert meets({"age": 72}, {"field": "age", "below": 80})
+    assert not meets({"age": None}, {"field": "age", "below": 80})
+    assert meets({"closed": "2024-01-01"}, {"field": "closed", "not_equals": None})
+    assert meets({}, {})
+    nhs_endpoint = DataTablesEndpoint("/bss/subject/search", [{"nhsNumber": "9300000015"}, {"nhsNumber": "9300000016"}])
+    _, data = nhs_endpoint.search({"columnSearchText[nhsNumber]": "930 000 0015"}, NATIONAL_USER)
+    assert data["results"] == [{"nhsNumber": "9300000015"}]
+
+    # Sorting applies in the order given, with paging applied afterwards
+    _, data = endpoint.search(
+        {
+            "columnSortDirectionWithOrder[0bso.code]": "desc",
+            "columnSortDirectionWithOrder[1code]": "asc",
+            "start": "1",
+            "length": "2",
+        },
+        NATIONAL_USER,
+    )
+    assert [row["code"] for row in data["results"]] == ["A82005", "A82008"]
+
+
+def test_stand_in_server(playwright: Playwright) -> None:
+    with ApiStandIn({"/bss/gpPractice/search": practices_endpoint()}, latency_per_row=0.001) as stand_in:
+        session = playwright.request.new_context(base_url=stand_in.base_url)
+        try:
+            assert session.get("/bss/gpPractice/search").status == 401
+            assert session.post(LOGIN_PATH, form={"user": "Invalid User"}).status == 401
+            assert session.post(LOGIN_PATH, form={"user": "BSO User - BS1"}).ok
+            assert session.get("/bss/unknown/search").status == 404
+
+            api = ApiUtils(session, "/bss/gpPractice/search")
+            start_time = time.perf_counter()
+            rows = list(api.iter_results({"columnSortDirectionWithOrder[0code]": "asc"}, page_size=5, prefetch=True))
+            assert time.perf_counter() - start_time >= 0.021
+            assert [row["code"] for row in rows][:2] == ["A12345", "A82000"]
+            assert len(rows) == 21
+        finally:
+            session.dispose()
+
+        session = playwright.request.new_context(base_url=stand_in.base_url)
+        try:
+            session.post(LOGIN_PATH, form={"user": "Helpdesk User"})
+            assert ApiUtils(session, "/bss/gpPractice/search").get_request({}, False) == 403
+        finally:
+            session.dispose()
+
+
+def test_endpoints_file() -> None:
+    stand_in = ApiStandIn.from_file()
+    try:
+        assert "/bss/report/ceasing/search" in stand_in.endpoints
+        assert all(endpoint.rows for endpoint in stand_in.endpoints.values())
+    finally:
+        stand_in.server.server_close()
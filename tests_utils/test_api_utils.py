@@ -0,0 +1,169 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import pytest
+from utils.api_utils import ApiUtils, ApiUtilsException
+
+
+pytestmark = [pytest.mark.utils]
+
+
+class StubResponse:
+    def __init__(self, url: str, data: dict) -> None:
+        self.url = url
+        self.ok = True
+        self.status = 200
+        self.data = data
+
+    def body(self) -> bytes:
+        return json.dumps(self.data).encode()
+
+
+class StubLoginPageResponse(StubResponse):
+    def body(self) -> bytes:
+        return b"<!DOCTYPE html><html><head><title>Sign in</title></head></html>"
+
+
+class StubRequestContext:
+    """Serves DataTables style pages from a list of rows, recording each request made"""
+
+    def __init__(self, rows: list, base_url: str = "https://localhost") -> None:
+        self.rows = rows
+        self.base_url = base_url
+        self.requests = []
+
+    def get(self, url: str, params: dict) -> StubResponse:
+        self.requests.append(params)
+        return StubResponse(f"{self.base_url}{url}", search_page(self.rows, params))
+
+    def storage_state(self) -> dict:
+        cookie = {
+            "name": "JSESSIONID",
+            "value": "abc",
+            "domain": "127.0.0.1",
+            "path": "/",
+            "expires": -1,
+            "httpOnly": False,
+            "secure": False,
+            "sameSite": "Lax",
+        }
+        return {"cookies": [cookie], "origins": []}
+
+
+def search_page(rows: list, params: dict) -> dict:
+    start, length = int(params.get("start", 0)), int(params.get("length", 10))
+    return {
+        "draw": int(params.get("draw", 1)),
+        "recordsTotal": len(rows),
+        "recordsFiltered": len(rows),
+        "results": rows[start : start + length],
+    }
+
+
+@pytest.fixture
+def search_server():
+    """Serves DataTables style pages over HTTP, rejecting requests without the session cookie"""
+    rows = [{"id": i} for i in range(25)]
+    headers_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            headers_seen.append(self.headers.get("X-Api-Test"))
+            if self.headers.get("Cookie") != "JSESSIONID=abc":
+                self.send_response(403)
+                self.end_headers()
+                return
+            params = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+            body = json.dumps(search_page(rows, params)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield rows, f"http://127.0.0.1:{server.server_port}", headers_seen
+    server.shutdown()
+
+
+def test_iter_results() -> None:
+    rows = [{"id": i} for i in range(25)]
+    request_context = StubRequestContext(rows)
+    api = ApiUtils(request_context, "/bss/subjects/search")
+
+    results = list(api.iter_results({"draw": "1", "start": "0"}, page_size=10))
+
+    assert results == rows
+    assert [request["start"] for request in request_context.requests] == ["0", "10", "20"]
+    assert [request["draw"] for request in request_context.requests] == ["1", "2", "3"]
+
+
+def test_iter_results_is_lazy() -> None:
+    request_context = StubRequestContext([{"id": i} for i in range(25)])
+    api = ApiUtils(request_context, "/bss/subjects/search")
+
+    iterator = api.iter_results({}, page_size=10)
+    assert next(iterator) == {"id": 0}
+    assert len(request_context.requests) == 1
+
+
+def test_adapt_page_size() -> None:
+    assert ApiUtils._adapt_page_size(100, 0.1, 1000) == 200
+    assert ApiUtils._adapt_page_size(800, 0.1, 1000) == 1000
+    assert ApiUtils._adapt_page_size(100, 0.7, 1000) == 100
+    assert ApiUtils._adapt_page_size(100, 5, 1000) == 50
+    assert ApiUtils._adapt_page_size(15, 5, 1000) == 10
+
+
+def test_iter_results_prefetch(search_server) -> None:
+    rows, base_url, _ = search_server
+    request_context = StubRequestContext(rows, base_url)
+    api = ApiUtils(request_context, "/bss/subjects/search")
+
+    results = list(api.iter_results({}, page_size=10, prefetch=True))
+
+    assert results == rows
+    assert len(request_context.requests) == 1
+
+
+def test_get_requests(search_server) -> None:
+    rows, base_url, headers_seen = search_server
+    request_context = StubRequestContext(rows, base_url)
+    api = ApiUtils(
+        request_context,
+        "/bss/subjects/search",
+        context_options={"extra_http_headers": {"X-Api-Test": "1"}},
+    )
+    parameters_list = [{"start": str(start), "length": "1"} for start in range(20)]
+
+    results = api.get_requests(parameters_list, max_concurrency=4)
+
+    assert [result.parameters for result in results] == parameters_list
+    assert [result.data["results"] for result in results] == [[row] for row in rows[:20]]
+    assert all(result.status == 200 and result.elapsed >= 0 for result in results)
+    # The concurrent requests are sent with the session's cookies and context options
+    assert headers_seen == ["1"] * 19
+
+    # The background sender is started once, and reused for later calls
+    sender = api._sender
+    api.get_requests(parameters_list[:3])
+    list(api.iter_results({}, page_size=10, prefetch=True))
+    assert api._sender is sender
+    api.close()
+    assert api._sender is None
+    assert not sender._thread.is_alive()
+
+
+def test_non_json_response() -> None:
+    request_context = StubRequestContext([])
+    request_context.get = lambda url, params: StubLoginPageResponse(url, {})
+    api = ApiUtils(request_context, "/bss/subjects/search")
+
+    with pytest.raises(ApiUtilsException, match="/bss/subjects/search returned a non-JSON response"):
+        api.get_request({})
+    with pytest.raises(ApiUtilsException, match="login page"):
+        api.get_requests([{}])
@@ -0,0 +1,87 @@
+import io
+import json
+import os
+import threading
+import pytest
+import utils.backup_cache
+from utils.backup_cache import BackupCache
+
+
+pytestmark = [pytest.mark.utils]
+
+
+class StubS3Client:
+    def __init__(self, objects: dict[str, bytes], etag: str = '"abc123"') -> None:
+        self.objects = objects
+        self.etag = etag
+        self.ranges = []
+        self.lock = threading.Lock()
+
+    def head_object(self, Bucket: str, Key: str) -> dict:
+        return {"ETag": self.etag, "ContentLength": len(self.objects[Key])}
+
+    def get_object(self, Bucket: str, Key: str, Range: str, IfMatch: str) -> dict:
+        assert IfMatch == self.etag
+        start, end = (int(value) for value in Range.removeprefix("bytes=").split("-"))
+        with self.lock:
+            self.ranges.append((start, end))
+        return {"Body": io.BytesIO(self.objects[Key][start : end + 1])}
+
+
+@pytest.fixture(autouse=True)
+def small_parts(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(utils.backup_cache, "PART_SIZE", 10)
+
+
+def test_download_and_cache_hit(tmp_path) -> None:
+    data = bytes(range(95))
+    s3 = StubS3Client({"backups/db.dump": data})
+    cache = BackupCache(tmp_path, max_bytes=1000)
+
+    path = cache.get(s3, "bucket", "backups/db.dump")
+    assert path.read_bytes() == data
+    assert path.suffix == ".dump"
+    assert len(s3.ranges) == 10
+    assert sorted(os.listdir(tmp_path)) == [path.name]
+
+    # A second request for the same version should not download anything
+    assert cache.get(s3, "bucket", "backups/db.dump") == path
+    assert len(s3.ranges) == 10
+
+    # A new version of the object is downloaded again
+    s3.etag = '"def456"'
+    assert cache.get(s3, "bucket", "backups/db.dump") != path
+    assert len(s3.ranges) == 20
+
+
+def test_resume_partial_download(tmp_path) -> None:
+    data = bytes(range(30))
+    s3 = StubS3Client({"db.dump": data})
+    cache = BackupCache(tmp_path, max_bytes=1000)
+
+    # Simulate an interrupted download where only the second part completed
+    destination = cache.cached_file_path("bucket", "db.dump", "abc123")
+    part_file = destination.with_name(destination.name + ".part")
+    part_file.write_bytes(b"\x00" * 10 + data[10:20] + b"\x00" * 10)
+    destination.with_name(destination.name + ".part.json").write_text(
+        json.dumps({"completed_parts": [1]})
+    )
+
+    assert cache.get(s3, "bucket", "db.dump").read_bytes() == data
+    assert sorted(s3.ranges) == [(0, 9), (20, 29)]
+    assert not part_file.exists()
+
+
+def test_evict_least_recently_used(tmp_path) -> None:
+    s3 = StubS3Client({"a.dump": b"a" * 40, "b.dump": b"b" * 40, "c.dump": b"c" * 40})
+    cache = BackupCache(tmp_path, max_bytes=100)
+
+    a = cache.get(s3, "bucket", "a.dump")
+    b = cache.get(s3, "bucket", "b.dump")
+    os.utime(b, (1, 1))
+    os.utime(a, (2, 2))
+    c = cache.get(s3, "bucket", "c.dump")
+
+    assert a.exists()
+    assert not b.exists()
+    assert c.exists()
@@ -0,0 +1,143 @@
+import time
+import pytest
+from utils.context_pool import ContextPool, ContextPoolException
+from utils.user_tools import UserTools
+
+
+pytestmark = [pytest.mark.utils]
+
+
+class StubLocator:
+    def count(self) -> int:
+        return 0
+
+
+class StubPage:
+    def __init__(self, context: "StubContext") -> None:
+        self.context = context
+        self.url = "about:blank"
+        self.visited = []
+        self.evaluated = []
+        self.closed = False
+
+    def goto(self, url: str) -> None:
+        self.visited.append(url)
+        # Opening the application after logging out redirects to the login page
+        self.url = "https://example.auth.eu-west-2.amazoncognito.com/login" if self.context.logged_out else url
+
+    def locator(self, selector: str) -> StubLocator:
+        return StubLocator()
+
+    def route(self, url: str, handler: object) -> None:
+        pass
+
+    def unroute(self, url: str) -> None:
+        pass
+
+    def evaluate(self, script: str) -> None:
+        self.evaluated.append(script)
+
+    def close(self) -> None:
+        self.closed = True
+        self.context.pages.remove(self)
+
+
+class StubContext:
+    def __init__(self, username: str, cookies: list) -> None:
+        self.username = username
+        self._cookies = cookies
+        self.pages = []
+        self.closed = False
+        self.logged_out = False
+
+    def new_page(self) -> StubPage:
+        page = StubPage(self)
+        self.pages.append(page)
+        return page
+
+    def cookies(self) -> list:
+        return self._cookies
+
+    def unroute_all(self, behavior: str) -> None:
+        pass
+
+    def clear_permissions(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def created(monkeypatch: pytest.MonkeyPatch) -> list:
+    created = []
+
+    def new_authenticated_context(
+        self, browser: object, username: str, use_cached_session: bool = True, **context_args
+    ) -> StubContext:
+        assert context_args == {"base_url": "https://bss.example.com/bss"}
+        # Pooled contexts have their own session, so are not logged out when the cached session is
+        assert not use_cached_session
+        context = StubContext(username, [{"name": "JSESSIONID", "value": "abc", "expires": -1}])
+        created.append(context)
+        return context
+
+    monkeypatch.setattr(UserTools, "new_authenticated_context", new_authenticated_context)
+    return created
+
+
+def test_lease_reuses_reset_context(created: list) -> None:
+    pool = ContextPool(object(), max_idle_per_user=1, base_url="https://bss.example.com/bss")
+    page = pool.lease("BSO User - BS1")
+    popup = page.context.new_page()
+    pool.release(page)
+
+    assert popup.closed
+    assert page.visited == ["/bss", "https://bss.example.com/__context_pool_reset", "about:blank"]
+    assert len(page.evaluated) == 1
+
+    assert pool.lease("BSO User - BS1") is page
+    other_user_page = pool.lease("BSO User - BS2")
+    assert other_user_page is not page
+    assert len(created) == 2
+
+    with pytest.raises(ContextPoolException):
+        pool.release(StubContext("Unknown", []).new_page())
+
+    pool.close()
+    assert all(context.closed for context in created)
+
+
+def test_release_discards_unusable_contexts(created: list) -> None:
+    pool = ContextPool(object(), max_idle_per_user=1, max_uses=2, base_url="https://bss.example.com/bss")
+
+    # Discarded after a failure
+    page = pool.lease("BSO User - BS1")
+    pool.release(page, discard=True)
+    assert page.context.closed
+
+    # Discarded once max_uses is reached
+    page = pool.lease("BSO User - BS1")
+    pool.release(page)
+    assert pool.lease("BSO User - BS1") is page
+    pool.release(page)
+    assert page.context.closed
+
+    # Discarded once the session has expired
+    page = pool.lease("BSO User - BS1")
+    page.context._cookies[0]["expires"] = time.time() - 60
+    pool.release(page)
+    assert page.context.closed
+
+    # Discarded once the test has logged out, even though its cookies have not expired
+    page = pool.lease("BSO User - BS1")
+    page.context.logged_out = True
+    pool.release(page)
+    assert page.context.closed
+
+    # Only max_idle_per_user contexts are kept
+    first, second = pool.lease("BSO User - BS1"), pool.lease("BSO User - BS1")
+    pool.release(first)
+    pool.release(second)
+    assert not first.context.closed
+    assert second.context.closed
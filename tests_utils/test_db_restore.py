@@ -0,0 +1,346 @@
+import gzip
+import io
+import os
+import psycopg2
+import psycopg2.errors
+import sys
+from pathlib import Path
+import pytest
+import utils.db_restore
+from utils.db_restore import DbRestore, DbRestoreException
+
+
+pytestmark = [pytest.mark.utils]
+
+
+def test_detect_dump_format(tmp_path) -> None:
+    plain = tmp_path / "plain.sql"
+    plain.write_text("CREATE TABLE subjects (nhs_number text);")
+    assert DbRestore.detect_dump_format(str(plain)) == "plain"
+
+    custom = tmp_path / "custom.dump"
+    custom.write_bytes(b"PGDMP\x01\x0e\x00" + b"\x00" * 100)
+    assert DbRestore.detect_dump_format(str(custom)) == "custom"
+
+    tar = tmp_path / "backup.tar"
+    tar.write_bytes(b"\x00" * 257 + b"ustar" + b"\x00" * 250)
+    assert DbRestore.detect_dump_format(str(tar)) == "tar"
+
+    directory = tmp_path / "directory_dump"
+    directory.mkdir()
+    with pytest.raises(DbRestoreException):
+        DbRestore.detect_dump_format(str(directory))
+    (directory / "toc.dat").write_bytes(b"PGDMP")
+    assert DbRestore.detect_dump_format(str(directory)) == "directory"
+
+
+def test_run_restore_command() -> None:
+    DbRestore.run_restore_command(
+        "data", [sys.executable, "-c", "import sys; sys.stderr.write('processing data\\n')"]
+    )
+
+    with pytest.raises(DbRestoreException) as error:
+        DbRestore.run_restore_command(
+            "post-data",
+            [sys.executable, "-c", "import sys; sys.stderr.write('index failed\\n'); sys.exit(1)"],
+        )
+    assert "exit code 1" in str(error.value)
+    assert "index failed" in str(error.value)
+
+
+def test_run_restore_command_with_stdin() -> None:
+    check_stdin = "import sys; sys.exit(0 if sys.stdin.buffer.read() == b'abcdef' else 1)"
+    DbRestore.run_restore_command(
+        "restore", [sys.executable, "-c", check_stdin], iter([b"abc", b"def"])
+    )
+
+    def failing_download():
+        yield b"abc"
+        raise OSError("Connection reset")
+
+    # Even though the command succeeds, a failure reading the backup should fail the restore
+    with pytest.raises(DbRestoreException) as error:
+        DbRestore.run_restore_command(
+            "restore",
+            [sys.executable, "-c", "import sys; sys.stdin.buffer.read()"],
+            failing_download(),
+        )
+    assert "Connection reset" in str(error.value)
+
+
+# Stands in for psql: like psql, a failing statement only gives a non-zero exit code when ON_ERROR_STOP is set
+FAKE_PSQL = """#!{python}
+import sys
+script = sys.stdin.read() if sys.argv[-1] == "-" else open(sys.argv[-1]).read()
+if "ERROR" in script:
+    sys.stderr.write("psql:backup.sql:2: ERROR:  relation \\"subjects\\" already exists\\n")
+    sys.exit(3 if "ON_ERROR_STOP=1" in sys.argv else 0)
+"""
+
+
+def test_failing_psql_script_raises(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    psql = tmp_path / "bin" / "psql"
+    psql.parent.mkdir()
+    psql.write_text(FAKE_PSQL.format(python=sys.executable))
+    psql.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{psql.parent}{os.pathsep}{os.environ['PATH']}")
+    for name, value in {"PG_HOST": "localhost", "PG_PORT": "5432", "PG_USER": "bss", "PG_DBNAME": "bss"}.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setenv("PG_PASS", "password")
+    script = b"CREATE TABLE subjects (nhs_number text);\nERROR\n"
+
+    restore = DbRestore()
+    restore.local_backup_path = str(tmp_path / "backup.sql")
+    Path(restore.local_backup_path).write_bytes(script)
+    with pytest.raises(DbRestoreException, match="exit code 3"):
+        restore.restore_backup()
+
+    with pytest.raises(DbRestoreException, match="already exists"):
+        DbRestore().stream_restore(io.BytesIO(script))
+
+
+def test_decompressed_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(utils.db_restore, "STREAM_CHUNK_SIZE", 16)
+    sql = b"CREATE TABLE subjects (nhs_number text);\n" * 20
+
+    assert b"".join(DbRestore.decompressed_chunks(io.BytesIO(sql))) == sql
+    assert b"".join(DbRestore.decompressed_chunks(io.BytesIO(gzip.compress(sql)))) == sql
+
+
+def test_stream_restore(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    restored = {}
+
+    def fake_run_restore_command(phase, command, stdin_chunks=None):
+        restored["command"] = command
+        restored["data"] = b"".join(stdin_chunks)
+
+    monkeypatch.setattr(DbRestore, "run_restore_command", staticmethod(fake_run_restore_command))
+    monkeypatch.setenv("PG_PASS", "password")
+
+    # A local file stands in for the S3 object
+    backup = tmp_path / "backup.sql.gz"
+    sql = b"CREATE TABLE subjects (nhs_number text);\n" * 100
+    backup.write_bytes(gzip.compress(sql))
+    with open(backup, "rb") as source:
+        DbRestore().stream_restore(source)
+    assert restored["command"][0] == "psql"
+    assert restored["command"][-2:] == ["-f", "-"]
+    assert restored["data"] == sql
+
+    # Custom format backups are restored with one job, as pg_restore cannot seek within stdin
+    monkeypatch.setenv("PG_RESTORE_JOBS", "8")
+    custom = b"PGDMP" + b"\x00" * 1000
+    DbRestore().stream_restore(io.BytesIO(gzip.compress(custom)))
+    assert restored["command"][0] == "pg_restore"
+    assert "--format=custom" in restored["command"]
+    assert "--jobs=1" in restored["command"]
+    assert "--jobs=8" not in restored["command"]
+    assert restored["data"] == custom
+
+
+def test_changed_tables() -> None:
+    baseline = {"bss.subjects": [2, "aaa"], "bss.pi_changes": [0, "bbb"], "bss.rlp_units": [5, "ccc"]}
+    current = {"bss.subjects": [3, "ddd"], "bss.pi_changes": [0, "bbb"], "bss.new_table": [0, "eee"]}
+    assert DbRestore.changed_tables(baseline, current) == [
+        "bss.new_table",
+        "bss.rlp_units",
+        "bss.subjects",
+    ]
+    assert DbRestore.changed_tables(baseline, baseline) == []
+
+
+def test_selective_db_restore(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    monkeypatch.setenv("DB_TABLE_EXTRACT_DIR", str(tmp_path))
+    calls = []
+    restore = DbRestore()
+    monkeypatch.setattr(restore, "get_backup_etag", lambda: "etag1")
+    monkeypatch.setattr(restore, "full_db_restore", lambda: calls.append("full"))
+    monkeypatch.setattr(restore, "reset_changed_tables", lambda: calls.append("reset"))
+    monkeypatch.setattr(
+        restore, "record_table_baseline", lambda etag: calls.append(f"baseline {etag}")
+    )
+
+    # With no baseline, a full restore is needed
+    with pytest.raises(DbRestoreException):
+        DbRestore.reset_changed_tables(restore)
+    restore.selective_db_restore()
+    assert calls == ["full", "baseline etag1"]
+
+    # With a baseline for the current backup, only the changed tables are reset
+    calls.clear()
+    restore.table_baseline_path().write_text('{"etag": "etag1", "tables": {}, "sequences": {}}')
+    restore.selective_db_restore()
+    assert calls == ["reset"]
+
+    # A baseline for an older backup is replaced
+    calls.clear()
+    monkeypatch.setattr(restore, "get_backup_etag", lambda: "etag2")
+    restore.selective_db_restore()
+    assert calls == ["full", "baseline etag2"]
+
+
+class StubCursor:
+    def __init__(self, conn: "StubConnection") -> None:
+        self.conn = conn
+
+    def __enter__(self) -> "StubCursor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def execute(self, query: str, params: tuple = None) -> None:
+        self.conn.server.executed.append((query, params))
+        if self.conn.server.error is not None and self.conn.server.error[0] in query:
+            raise self.conn.server.error[1]
+
+    def fetchone(self) -> tuple | None:
+        query = self.conn.server.executed[-1][0]
+        return next(
+            (row for text, row in self.conn.server.rows.items() if text in query), None
+        )
+
+
+class StubConnection:
+    def __init__(self, server: "StubServer") -> None:
+        self.server = server
+        self.autocommit = False
+
+    def cursor(self) -> StubCursor:
+        return StubCursor(self)
+
+    def commit(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class StubServer:
+    """Records the SQL run through DbRestore's connections, returning a fixed row for any query containing a key of rows"""
+
+    def __init__(self, rows: dict | None = None, error: tuple | None = None) -> None:
+        self.rows = rows or {}
+        self.error = error
+        self.executed = []
+
+    def statements(self) -> list[str]:
+        return [" ".join(query.split()) for query, _ in self.executed]
+
+
+@pytest.fixture
+def snapshot_restore(monkeypatch: pytest.MonkeyPatch) -> DbRestore:
+    monkeypatch.setenv("PG_DBNAME", "bss")
+    monkeypatch.setenv("PG_USER", "bss_user")
+    monkeypatch.delenv("PG_TEMPLATE_DBNAME", raising=False)
+    restore = DbRestore()
+    restore.server = StubServer()
+    monkeypatch.setattr(
+        restore, "create_connection", lambda super=False, dbname=None: StubConnection(restore.server)
+    )
+    return restore
+
+
+def test_get_template_etag(snapshot_restore: DbRestore) -> None:
+    assert snapshot_restore.template_db_name == "bss_template"
+    # The template is missing
+    assert snapshot_restore.get_template_etag() is None
+    assert snapshot_restore.server.executed[-1][1] == ("bss_template",)
+
+    snapshot_restore.server.rows = {"shobj_description": ("dbrestore etag=abc123",)}
+    assert snapshot_restore.get_template_etag() == "abc123"
+    # The template was not created by DbRestore
+    snapshot_restore.server.rows = {"shobj_description": ("Some other comment",)}
+    assert snapshot_restore.get_template_etag() is None
+    snapshot_restore.server.rows = {"shobj_description": (None,)}
+    assert snapshot_restore.get_template_etag() is None
+
+
+def test_create_template_from_db(snapshot_restore: DbRestore) -> None:
+    snapshot_restore.server.rows = {"SELECT 1 FROM pg_database": (1,)}
+    snapshot_restore.create_template_from_db("abc123")
+
+    statements = snapshot_restore.server.statements()
+    assert statements[-8:-3] == [
+        'ALTER DATABASE "bss_template" WITH IS_TEMPLATE false',
+        'DROP DATABASE "bss_template"',
+        # Nothing can reconnect to bss between its sessions being terminated and it being copied
+        'ALTER DATABASE "bss" WITH ALLOW_CONNECTIONS false',
+        "SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE datname = %s AND pid <> pg_backend_pid()",
+        'CREATE DATABASE "bss_template" TEMPLATE "bss"',
+    ]
+    assert statements[-3:] == [
+        'ALTER DATABASE "bss" WITH ALLOW_CONNECTIONS true',
+        'ALTER DATABASE "bss_template" WITH IS_TEMPLATE true ALLOW_CONNECTIONS false',
+        'COMMENT ON DATABASE "bss_template" IS %s',
+    ]
+    assert snapshot_restore.server.executed[-1][1] == ("dbrestore etag=abc123",)
+
+
+def test_create_template_from_db_allows_connections_after_failure(snapshot_restore: DbRestore) -> None:
+    snapshot_restore.server.error = ('TEMPLATE "bss"', psycopg2.errors.ObjectInUse())
+    with pytest.raises(psycopg2.errors.ObjectInUse):
+        snapshot_restore.create_template_from_db("abc123")
+    assert snapshot_restore.server.statements()[-1] == 'ALTER DATABASE "bss" WITH ALLOW_CONNECTIONS true'
+
+
+def test_recreate_db(snapshot_restore: DbRestore) -> None:
+    snapshot_restore.recreate_db()
+    assert 'DROP DATABASE IF EXISTS "bss" WITH (FORCE)' in snapshot_restore.server.statements()
+    assert not any("pg_terminate_backend" in query for query in snapshot_restore.server.statements())
+
+
+def test_create_template_from_db_without_template(snapshot_restore: DbRestore) -> None:
+    snapshot_restore.create_template_from_db("abc123")
+    statements = snapshot_restore.server.statements()
+    assert 'DROP DATABASE "bss_template"' not in statements
+    assert 'CREATE DATABASE "bss_template" TEMPLATE "bss"' in statements
+
+
+def test_recreate_db_from_template(snapshot_restore: DbRestore) -> None:
+    snapshot_restore.recreate_db_from_template()
+    statements = snapshot_restore.server.statements()
+    assert statements[-2:] == [
+        'DROP DATABASE IF EXISTS "bss" WITH (FORCE)',
+        'CREATE DATABASE "bss" TEMPLATE "bss_template" OWNER bss_user',
+    ]
+
+
+def test_snapshot_db_restore(monkeypatch: pytest.MonkeyPatch, snapshot_restore: DbRestore) -> None:
+    calls = []
+    monkeypatch.setattr(snapshot_restore, "get_backup_etag", lambda: "etag2")
+    monkeypatch.setattr(snapshot_restore, "full_db_restore", lambda: calls.append("full"))
+    monkeypatch.setattr(
+        snapshot_restore, "create_template_from_db", lambda etag: calls.append(f"template {etag}")
+    )
+
+    # The template is rebuilt when the backup's ETag changes
+    snapshot_restore.server.rows = {"shobj_description": ("dbrestore etag=etag1",)}
+    snapshot_restore.snapshot_db_restore()
+    assert calls == ["full", "template etag2"]
+    assert not any("TEMPLATE \"bss_template\"" in query for query in snapshot_restore.server.statements())
+
+    # The template is reused when the ETag matches
+    calls.clear()
+    snapshot_restore.server.rows = {"shobj_description": ("dbrestore etag=etag2",)}
+    snapshot_restore.snapshot_db_restore()
+    assert calls == []
+    assert snapshot_restore.server.statements()[-1] == (
+        'CREATE DATABASE "bss" TEMPLATE "bss_template" OWNER bss_user'
+    )
+
+    # The template is rebuilt when it is missing
+    calls.clear()
+    snapshot_restore.server.rows = {}
+    snapshot_restore.snapshot_db_restore()
+    assert calls == ["full", "template etag2"]
+
+    # Or when it goes missing after its ETag is read
+    calls.clear()
+    snapshot_restore.server.rows = {"shobj_description": ("dbrestore etag=etag2",)}
+    snapshot_restore.server.error = (
+        'TEMPLATE "bss_template"',
+        psycopg2.errors.InvalidCatalogName('template database "bss_template" does not exist'),
+    )
+    snapshot_restore.snapshot_db_restore()
+    assert calls == ["full", "template etag2"]
@@ -0,0 +1,347 @@
+import subprocess
+import sys
+import pytest
+from utils.db_util import DbUtil, DbUtilException
+
+
+pytestmark = [pytest.mark.utils]
+
+
+class StubColumn:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+class StubCopy:
+    def __init__(self, statement: object) -> None:
+        self.statement = statement
+        self.rows = []
+
+    def __enter__(self) -> "StubCopy":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def write_row(self, row: tuple) -> None:
+        self.rows.append(row)
+
+
+class StubCursor:
+    def __init__(self, rows: list[tuple], row_factory: object, name: str = None) -> None:
+        self.rows = rows
+        self.row_factory = row_factory
+        self.name = name
+        self.executed = None
+        self.statements = []
+        self.copies = []
+        self.rowcount = -1
+        self.fetched = 0
+        self.description = [StubColumn("count"), StubColumn("letter")]
+
+    def __enter__(self) -> "StubCursor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def execute(self, query: str, params: list | None = None) -> None:
+        self.executed = (query, params)
+        self.statements.append(query)
+        self.rowcount = 1
+
+    def copy(self, statement: object) -> StubCopy:
+        copy = StubCopy(statement)
+        self.copies.append(copy)
+        return copy
+
+    def fetchone(self) -> tuple | None:
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self) -> list[tuple]:
+        return self.rows
+
+    def fetchmany(self, size: int) -> list[tuple]:
+        chunk = self.rows[self.fetched : self.fetched + size]
+        self.fetched += len(chunk)
+        return chunk
+
+
+class StubConnection:
+    def __init__(self, rows: list[tuple] = None) -> None:
+        self.closed = False
+        self.autocommit = False
+        self.rows = rows or []
+        self.cursors = []
+        self.executed = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.notify_timeouts = []
+
+    def cursor(
+        self, name: str = None, row_factory: object = None, withhold: bool = False
+    ) -> StubCursor:
+        cursor = StubCursor(self.rows, row_factory, name)
+        self.cursors.append(cursor)
+        return cursor
+
+    def execute(self, query: object) -> None:
+        self.executed.append(query)
+
+    def commit(self) -> None:
+        self.commits += 1
+
+    def rollback(self) -> None:
+        self.rollbacks += 1
+
+    def notifies(self, timeout: float, stop_after: int) -> list:
+        self.notify_timeouts.append(timeout)
+        return []
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class StubPool:
+    def __init__(self) -> None:
+        self.available = [StubConnection(), StubConnection()]
+        self.returned = []
+
+    def getconn(self, timeout: float | None = None) -> StubConnection:
+        return self.available.pop()
+
+    def putconn(self, conn: StubConnection) -> None:
+        self.returned.append(conn)
+
+
+def test_db_util_borrows_from_pool() -> None:
+    pool = StubPool()
+    db = DbUtil(pool=pool)
+    conn = db.conn
+    assert conn is not None
+    assert len(pool.available) == 1
+
+    db.close()
+    assert pool.returned == [conn]
+    assert not conn.closed
+    assert db.conn is None
+
+    # Closing again should not return the connection twice
+    db.close()
+    assert pool.returned == [conn]
+
+
+def test_db_util_context_manager() -> None:
+    pool = StubPool()
+    with DbUtil(pool=pool) as db:
+        conn = db.conn
+    assert pool.returned == [conn]
+
+
+def test_fetch_methods() -> None:
+    db = DbUtil(pool=StubPool())
+    db.conn = StubConnection([(3, "a"), (5, "b")])
+
+    assert db.fetch_scalar("select count(1) from subjects where nhs_number = %s", ["1"]) == 3
+    assert db.conn.cursors[-1].executed == (
+        "select count(1) from subjects where nhs_number = %s",
+        ["1"],
+    )
+    assert db.fetch_one("select 1") == (3, "a")
+    assert db.fetch_all("select 1") == [(3, "a"), (5, "b")]
+    assert db.fetch_column("select 1") == [3, 5]
+
+    db.conn = StubConnection([])
+    assert db.fetch_scalar("select 1") is None
+    assert db.fetch_one("select 1") is None
+    assert db.fetch_column("select 1") == []
+
+
+def test_stream() -> None:
+    db = DbUtil(pool=StubPool())
+    db.conn = StubConnection([(1, "a"), (2, "b"), (3, "c")])
+
+    rows = db.stream("select * from audit_subjects", chunk_size=2)
+    assert next(rows) == (1, "a")
+    # Nothing beyond the first chunk should have been fetched yet
+    assert db.conn.cursors[-1].fetched == 2
+    assert list(rows) == [(2, "b"), (3, "c")]
+    assert db.conn.cursors[-1].name.startswith("dbutil_stream_")
+
+    chunks = list(db.stream_chunks("select * from audit_subjects", chunk_size=2))
+    assert chunks == [[(1, "a"), (2, "b")], [(3, "c")]]
+
+    frames = list(
+        db.stream_chunks("select * from audit_subjects", chunk_size=2, as_dataframe=True)
+    )
+    assert [len(frame) for frame in frames] == [2, 1]
+    assert list(frames[0].columns) == ["count", "letter"]
+    assert frames[1]["letter"][0] == "c"
+
+
+def test_bulk_load() -> None:
+    db = DbUtil(pool=StubPool())
+    rows = ({"nhs_number": str(9000000000 + i), "message_id": f"id{i}"} for i in range(3))
+
+    assert db.bulk_load("pi_changes", rows) == 3
+    cursor = db.conn.cursors[-1]
+    assert cursor.statements == []
+    assert cursor.copies[0].rows == [
+        ("9000000000", "id0"),
+        ("9000000001", "id1"),
+        ("9000000002", "id2"),
+    ]
+    assert db.conn.commits == 1
+
+    assert db.bulk_load("pi_changes", []) == 0
+
+
+def test_bulk_load_dataframe_with_conflicts() -> None:
+    import pandas as pd
+
+    db = DbUtil(pool=StubPool())
+    df = pd.DataFrame({"nhs_number": ["1", "2"], "state": ["NEW", None]})
+
+    # The stub reports 1 row inserted from the staging table
+    assert db.bulk_load("bss.subjects", df, on_conflict="nothing") == 1
+    cursor = db.conn.cursors[-1]
+    assert cursor.copies[0].rows == [("1", "NEW"), ("2", None)]
+    assert len(cursor.statements) == 2  # Create staging table, insert from staging table
+    # The staging table only has the loaded columns
+    create_staging = cursor.statements[0].as_string(None)
+    assert create_staging.startswith("CREATE TEMPORARY TABLE")
+    assert create_staging.endswith(
+        'ON COMMIT DROP AS SELECT "nhs_number", "state" FROM "bss"."subjects" WITH NO DATA'
+    )
+
+    with pytest.raises(ValueError):
+        db.bulk_load("bss.subjects", df, on_conflict="update")
+
+
+def test_bulk_load_rolls_back_on_error() -> None:
+    db = DbUtil(pool=StubPool())
+
+    def rows():
+        yield {"nhs_number": "1"}
+        raise RuntimeError("Bad row")
+
+    with pytest.raises(RuntimeError):
+        db.bulk_load("subjects", rows())
+    assert db.conn.rollbacks == 1
+    assert db.conn.commits == 0
+
+
+def test_isolation() -> None:
+    def bad_rows():
+        yield {"nhs_number": "2"}
+        raise RuntimeError("Bad row")
+
+    db = DbUtil(pool=StubPool())
+    with db.isolation():
+        assert db.isolated
+        db.insert("insert into subjects (nhs_number) values (%s)", ("1",))
+        with pytest.raises(RuntimeError):
+            db.bulk_load("subjects", bad_rows())
+    assert not db.isolated
+
+    # Commits and rollbacks only move the savepoint, and everything is rolled back at the end
+    assert db.conn.commits == 0
+    assert db.conn.executed == [
+        "SAVEPOINT dbutil_isolation",
+        "RELEASE SAVEPOINT dbutil_isolation",
+        "SAVEPOINT dbutil_isolation",
+        "ROLLBACK TO SAVEPOINT dbutil_isolation",
+    ]
+    assert db.conn.rollbacks == 2
+
+    db.conn.autocommit = True
+    with pytest.raises(DbUtilException):
+        db.begin_isolation()
+
+
+def test_wait_for(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CI_INFRA_DB_NOTIFY_TRIGGERS", "true")
+    pool = StubPool()
+    db = DbUtil(pool=pool)
+    checks = iter([False, False, False, True])
+
+    assert db.wait_for(lambda: next(checks), timeout=5, initial_interval=0.01, max_interval=0.03)
+    # Notifications are listened for on a separate connection, backing off between checks
+    listen_conn = pool.returned[0]
+    assert listen_conn is not db.conn
+    assert listen_conn.notify_timeouts == pytest.approx([0.01, 0.02, 0.03], abs=0.005)
+    assert len(listen_conn.executed) == 2  # LISTEN and UNLISTEN
+    assert not listen_conn.autocommit
+    # The caller's transaction is left alone
+    assert db.conn.executed == []
+    assert db.conn.commits == db.conn.rollbacks == 0
+
+
+def test_wait_for_polls_without_notifications(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CI_INFRA_DB_NOTIFY_TRIGGERS", "false")
+    pool = StubPool()
+    db = DbUtil(pool=pool)
+    checks = iter([False, True])
+
+    assert db.wait_for(lambda: next(checks), timeout=5, initial_interval=0.01)
+    # No connection is borrowed to listen on, as no notifications will be sent
+    assert len(pool.available) == 1
+    assert pool.returned == []
+
+
+def test_wait_for_timeout() -> None:
+    pool = StubPool()
+    db = DbUtil(pool=pool)
+    assert not db.wait_for(lambda: False, timeout=0.05, channel=None, initial_interval=0.01)
+    assert db.conn.executed == []
+    assert pool.returned == []
+
+
+def test_change_notifications() -> None:
+    db = DbUtil(pool=StubPool())
+    assert db.install_change_notifications("pi_changes")
+    assert len(db.conn.cursors[0].statements) == 3
+    assert db.conn.commits == 1
+
+    # The trigger function is dropped once no triggers are left using it
+    db.conn.rows = [(1,)]
+    db.remove_change_notifications("pi_changes")
+    assert len(db.conn.cursors[1].statements) == 2
+    db.conn.rows = [(0,)]
+    db.remove_change_notifications("subjects")
+    assert len(db.conn.cursors[2].statements) == 3
+    assert db.conn.commits == 3
+
+
+def test_advisory_lock() -> None:
+    db = DbUtil(pool=StubPool())
+    with db.advisory_lock("cohort_manager_lambda"):
+        assert db.conn.cursors[0].executed == (
+            "SELECT pg_advisory_lock(hashtext(%s))",
+            ["cohort_manager_lambda"],
+        )
+        assert len(db.conn.cursors) == 1
+    assert db.conn.cursors[1].executed == (
+        "SELECT pg_advisory_unlock(hashtext(%s))",
+        ["cohort_manager_lambda"],
+    )
+
+    # The lock is released even if the block fails
+    with pytest.raises(ValueError):
+        with db.advisory_lock("cohort_manager_lambda"):
+            raise ValueError
+    assert db.conn.cursors[-1].executed[0] == "SELECT pg_advisory_unlock(hashtext(%s))"
+
+
+def test_db_util_does_not_import_pandas() -> None:
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, utils.db_util; print('pandas' in sys.modules)",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "False"
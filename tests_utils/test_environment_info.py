@@ -0,0 +1,78 @@
+import json
+import time
+import pytest
+import utils.environment_info
+from utils.environment_info import EnvironmentInfoCache
+
+
+pytestmark = [pytest.mark.utils]
+
+BASE_URL = "https://ci-infra.nonprod.breast-screening-select.nhs.uk"
+INFO = {"Application Details": {"Version": "1.2.3"}, "Database Details": {"Name": "bss"}}
+
+
+class StubResponse:
+    def json(self) -> dict:
+        return INFO
+
+
+class StubRequestContext:
+    def __init__(self) -> None:
+        self.requested = []
+        self.disposed = False
+
+    def get(self, url: str, headers: dict) -> StubResponse:
+        self.requested.append((url, headers["Host"]))
+        return StubResponse()
+
+    def dispose(self) -> None:
+        self.disposed = True
+
+
+class StubPlaywright:
+    def __init__(self) -> None:
+        self.context = StubRequestContext()
+        self.request = self
+
+    def new_context(self, base_url: str, ignore_https_errors: bool) -> StubRequestContext:
+        return self.context
+
+    def __enter__(self) -> "StubPlaywright":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+def test_environment_info_cache(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    playwright = StubPlaywright()
+    monkeypatch.setattr(utils.environment_info, "sync_playwright", lambda: playwright)
+    cache = EnvironmentInfoCache(tmp_path, ttl_seconds=60)
+
+    assert cache.get(BASE_URL) == INFO
+    assert playwright.context.requested == [
+        ("/bss/info", "ci-infra.nonprod.breast-screening-select.nhs.uk")
+    ]
+    assert playwright.context.disposed
+
+    # A second request within the TTL should not start Playwright at all
+    def fail() -> None:
+        raise AssertionError("Playwright should not be started")
+
+    monkeypatch.setattr(utils.environment_info, "sync_playwright", fail)
+    assert EnvironmentInfoCache(tmp_path, ttl_seconds=60).get(BASE_URL) == INFO
+    assert cache.load("https://another.environment") is None
+
+
+def test_environment_info_cache_expiry(tmp_path) -> None:
+    cache = EnvironmentInfoCache(tmp_path, ttl_seconds=60)
+    cache.save(BASE_URL, INFO)
+    assert cache.load(BASE_URL) == INFO
+
+    cache.cache_file(BASE_URL).write_text(
+        json.dumps({"retrieved": time.time() - 61, "info": INFO})
+    )
+    assert cache.load(BASE_URL) is None
+
+    cache.cache_file(BASE_URL).write_text("not json")
+    assert cache.load(BASE_URL) is None
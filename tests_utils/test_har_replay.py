@@ -0,0 +1,164 @@
+import json
+from pathlib import Path
+import pytest
+from utils.har_replay import HarReplay, HarReplayException
+
+
+pytestmark = [pytest.mark.utils]
+
+SEARCH_URL = "https://bss.example.com/bss/subjects/search?draw=1&start=0&length=10&_=1700000000000"
+HAR_ENTRY_FIELDS = {"startedDateTime", "time", "request", "response", "cache", "timings"}
+HAR_REQUEST_FIELDS = {"method", "url", "httpVersion", "cookies", "headers", "queryString", "headersSize", "bodySize"}
+HAR_RESPONSE_FIELDS = {
+    "status",
+    "statusText",
+    "httpVersion",
+    "cookies",
+    "headers",
+    "content",
+    "redirectURL",
+    "headersSize",
+    "bodySize",
+}
+
+
+class StubRequest:
+    def __init__(self, method: str, url: str, post_data: str | None = None) -> None:
+        self.method = method
+        self.url = url
+        self.post_data = post_data
+        self.headers = {"content-type": "application/x-www-form-urlencoded"} if post_data else {}
+
+
+class StubResponse:
+    def __init__(self, status: int, headers: dict, body: bytes) -> None:
+        self.status = status
+        self.status_text = "OK" if status == 200 else "Found"
+        self.headers = headers
+        self._body = body
+
+    def body(self) -> bytes:
+        return self._body
+
+
+class StubRoute:
+    def __init__(self, request: StubRequest, response: StubResponse | None = None) -> None:
+        self.request = request
+        self.response = response
+        self.outcome = None
+        self.fulfilled = {}
+
+    def fetch(self) -> StubResponse:
+        return self.response
+
+    def fulfill(self, **kwargs) -> None:
+        self.outcome = "fulfilled"
+        self.fulfilled = kwargs
+
+    def abort(self, error_code: str) -> None:
+        self.outcome = "aborted"
+
+    def fallback(self) -> None:
+        self.outcome = "fallback"
+
+
+def test_request_key(tmp_path: Path) -> None:
+    har = HarReplay("replay", tmp_path / "test.har", ignored_params=["draw", "_"])
+    assert har.request_key("get", SEARCH_URL, None) == har.request_key(
+        "GET", "https://bss.example.com/bss/subjects/search?_=1&length=10&start=0&draw=7", None
+    )
+    assert har.request_key("GET", SEARCH_URL, None) != har.request_key(
+        "GET", SEARCH_URL.replace("start=0", "start=10"), None
+    )
+    assert har.request_key("POST", "https://bss.example.com/login", "username=a&password=b") == (
+        "POST https://bss.example.com/login username=a"
+    )
+    assert har.request_key("POST", "https://bss.example.com/api", '{"b": 1, "draw": 2, "a": 3}') == (
+        'POST https://bss.example.com/api {"a": 3, "b": 1}'
+    )
+
+    with pytest.raises(HarReplayException):
+        HarReplay("rewind", tmp_path / "test.har")
+
+
+def test_record_and_replay(tmp_path: Path) -> None:
+    har_file = tmp_path / "test.har"
+    recorder = HarReplay("record", har_file)
+    for body, start in ((b'{"results": [1]}', 0), (b'{"results": [2]}', 0), (b"\x89PNG", None)):
+        url = SEARCH_URL if start is not None else "https://bss.example.com/bss/logo.png"
+        content_type = "application/json" if start is not None else "image/png"
+        route = StubRoute(
+            StubRequest("GET", url),
+            StubResponse(200, {"content-type": content_type, "set-cookie": "JSESSIONID=abc"}, body),
+        )
+        recorder._record(route)
+        assert route.outcome == "fulfilled"
+    recorder._record(
+        StubRoute(
+            StubRequest("POST", "https://bss.example.com/login", "username=a&password=secret"),
+            StubResponse(302, {"location": "/bss"}, b""),
+        )
+    )
+    recorder._record(
+        StubRoute(
+            StubRequest("GET", "https://bss.example.com/bss/reset?user=a&token=reset-token-1"),
+            StubResponse(200, {"content-type": "application/json"}, b"{}"),
+        )
+    )
+    recorder.save()
+
+    recording = har_file.read_text()
+    assert "JSESSIONID" not in recording
+    assert "secret" not in recording
+    assert "reset-token-1" not in recording
+    entries = json.loads(recording)["log"]["entries"]
+    assert len(entries) == 5
+    assert entries[4]["request"]["url"] == "https://bss.example.com/bss/reset?user=a"
+    assert entries[4]["request"]["queryString"] == [{"name": "user", "value": "a"}]
+
+    # Every entry has the fields required by HAR 1.2
+    for entry in entries:
+        assert HAR_ENTRY_FIELDS <= set(entry)
+        assert HAR_REQUEST_FIELDS <= set(entry["request"])
+        assert HAR_RESPONSE_FIELDS <= set(entry["response"])
+        assert {"send", "wait", "receive"} <= set(entry["timings"])
+    assert entries[3]["request"]["postData"] == {
+        "mimeType": "application/x-www-form-urlencoded",
+        "text": "username=a",
+    }
+    assert entries[3]["response"]["redirectURL"] == "/bss"
+
+    replayer = HarReplay("replay", har_file)
+    replayer.load()
+
+    def replay(method: str, url: str, post_data: str | None = None) -> StubRoute:
+        route = StubRoute(StubRequest(method, url, post_data))
+        replayer._replay(route)
+        return route
+
+    # Identical requests are replayed in order, with the last response repeated
+    search_url = SEARCH_URL.replace("draw=1", "draw=5")
+    assert replay("GET", search_url).fulfilled["body"] == b'{"results": [1]}'
+    assert replay("GET", search_url).fulfilled["body"] == b'{"results": [2]}'
+    assert replay("GET", search_url).fulfilled["body"] == b'{"results": [2]}'
+
+    logo = replay("GET", "https://bss.example.com/bss/logo.png").fulfilled
+    assert logo["body"] == b"\x89PNG"
+    assert logo["headers"] == {"content-type": "image/png"}
+
+    login = replay("POST", "https://bss.example.com/login", "username=a&password=other").fulfilled
+    assert login["status"] == 302
+    assert login["headers"] == {"location": "/bss"}
+
+    assert replay("GET", "https://bss.example.com/bss/other").outcome == "aborted"
+    replayer.not_found = "fallback"
+    assert replay("GET", "https://bss.example.com/bss/other").outcome == "fallback"
+    assert replayer.stats == {"recorded": 0, "replayed": 5, "not_found": 2}
+
+
+def test_replay_without_recording(tmp_path: Path) -> None:
+    with pytest.raises(HarReplayException, match="No recording found"):
+        HarReplay.for_test("replay", "tests/ui/test_smoke.py::test_batch_list", tmp_path).load()
+    assert HarReplay.for_test("record", "tests/ui/test_smoke.py::test_batch_list[a b]", tmp_path).har_file == (
+        tmp_path / "tests_ui_test_smoke.py_test_batch_list_a_b.har"
+    )
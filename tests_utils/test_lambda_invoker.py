@@ -0,0 +1,171 @@
+import json
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+import pytest
+from utils.lambda_invoker import (
+    AwsLambdaInvoker,
+    CohortManagerStubInvoker,
+    InProcessLambdaInvoker,
+    LambdaInvoker,
+    LambdaInvokerException,
+    LocalLambdaInvoker,
+)
+
+
+pytestmark = [pytest.mark.utils]
+
+
+def stub_handler(event: dict, context: object) -> dict:
+    return {"status": "success", "inserted": event["count"], "function": context.function_name}
+
+
+class EmulatorHandler(BaseHTTPRequestHandler):
+    def do_POST(self) -> None:
+        assert self.path == "/2015-03-31/functions/function/invocations"
+        event = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps({"status": "success", "inserted": event["count"]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def test_in_process_invoker() -> None:
+    invoker = InProcessLambdaInvoker.from_path(f"{__name__}:stub_handler")
+    assert invoker.invoke("cm-integration", {"count": 2}) == {
+        "status": "success",
+        "inserted": 2,
+        "function": "cm-integration",
+    }
+
+    with pytest.raises(LambdaInvokerException):
+        InProcessLambdaInvoker.from_path("tests_utils.test_lambda_invoker")
+
+
+def test_local_invoker() -> None:
+    server = HTTPServer(("127.0.0.1", 0), EmulatorHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        invoker = LocalLambdaInvoker(f"http://127.0.0.1:{server.server_port}/")
+        assert invoker.invoke("cm-integration", {"count": 3}) == {
+            "status": "success",
+            "inserted": 3,
+        }
+    finally:
+        server.shutdown()
+
+
+class StubDbUtil:
+    def __init__(self) -> None:
+        self.loaded = []
+        self.closed = False
+
+    def bulk_load(self, table: str, rows: list[dict]) -> int:
+        self.loaded.append((table, rows))
+        return len(rows)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_cohort_manager_stub_invoker() -> None:
+    connections = []
+
+    def connect() -> StubDbUtil:
+        connections.append(StubDbUtil())
+        return connections[-1]
+
+    invoker = CohortManagerStubInvoker(
+        {
+            "message-1": {
+                "request_id": "request-1",
+                "participants": [
+                    {"nhs_number": "9000000001", "given_name": "Ann", "birth_date": "19700702", "interpreter_required": "1"}
+                ],
+            },
+            "message-2": {
+                "request_id": "request-2",
+                "participants": [{"nhs_number": "9000000002", "death_date": ""}, {"nhs_number": "9000000003"}],
+            },
+            "message-204": {"request_id": "message-204", "participants": []},
+            "message-401": {"status": "error", "message": "401 Client Error"},
+        },
+        connect,
+    )
+    assert invoker.invoke("cm-integration", {}) == {"status": "success", "inserted": 0}
+    assert connections == []
+
+    # The participants for every message submitted since the last invocation are written to pi_changes
+    invoker.message_inserted("message-1")
+    invoker.message_inserted("message-2")
+    invoker.message_inserted("message-204")
+    assert invoker.invoke("cm-integration", {}) == {"status": "success", "inserted": 3}
+    table, rows = connections[0].loaded[0]
+    assert table == "pi_changes"
+    assert [(row["message_id"], row["nhs_number"]) for row in rows] == [
+        ("request-1", "9000000001"),
+        ("request-2", "9000000002"),
+        ("request-2", "9000000003"),
+    ]
+    assert rows[0]["first_name"] == "Ann"
+    assert rows[0]["date_of_birth"] == date(1970, 7, 2)
+    assert rows[0]["interpreter_required"] is True
+    assert rows[1]["date_of_death"] is None
+    # Every row has the same columns, so they can be loaded together
+    assert len({tuple(row) for row in rows}) == 1
+    assert connections[0].closed
+    assert invoker.invoke("cm-integration", {}) == {"status": "success", "inserted": 0}
+
+    # Nothing is written if the Lambda reports an error
+    invoker.message_inserted("message-1")
+    invoker.message_inserted("message-401")
+    assert invoker.invoke("cm-integration", {}) == {"status": "error", "message": "401 Client Error"}
+    assert invoker.pending == []
+    assert len(connections) == 1
+
+    with pytest.raises(LambdaInvokerException, match="No stub response"):
+        invoker.message_inserted("message-3")
+
+
+def test_message_inserted_does_nothing_by_default() -> None:
+    invoker = InProcessLambdaInvoker(stub_handler)
+    invoker.message_inserted("message-1")
+    assert invoker.invoke("cm-integration", {"count": 1})["inserted"] == 1
+
+
+def test_lambda_invoker_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        LambdaInvoker()
+
+
+def test_from_env(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.delenv("LAMBDA_BACKEND", raising=False)
+    assert isinstance(LambdaInvoker.from_env(), AwsLambdaInvoker)
+
+    monkeypatch.setenv("LAMBDA_BACKEND", "local")
+    monkeypatch.setenv("LAMBDA_LOCAL_URL", "http://localhost:9001")
+    invoker = LambdaInvoker.from_env()
+    assert isinstance(invoker, LocalLambdaInvoker)
+    assert invoker.url == "http://localhost:9001/2015-03-31/functions/function/invocations"
+
+    monkeypatch.setenv("LAMBDA_BACKEND", "inprocess")
+    monkeypatch.setenv("LAMBDA_LOCAL_HANDLER", f"{__name__}:stub_handler")
+    assert LambdaInvoker.from_env().handler is stub_handler
+
+    monkeypatch.setenv("LAMBDA_BACKEND", "stub")
+    assert "ffffffff-ffff-ffff-ffff-fffffffff401" in LambdaInvoker.from_env().responses
+    responses_file = tmp_path / "responses.json"
+    responses_file.write_text(json.dumps({"message-1": {"request_id": "request-1", "participants": []}}))
+    monkeypatch.setenv("LAMBDA_STUB_RESPONSES", str(responses_file))
+    assert list(LambdaInvoker.from_env().responses) == ["message-1"]
+
+    monkeypatch.setenv("LAMBDA_BACKEND", "unknown")
+    with pytest.raises(LambdaInvokerException):
+        LambdaInvoker.from_env()
@@ -23,3 +23,16 @@ def test_nhs_number_checks() -> None:
 def test_spaced_nhs_number() -> None:
     assert NHSNumberTools.spaced_nhs_number("1234567890") == "123 456 7890"
     assert NHSNumberTools.spaced_nhs_number(3216549870) == "321 654 9870"
+
+
+def test_calculate_check_digit() -> None:
+    assert NHSNumberTools.calculate_check_digit("947008206") == 0
+    assert NHSNumberTools.calculate_check_digit(943476591) == 9
+    assert NHSNumberTools.calculate_check_digit("999000000") is None
+
+
+def test_is_valid_nhs_number() -> None:
+    assert NHSNumberTools.is_valid_nhs_number("9470082060")
+    assert NHSNumberTools.is_valid_nhs_number("943 476 5919")
+    assert not NHSNumberTools.is_valid_nhs_number("9434765918")
+    assert not NHSNumberTools.is_valid_nhs_number("12345")
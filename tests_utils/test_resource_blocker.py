@@ -0,0 +1,95 @@
+from pathlib import Path
+import pytest
+from utils.resource_blocker import (
+    ResourceBlocker,
+    ResourceBlockerException,
+    StaticAssetCache,
+)
+
+
+pytestmark = [pytest.mark.utils]
+
+
+class StubRequest:
+    def __init__(self, url: str, resource_type: str, method: str = "GET") -> None:
+        self.url = url
+        self.resource_type = resource_type
+        self.method = method
+
+
+class StubResponse:
+    status = 200
+    headers = {"content-type": "text/javascript", "set-cookie": "a=b"}
+
+    def body(self) -> bytes:
+        return b"console.log('bundle');"
+
+
+class StubRoute:
+    def __init__(self, request: StubRequest) -> None:
+        self.request = request
+        self.outcome = None
+        self.fulfilled = {}
+
+    def abort(self, error_code: str) -> None:
+        self.outcome = "aborted"
+
+    def fallback(self) -> None:
+        self.outcome = "fallback"
+
+    def fetch(self) -> StubResponse:
+        return StubResponse()
+
+    def fulfill(self, **kwargs) -> None:
+        self.outcome = "fulfilled"
+        self.fulfilled = kwargs
+
+
+def handle(blocker: ResourceBlocker, url: str, resource_type: str, method: str = "GET") -> StubRoute:
+    route = StubRoute(StubRequest(url, resource_type, method))
+    blocker.handle(route)
+    return route
+
+
+def test_static_asset_cache(tmp_path: Path) -> None:
+    cache = StaticAssetCache(tmp_path, ttl_seconds=60)
+    url = "https://bss.example.com/bss/js/app.js"
+    assert cache.load(url) is None
+
+    cache.save(url, {"content-type": "text/javascript"}, b"bundle")
+    assert cache.load(url) == ({"content-type": "text/javascript"}, b"bundle")
+    assert StaticAssetCache(tmp_path, ttl_seconds=-1).load(url) is None
+
+
+def test_resource_blocker(tmp_path: Path) -> None:
+    blocker = ResourceBlocker("strict", StaticAssetCache(tmp_path, ttl_seconds=60))
+
+    assert handle(blocker, "https://bss.example.com/bss/logo.png", "image").outcome == "aborted"
+    assert handle(blocker, "https://www.googletagmanager.com/gtm.js", "script").outcome == "aborted"
+    assert handle(blocker, "https://bss.example.com/bss/subjects/search", "xhr").outcome == "fallback"
+    assert handle(blocker, "https://bss.example.com/bss/js/app.js", "script", "POST").outcome == "fallback"
+
+    # The first request for an asset is fetched and cached, and later requests are served from the cache
+    first = handle(blocker, "https://bss.example.com/bss/js/app.js", "script")
+    assert "response" in first.fulfilled
+    second = handle(blocker, "https://bss.example.com/bss/js/app.js", "script")
+    assert second.fulfilled["headers"] == {"content-type": "text/javascript"}
+    assert second.fulfilled["body"] == b"console.log('bundle');"
+
+    assert blocker.stats == {
+        "requests_aborted": 2,
+        "requests_cached": 1,
+        "bytes_served_from_cache": 22,
+    }
+    assert blocker.summary() == (
+        "2 requests aborted, 1 requests (22 bytes) served from the static asset cache"
+    )
+
+
+def test_resource_blocker_profiles() -> None:
+    assert not ResourceBlocker("off").enabled
+    assert not ResourceBlocker("assets").should_abort(
+        StubRequest("https://www.googletagmanager.com/gtm.js", "script")
+    )
+    with pytest.raises(ResourceBlockerException):
+        ResourceBlocker("everything")
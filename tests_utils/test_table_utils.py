@@ -0,0 +1,68 @@
+import pytest
+from utils.table_utils import TABLE_EXTRACT_SCRIPT, TableUtils
+
+
+pytestmark = [pytest.mark.utils]
+
+TABLE_DATA = {
+    "headers": ["NHS Number", "Family Name", "Age"],
+    "rows": [["9990000001", "SMITH", "55"], ["9990000002", "JONES", ""]],
+}
+
+
+class StubLocator:
+    def __init__(self, table_data: dict) -> None:
+        self.table_data = table_data
+        self.scripts = []
+
+    @property
+    def first(self) -> "StubLocator":
+        return self
+
+    def evaluate(self, script: str) -> dict:
+        self.scripts.append(script)
+        return self.table_data
+
+
+class StubPage:
+    def __init__(self, table_data: dict) -> None:
+        self.table = StubLocator(table_data)
+        self.selectors = []
+
+    def locator(self, selector: str) -> StubLocator:
+        self.selectors.append(selector)
+        return self.table
+
+
+def test_extract_table() -> None:
+    page = StubPage(TABLE_DATA)
+    table = TableUtils(page, "#subjectList")
+
+    assert table.get_full_table_with_headers() == {
+        1: {"NHS Number": "9990000001", "Family Name": "SMITH", "Age": "55"},
+        2: {"NHS Number": "9990000002", "Family Name": "JONES", "Age": ""},
+    }
+    assert table.get_table_columns() == {
+        "NHS Number": ["9990000001", "9990000002"],
+        "Family Name": ["SMITH", "JONES"],
+        "Age": ["55", ""],
+    }
+    # Each call reads the whole table with a single evaluate
+    assert page.selectors == ["#subjectList", "#subjectList"]
+    assert page.table.scripts == [TABLE_EXTRACT_SCRIPT, TABLE_EXTRACT_SCRIPT]
+
+
+def test_extract_table_empty() -> None:
+    table = TableUtils(StubPage({"headers": ["NHS Number"], "rows": []}), "#subjectList")
+    assert table.get_full_table_with_headers() == {}
+    assert table.get_table_columns() == {"NHS Number": []}
+
+
+def test_extract_table_missing_cell() -> None:
+    # A row with fewer cells than headers raises a KeyError, as get_row_data_with_headers does
+    table_data = {"headers": TABLE_DATA["headers"], "rows": [["9990000001", "SMITH"]]}
+    table = TableUtils(StubPage(table_data), "#subjectList")
+    with pytest.raises(KeyError):
+        table.get_full_table_with_headers()
+    with pytest.raises(KeyError):
+        table.get_table_columns()
@@ -1,6 +1,8 @@
+import json
+import time
 import pytest
 import utils.user_tools
-from utils.user_tools import UserTools, UserToolsException
+from utils.user_tools import UserTools, UserToolsException, UserSessionCache
 from pathlib import Path
 
 
@@ -26,3 +28,71 @@ def test_retrieve_user(monkeypatch: object) -> None:
         UserToolsException, match=r"User \[Invalid User\] is not present in users.json"
     ):
         UserTools.retrieve_user("Invalid User")
+
+
+class StubContext:
+    def __init__(self, cookies: list) -> None:
+        self.cookies = cookies
+
+    def storage_state(self, path: Path) -> None:
+        Path(path).write_text(json.dumps({"cookies": self.cookies, "origins": []}))
+
+    def clear_cookies(self) -> None:
+        self.cookies = []
+
+    def add_cookies(self, cookies: list) -> None:
+        self.cookies.extend(cookies)
+
+
+def test_user_session_cache(tmp_path: Path) -> None:
+    cache = UserSessionCache(tmp_path)
+    assert cache.state_file_for("Test User") is None
+
+    cookie = {"name": "JSESSIONID", "value": "abc", "expires": -1}
+    state_file = cache.save(StubContext([cookie]), "Test User")
+    assert state_file.name == "test_user.json"
+    assert cache.state_file_for("Test User") == state_file
+
+    new_context = StubContext([])
+    assert cache.restore(new_context, "Test User")
+    assert new_context.cookies == [cookie]
+
+    cache.invalidate("Test User")
+    assert cache.state_file_for("Test User") is None
+    assert not state_file.is_file()
+
+
+def test_user_session_cache_expired_cookies(tmp_path: Path) -> None:
+    cache = UserSessionCache(tmp_path)
+    expired_cookie = {"name": "JSESSIONID", "value": "abc", "expires": time.time() - 60}
+    cache.save(StubContext([expired_cookie]), "Test User 2")
+
+    assert cache.state_file_for("Test User 2") is None
+    assert not cache.restore(StubContext([]), "Test User 2")
+
+
+def test_login_form_parser() -> None:
+    html = """
+        <form action="/search"><input type="text" name="q"></form>
+        <form action="/login?client_id=abc" method="post">
+            <input type="hidden" name="_csrf" value="token123">
+            <input type="text" name="username">
+            <input type="password" name="password">
+        </form>
+        <form action="/bss/orgChoice" method="post">
+            <input type="hidden" name="_csrf" value="token456">
+            <select name="chosenOrgCode"><option value="">Select</option><option value="BSS_SO1">BS1</option></select>
+        </form>
+    """
+    parser = utils.user_tools._LoginFormParser.parse(html)
+
+    login_form = parser.login_form
+    assert login_form.action == "/login?client_id=abc"
+    assert login_form.hidden_fields() == {"_csrf": "token123"}
+    assert login_form.username_field() == "username"
+    assert login_form.password_field() == "password"
+
+    org_form = parser.form_with_field("chosenOrgCode")
+    assert org_form.action == "/bss/orgChoice"
+    assert org_form.select_options["chosenOrgCode"] == ["", "BSS_SO1"]
+    assert parser.form_with_field("missing") is None
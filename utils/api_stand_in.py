@@ -0,0 +1,374 @@
+import argparse
+import json
+import logging
+import os
+import re
+import threading
+import time
+from http import HTTPStatus
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+from utils.user_tools import UserTools, UserToolsException
+
+logger = logging.getLogger(__name__)
+
+ENDPOINTS_FILE = Path(os.getcwd()) / "tests" / "api" / "resources" / "stand_in_endpoints.json"
+LOGIN_PATH = "/bss/standIn/login"
+USER_COOKIE = "STAND_IN_USER"
+SEARCH_PARAM = re.compile(r"columnSearchText\[(.+)\]")
+SORT_PARAM = re.compile(r"columnSortDirectionWithOrder\[(\d+)(.+)\]")
+# Users with these role types can see rows for every BSO, whereas other users only see rows for their own hub
+NATIONAL_ROLE_TYPES = ["National User", "Helpdesk User"]
+
+
+class DataTablesEndpoint:
+    """
+    A search endpoint that implements the DataTables contract used by BS-Select (and by ApiUtils), over a list of rows:
+    columnSearchText[...] filters, columnSortDirectionWithOrder[...] sorting and start / length paging.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        rows: list[dict],
+        bso_field: str | None = None,
+        forbidden_role_types: list[str] | None = None,
+        filters: dict[str, dict[str, dict]] | None = None,
+    ) -> None:
+        """
+        Args:
+            path (str): The path of the endpoint (e.g. /bss/gpPractice/search).
+            rows (list[dict]): The rows the endpoint searches.
+            bso_field (str | None): The (dotted) field holding the BSO code of each row, used to limit BSO users to their own hub.
+            forbidden_role_types (list[str] | None): The role types (from users.json) that get a 403 from this endpoint.
+            filters (dict[str, dict[str, dict]] | None): For parameters whose values are codes rather than text to match
+                (e.g. columnSearchText[actioned]=NOT_ACTIONED), the condition each value applies, keyed by parameter then value.
+        """
+        self.path = path
+        self.rows = rows
+        self.bso_field = bso_field
+        self.forbidden_role_types = forbidden_role_types or []
+        self.filters = filters or {}
+
+    @classmethod
+    def from_config(cls, path: str, config: dict) -> "DataTablesEndpoint":
+        """
+        Creates an endpoint from its entry in the endpoints file, using any fixed "rows" followed by the rows
+        generated for each entry in "generate" ("count" rows from its "template").
+
+        Args:
+            path (str): The path of the endpoint.
+            config (dict): The endpoint's entry from the endpoints file.
+
+        Returns:
+            DataTablesEndpoint: The endpoint.
+        """
+        rows = list(config.get("rows", []))
+        for generate in config.get("generate", []):
+            rows.extend(generate_row(generate["template"], index) for index in range(generate["count"]))
+        return cls(
+            path, rows, config.get("bso_field"), config.get("forbidden_role_types"), config.get("filters")
+        )
+
+    def search(self, parameters: dict, user: dict) -> tuple[int, dict | None]:
+        """
+        Searches the endpoint's rows as the user provided.
+
+        Args:
+            parameters (dict): The query string parameters of the request.
+            user (dict): The user's record from users.json.
+
+        Returns:
+            tuple[int, dict | None]: The status code, and the response (if the status is 200).
+        """
+        if user.get("role_type") in self.forbidden_role_types:
+            return HTTPStatus.FORBIDDEN, None
+
+        rows = self.rows
+        if self.bso_field is not None and user.get("role_type") not in NATIONAL_ROLE_TYPES:
+            rows = [row for row in rows if field_value(row, self.bso_field) == user.get("hub")]
+        records_total = len(rows)
+
+        search_text = parameters.get("searchText", "")
+        if search_text:
+            rows = [row for row in rows if search_text.lower() in json.dumps(row).lower()]
+        for name, value in parameters.items():
+            if value == "":
+                continue
+            condition = self.filters.get(name, {}).get(value)
+            if condition is not None:
+                rows = [row for row in rows if meets(row, condition)]
+            elif match := SEARCH_PARAM.fullmatch(name):
+                field = match.group(1)
+                # NHS numbers are displayed (and so searched for) with spaces
+                search = value.replace(" ", "") if field.endswith("nhsNumber") else value
+                rows = [row for row in rows if matches(field_value(row, field), search)]
+
+        sorts = sorted(
+            (int(match.group(1)), match.group(2), value)
+            for name, value in parameters.items()
+            if (match := SORT_PARAM.fullmatch(name))
+        )
+        # Python's sort is stable, so sorting by the least significant column first gives a multi-column sort
+        for _, field, direction in reversed(sorts):
+            rows = sorted(
+                rows,
+                key=lambda row: sort_key(field_value(row, field)),
+                reverse=direction.lower() == "desc",
+            )
+
+        start = int(parameters.get("start", 0))
+        length = int(parameters.get("length", 10))
+        page = rows[start:] if length < 0 else rows[start : start + length]
+        return HTTPStatus.OK, {
+            "draw": int(parameters.get("draw", 0)),
+            "recordsTotal": records_total,
+            "recordsFiltered": len(rows),
+            "results": page,
+        }
+
+
+class ApiStandIn:
+    """
+    A local HTTP server standing in for the BS-Select search APIs, serving synthetic data with configurable latency,
+    so that the API client code can be exercised and profiled without the real application.
+
+    Clients log in by posting a user (a record key from users.json) to /bss/standIn/login, which sets a session cookie.
+    """
+
+    def __init__(
+        self,
+        endpoints: dict[str, DataTablesEndpoint],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float | None = None,
+        latency_per_row: float | None = None,
+    ) -> None:
+        """
+        Args:
+            endpoints (dict[str, DataTablesEndpoint]): The endpoints to serve, keyed by path.
+            host (str): The host to listen on.
+            port (int): The port to listen on (0 picks a free port).
+            latency (float | None): Seconds to wait before every response (defaults to API_STAND_IN_LATENCY, or 0).
+            latency_per_row (float | None): Additional seconds to wait for each row returned
+                (defaults to API_STAND_IN_LATENCY_PER_ROW, or 0).
+        """
+        self.endpoints = endpoints
+        self.latency = (
+            latency if latency is not None else float(os.getenv("API_STAND_IN_LATENCY", 0))
+        )
+        self.latency_per_row = (
+            latency_per_row
+            if latency_per_row is not None
+            else float(os.getenv("API_STAND_IN_LATENCY_PER_ROW", 0))
+        )
+        self._users: dict[str, dict] = {}
+        self.server = ThreadingHTTPServer((host, port), _StandInRequestHandler)
+        self.server.daemon_threads = True
+        self.server.stand_in = self
+        self._thread = None
+
+    @classmethod
+    def from_file(cls, endpoints_file: Path = ENDPOINTS_FILE, **kwargs) -> "ApiStandIn":
+        """
+        Creates a stand-in serving the endpoints described in the endpoints file.
+
+        Args:
+            endpoints_file (Path): A JSON file of endpoint configuration, keyed by path.
+            **kwargs: Any additional arguments to pass to ApiStandIn().
+
+        Returns:
+            ApiStandIn: The stand-in (not yet started).
+        """
+        config = json.loads(endpoints_file.read_text())
+        endpoints = {
+            path: DataTablesEndpoint.from_config(path, endpoint_config)
+            for path, endpoint_config in config.items()
+        }
+        return cls(endpoints, **kwargs)
+
+    def user(self, username: str) -> dict:
+        """
+        Returns the record from users.json for the user provided, caching it so users.json is only read once per user.
+
+        Args:
+            username (str): The record key from users.json.
+
+        Returns:
+            dict: The user's record.
+        """
+        if username not in self._users:
+            self._users[username] = UserTools.retrieve_user(username)
+        return self._users[username]
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ApiStandIn":
+        """
+        Starts serving requests from a background thread.
+
+        Returns:
+            ApiStandIn: The stand-in, for chaining.
+        """
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"API stand-in serving {len(self.endpoints)} endpoints at {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops serving requests.
+        """
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "ApiStandIn":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+class _StandInRequestHandler(BaseHTTPRequestHandler):
+    server: ThreadingHTTPServer
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        if url.path != LOGIN_PATH:
+            self._send(HTTPStatus.NOT_FOUND)
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+        username = dict(parse_qsl(body)).get("user", "")
+        try:
+            self.server.stand_in.user(username)
+        except UserToolsException:
+            self._send(HTTPStatus.UNAUTHORIZED)
+            return
+        cookie = SimpleCookie()
+        cookie[USER_COOKIE] = username
+        cookie[USER_COOKIE]["path"] = "/"
+        self._send(HTTPStatus.OK, {"user": username}, cookie.output(header="").strip())
+
+    def do_GET(self) -> None:
+        stand_in: ApiStandIn = self.server.stand_in
+        url = urlsplit(self.path)
+        endpoint = stand_in.endpoints.get(url.path)
+        if endpoint is None:
+            self._send(HTTPStatus.NOT_FOUND)
+            return
+
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        try:
+            user = stand_in.user(cookie[USER_COOKIE].value)
+        except (KeyError, UserToolsException):
+            self._send(HTTPStatus.UNAUTHORIZED)
+            return
+
+        status, data = endpoint.search(dict(parse_qsl(url.query, keep_blank_values=True)), user)
+        rows = len(data["results"]) if data is not None else 0
+        time.sleep(stand_in.latency + stand_in.latency_per_row * rows)
+        self._send(status, data)
+
+    def _send(self, status: int, data: dict | None = None, set_cookie: str | None = None) -> None:
+        body = json.dumps(data).encode() if data is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if set_cookie is not None:
+            self.send_header("Set-Cookie", set_cookie)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format % args)
+
+
+def field_value(row: dict, field: str) -> object:
+    """
+    Returns the value of a (dotted) field from a row, e.g. "bso.code", or None if it is not present.
+    """
+    value = row
+    for key in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def matches(value: object, search: str) -> bool:
+    """
+    Checks if a value matches a column search, in the same way for every endpoint:
+    booleans must match exactly (true / false), and anything else must start with the search text (ignoring case).
+    """
+    if value is None:
+        return False
+    if isinstance(value, bool):
+        return str(value).lower() == search.lower()
+    return str(value).lower().startswith(search.lower())
+
+
+def meets(row: dict, condition: dict) -> bool:
+    """
+    Checks if a row meets a filter condition: the (dotted) "field" must equal ("equals"), not equal ("not_equals")
+    or be below ("below") the value given. An empty condition is met by every row.
+    """
+    if not condition:
+        return True
+    value = field_value(row, condition["field"])
+    if "equals" in condition:
+        return value == condition["equals"]
+    if "not_equals" in condition:
+        return value != condition["not_equals"]
+    return value is not None and value < condition["below"]
+
+
+def sort_key(value: object) -> tuple:
+    # Nulls sort last, and numbers sort numerically
+    if value is None:
+        return (1, 0, "")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value, "")
+    return (0, 0, str(value))
+
+
+def generate_row(template: object, index: int) -> object:
+    """
+    Generates a synthetic row from a template. Strings are formatted with index (from 0), number (from 1), day (1-28)
+    and month (1-12), lists give the item at index (wrapping round) and dicts are generated recursively.
+    """
+    if isinstance(template, dict):
+        return {key: generate_row(value, index) for key, value in template.items()}
+    if isinstance(template, list):
+        return generate_row(template[index % len(template)], index)
+    if isinstance(template, str):
+        return template.format(index=index, number=index + 1, day=index % 28 + 1, month=index % 12 + 1)
+    return template
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs the local BS-Select API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=None, help="Seconds to wait before every response")
+    parser.add_argument("--latency-per-row", type=float, default=None, help="Additional seconds per row returned")
+    arguments = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    stand_in = ApiStandIn.from_file(
+        host=arguments.host,
+        port=arguments.port,
+        latency=arguments.latency,
+        latency_per_row=arguments.latency_per_row,
+    )
+    stand_in.start()
+    try:
+        stand_in._thread.join()
+    except KeyboardInterrupt:
+        stand_in.stop()
@@ -1,8 +1,37 @@
+import asyncio
 import logging
 import json
+import threading
+import time
+import weakref
+from collections.abc import Iterator
+from concurrent.futures import Future
+from dataclasses import dataclass
+from playwright.async_api import async_playwright
 
 logger = logging.getLogger(__name__)
-from playwright.sync_api import BrowserContext, Page, expect
+from playwright.sync_api import APIRequestContext, BrowserContext, Page, expect
+from utils.user_tools import API_CONTEXT_OPTIONS
+
+# Page size tuning for iter_results(), when using an adaptive page size
+ADAPTIVE_TARGET_SECONDS = 0.5
+MIN_PAGE_SIZE = 10
+
+
+@dataclass
+class ApiRequestResult:
+    """
+    The outcome of a single request sent by ApiUtils.
+    """
+
+    parameters: dict
+    status: int
+    elapsed: float
+    data: dict | None
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
 
 
 class ApiUtils:
@@ -10,9 +39,40 @@ class ApiUtils:
     A utility class providing functionality for making API requests.
     """
 
-    def __init__(self, api_session: BrowserContext, api_to_call: str) -> None:
+    def __init__(
+        self,
+        api_session: BrowserContext | APIRequestContext,
+        api_to_call: str,
+        context_options: dict | None = None,
+    ) -> None:
+        """
+        Args:
+            api_session (BrowserContext | APIRequestContext): The authenticated session to send requests with.
+            api_to_call (str): The path of the API to call.
+            context_options (dict | None): The options the session was created with (e.g. ignore_https_errors), applied to
+                the request context used for concurrent requests. Defaults to the options used by UserTools.api_user_login().
+        """
         self.api_session = api_session
         self.api_to_call = api_to_call
+        self.context_options = (
+            context_options if context_options is not None else API_CONTEXT_OPTIONS
+        )
+        # A BrowserContext exposes its APIRequestContext via .request, whereas an APIRequestContext can be used directly
+        self.request_context = getattr(api_session, "request", api_session)
+        self.last_url = None
+        # Started on first use and kept for the life of this ApiUtils, as starting its Playwright driver is slow
+        self._sender: _BackgroundRequestSender | None = None
+        self._sender_finalizer: weakref.finalize | None = None
+
+    def close(self) -> None:
+        """
+        Stops the background sender used for concurrent requests, if one was started.
+        This also happens automatically once the ApiUtils is garbage collected, or at exit.
+        """
+        if self._sender_finalizer is not None:
+            self._sender_finalizer()
+        self._sender = None
+        self._sender_finalizer = None
 
     def get_request(self, parameters: dict, result_ok: bool = True) -> dict | int:
         """
@@ -26,6 +86,272 @@ class ApiUtils:
             dict or int: A dictionary representation of the API response or the error code if response is not okay.
 
         """
-        result = self.api_session.request.get(self.api_to_call, params=parameters)
+        result = self.request_context.get(self.api_to_call, params=parameters)
         assert result.ok == result_ok
-        return json.loads(result.body()) if result.ok else result.status
+        return _response_data(self.api_to_call, result.status, result.body()) if result.ok else result.status
+
+    def iter_results(
+        self,
+        parameters: dict,
+        page_size: int = 100,
+        adaptive_page_size: bool = False,
+        max_page_size: int = 1000,
+        prefetch: bool = False,
+    ) -> Iterator[dict]:
+        """
+        This will lazily walk through every page of a DataTables search endpoint, yielding each row in turn.
+        Pages are requested by moving the "start" offset on, and paging stops once the "recordsFiltered"
+        (or "recordsTotal") count has been reached.
+
+        Args:
+            parameters (dict): The parameters to give to the Get request. Any "start" value is used as the first offset.
+            page_size (int): The number of rows to request per page (the "length" parameter).
+            adaptive_page_size (bool): If True, the page size is doubled or halved depending on how quickly each page is returned.
+            max_page_size (int): The largest page size to request, when using an adaptive page size.
+            prefetch (bool): If True, the next page is requested in the background whilst the current page is being consumed.
+
+        Returns:
+            Iterator[dict]: Each row from the "results" of the endpoint, across all pages.
+        """
+        start = int(parameters.get("start", 0))
+        draw = int(parameters.get("draw", 1))
+        next_page: Future | None = None
+
+        def page_parameters() -> dict:
+            return parameters | {
+                "draw": str(draw),
+                "start": str(start),
+                "length": str(page_size),
+            }
+
+        while True:
+            page = (
+                self._timed_request(page_parameters())
+                if next_page is None
+                else next_page.result()
+            )
+            assert page.ok, f"{self.api_to_call} returned status {page.status}"
+            response_data = page.data
+
+            rows = response_data["results"]
+            total = response_data.get(
+                "recordsFiltered", response_data.get("recordsTotal")
+            )
+            logger.debug(
+                f"{self.api_to_call}: retrieved {len(rows)} rows from offset {start} in {page.elapsed:.3f}s"
+            )
+            start += len(rows)
+            draw += 1
+            if adaptive_page_size:
+                page_size = self._adapt_page_size(
+                    page_size, page.elapsed, max_page_size
+                )
+
+            more_pages = len(rows) > 0 and (total is None or start < int(total))
+            next_page = None
+            if more_pages and prefetch:
+                next_page = self._background_sender().submit(page_parameters())
+
+            yield from rows
+
+            if not more_pages:
+                return
+
+    def get_requests(
+        self,
+        parameters_list: list[dict],
+        result_ok: bool = True,
+        max_concurrency: int = 8,
+    ) -> list[ApiRequestResult]:
+        """
+        This will send a Get request for each set of parameters specified, running the requests concurrently
+        over the same authenticated session.
+
+        Args:
+            parameters_list (list[dict]): The parameters to give to each Get request.
+            result_ok (bool): Expect every result to be successful, if True.
+            max_concurrency (int): The maximum number of requests to have in flight at once.
+
+        Returns:
+            list[ApiRequestResult]: The result of each request (status, time taken and response data), in the same order as parameters_list.
+        """
+        if not parameters_list:
+            return []
+
+        # The first request goes through the session itself, so the full URL is known for the concurrent requests
+        results = [self._timed_request(parameters_list[0])]
+        sender = self._background_sender()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        futures = [sender.submit(parameters, semaphore) for parameters in parameters_list[1:]]
+        results.extend(future.result() for future in futures)
+
+        for result in results:
+            logger.debug(
+                f"{self.api_to_call}: status {result.status} in {result.elapsed:.3f}s for {result.parameters}"
+            )
+            assert (
+                result.ok == result_ok
+            ), f"{self.api_to_call} returned status {result.status} for {result.parameters}"
+        return results
+
+    def _timed_request(self, parameters: dict) -> ApiRequestResult:
+        """
+        Sends a single Get request through the session.
+
+        Args:
+            parameters (dict): The parameters to give to the Get request.
+
+        Returns:
+            ApiRequestResult: The status, time taken and response data for the request.
+        """
+        start_time = time.perf_counter()
+        result = self.request_context.get(self.api_to_call, params=parameters)
+        self.last_url = result.url
+        return _request_result(
+            self.api_to_call,
+            parameters,
+            result.status,
+            result.body(),
+            time.perf_counter() - start_time,
+        )
+
+    def _background_sender(self) -> "_BackgroundRequestSender":
+        """
+        Returns the sender for concurrent requests, starting it the first time it is needed.
+
+        Returns:
+            _BackgroundRequestSender: The sender, which is reused by every later call on this ApiUtils.
+        """
+        if self._sender is None:
+            self._sender = _BackgroundRequestSender(
+                self.request_context.storage_state(),
+                self.last_url,
+                self.context_options,
+            )
+            # Does not reference self, so the ApiUtils can still be garbage collected
+            self._sender_finalizer = weakref.finalize(self, self._sender.close)
+        return self._sender
+
+    @staticmethod
+    def _adapt_page_size(page_size: int, elapsed: float, max_page_size: int) -> int:
+        """
+        Works out the next page size to use, based on how long the last page took to return.
+
+        Args:
+            page_size (int): The page size last requested.
+            elapsed (float): The time taken to return the last page, in seconds.
+            max_page_size (int): The largest page size allowed.
+
+        Returns:
+            int: The page size to use for the next request.
+        """
+        if elapsed < ADAPTIVE_TARGET_SECONDS:
+            return min(page_size * 2, max_page_size)
+        if elapsed > ADAPTIVE_TARGET_SECONDS * 2:
+            return max(page_size // 2, MIN_PAGE_SIZE)
+        return page_size
+
+
+def _request_result(
+    api: str, parameters: dict, status: int, body: bytes, elapsed: float
+) -> ApiRequestResult:
+    data = _response_data(api, status, body) if 200 <= status < 300 else None
+    return ApiRequestResult(parameters, status, elapsed, data)
+
+
+def _response_data(api: str, status: int, body: bytes) -> dict:
+    """
+    Parses the JSON body of a successful response.
+
+    Args:
+        api (str): The API the response came from, for the error message.
+        status (int): The status code of the response.
+        body (bytes): The body of the response.
+
+    Returns:
+        dict: The response data.
+
+    Raises:
+        ApiUtilsException: If the body is not JSON, e.g. the login page returned when the session has expired.
+    """
+    try:
+        return json.loads(body)
+    except ValueError:
+        snippet = body[:100].decode(errors="replace")
+        raise ApiUtilsException(
+            f"{api} returned a non-JSON response (status {status}), "
+            f"so the session may have expired or been redirected to the login page: {snippet!r}"
+        ) from None
+
+
+class _BackgroundRequestSender:
+    """
+    Sends Get requests concurrently through a Playwright APIRequestContext running on a background thread.
+    Playwright's sync API can only be used from the thread that created it, so the background thread has its own
+    Playwright instance (using the async API), with a request context created from the session's storage state and
+    options. Cookies, HTTPS settings and headers are therefore handled exactly as they are for the session itself.
+    """
+
+    def __init__(self, storage_state: dict, url: str, context_options: dict) -> None:
+        self.url = url.split("?")[0]
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._playwright = None
+        self._request_context = None
+        asyncio.run_coroutine_threadsafe(
+            self._start(storage_state, context_options), self._loop
+        ).result()
+
+    async def _start(self, storage_state: dict, context_options: dict) -> None:
+        self._playwright = await async_playwright().start()
+        self._request_context = await self._playwright.request.new_context(
+            storage_state=storage_state, **context_options
+        )
+
+    def submit(
+        self, parameters: dict, semaphore: asyncio.Semaphore | None = None
+    ) -> Future:
+        """
+        Sends a Get request using the parameters specified, in the background.
+
+        Args:
+            parameters (dict): The parameters to give to the Get request.
+            semaphore (asyncio.Semaphore | None): If provided, limits how many of the requests sharing it are in flight at once.
+
+        Returns:
+            Future: A future for the ApiRequestResult of the request.
+        """
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(1)
+        return asyncio.run_coroutine_threadsafe(self._get(parameters, semaphore), self._loop)
+
+    async def _get(self, parameters: dict, semaphore: asyncio.Semaphore) -> ApiRequestResult:
+        async with semaphore:
+            start_time = time.perf_counter()
+            response = await self._request_context.get(self.url, params=parameters)
+            body = await response.body()
+            return _request_result(
+                self.url,
+                parameters,
+                response.status,
+                body,
+                time.perf_counter() - start_time,
+            )
+
+    def close(self) -> None:
+        """
+        Disposes of the request context and stops the background thread.
+        """
+        asyncio.run_coroutine_threadsafe(self._stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _stop(self) -> None:
+        await self._request_context.dispose()
+        await self._playwright.stop()
+
+
+class ApiUtilsException(Exception):
+    pass
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+PART_SIZE = 8 * 1024 * 1024
+MAX_CONCURRENCY = 8
+
+
+class BackupCache:
+    """
+    A local cache of files downloaded from S3, keyed by bucket, key and ETag (so a changed object is downloaded again).
+    Downloads use concurrent ranged GETs, and an interrupted download is resumed from the parts already downloaded.
+    Once the cache grows beyond max_bytes, the least recently used files are removed.
+    """
+
+    def __init__(self, cache_dir: str | Path, max_bytes: int) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def get(self, s3_client: object, bucket: str, key: str) -> Path:
+        """
+        Returns the path to a local copy of the S3 object, downloading it only if it is not already cached.
+
+        Args:
+            s3_client (object): The boto3 S3 client to use.
+            bucket (str): The S3 bucket.
+            key (str): The S3 object key.
+
+        Returns:
+            Path: The path to the cached copy of the object.
+        """
+        head = s3_client.head_object(Bucket=bucket, Key=key)
+        etag = head["ETag"].strip('"')
+        cached_file = self.cached_file_path(bucket, key, etag)
+
+        if cached_file.is_file():
+            logger.info(f"Using cached copy of s3://{bucket}/{key} (ETag {etag})")
+            # Mark it as recently used
+            os.utime(cached_file)
+            return cached_file
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        start_time = time.time()
+        self._download(s3_client, bucket, key, head["ETag"], head["ContentLength"], cached_file)
+        logger.info(
+            f"Downloaded s3://{bucket}/{key} ({head['ContentLength']} bytes) in {time.time() - start_time:.2f} seconds"
+        )
+        self.evict(keep=cached_file)
+        return cached_file
+
+    def cached_file_path(self, bucket: str, key: str, etag: str) -> Path:
+        """
+        Returns the path the S3 object would be cached at.
+
+        Args:
+            bucket (str): The S3 bucket.
+            key (str): The S3 object key.
+            etag (str): The ETag of the S3 object.
+
+        Returns:
+            Path: The path to cache the object at.
+        """
+        digest = hashlib.sha256(f"{bucket}/{key}@{etag}".encode()).hexdigest()
+        return self.cache_dir / f"{digest}{Path(key).suffix}"
+
+    def evict(self, keep: Path | None = None) -> None:
+        """
+        Removes the least recently used files until the cache is no larger than max_bytes.
+
+        Args:
+            keep (Path | None): A file that should not be removed (e.g. the file just downloaded).
+        """
+        files = sorted(
+            (
+                path
+                for path in self.cache_dir.iterdir()
+                if path.is_file() and not path.name.endswith((".part", ".part.json"))
+            ),
+            key=lambda path: path.stat().st_mtime,
+        )
+        total = sum(path.stat().st_size for path in files)
+        for path in files:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            total -= path.stat().st_size
+            path.unlink()
+            logger.info(f"Removed {path.name} from the backup cache")
+
+    def _download(
+        self,
+        s3_client: object,
+        bucket: str,
+        key: str,
+        etag: str,
+        size: int,
+        destination: Path,
+    ) -> None:
+        """
+        Downloads the object in parts using ranged GETs, recording completed parts so an interrupted download can resume.
+        """
+        part_file = destination.with_name(destination.name + ".part")
+        progress_file = destination.with_name(destination.name + ".part.json")
+        completed = set()
+        if part_file.is_file() and progress_file.is_file():
+            completed = set(json.loads(progress_file.read_text())["completed_parts"])
+            logger.info(f"Resuming download of s3://{bucket}/{key} ({len(completed)} parts already downloaded)")
+        else:
+            with open(part_file, "wb") as file:
+                file.truncate(size)
+
+        parts = [
+            (index, start, min(start + PART_SIZE, size) - 1)
+            for index, start in enumerate(range(0, size, PART_SIZE))
+            if index not in completed
+        ]
+        lock = threading.Lock()
+
+        def download_part(part: tuple[int, int, int]) -> None:
+            index, start, end = part
+            # IfMatch ensures every part comes from the same version of the object
+            response = s3_client.get_object(
+                Bucket=bucket, Key=key, Range=f"bytes={start}-{end}", IfMatch=etag
+            )
+            data = response["Body"].read()
+            with open(part_file, "r+b") as file:
+                file.seek(start)
+                file.write(data)
+            with lock:
+                completed.add(index)
+                progress_file.write_text(json.dumps({"completed_parts": sorted(completed)}))
+
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENCY) as executor:
+            # list() raises the first error from any of the parts
+            list(executor.map(download_part, parts))
+
+        part_file.replace(destination)
+        progress_file.unlink(missing_ok=True)
@@ -0,0 +1,194 @@
+import logging
+import os
+import time
+from urllib.parse import urlsplit
+from playwright.sync_api import Browser, BrowserContext, Page, Route
+from utils.user_tools import UserSessionCache, UserTools
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_IDLE_PER_USER = 1
+# Opened when a context is returned, to check that its session is still logged in
+SESSION_CHECK_PATH = "/bss"
+# Served in place of a real page on each origin being reset, so clearing its storage never hits the server
+STORAGE_RESET_PATH = "/__context_pool_reset"
+CLEAR_STORAGE_SCRIPT = "() => { window.localStorage.clear(); window.sessionStorage.clear(); }"
+
+
+class ContextPool:
+    """
+    Keeps browser contexts that are already logged in warm for each user, so a test can lease one instead of
+    creating a context and logging in from scratch. Contexts are reset when they are returned to the pool,
+    so state from one test does not carry over into the next.
+
+    Each pooled context logs in with its own session rather than the cached session used by the page fixture, so a
+    test logging out elsewhere (which ends the cached session on the server) does not log out the pooled contexts.
+
+    The pool is not thread-safe, and is intended to be created once per xdist worker.
+    """
+
+    def __init__(
+        self,
+        browser: Browser,
+        max_idle_per_user: int | None = None,
+        max_uses: int | None = None,
+        reset_origins: list[str] | None = None,
+        **context_args,
+    ) -> None:
+        """
+        Args:
+            browser (playwright.sync_api.Browser): The browser to create contexts from.
+            max_idle_per_user (int | None): How many contexts to keep for each user between tests
+                (defaults to CONTEXT_POOL_MAX_IDLE_PER_USER, or 1).
+            max_uses (int | None): How many tests a context can be leased to before it is replaced
+                (defaults to CONTEXT_POOL_MAX_USES, or unlimited).
+            reset_origins (list[str] | None): The origins to clear local and session storage for when a context is
+                returned (defaults to the origin of base_url, if provided).
+            **context_args: Any additional arguments to pass to browser.new_context() (e.g. base_url).
+        """
+        self.browser = browser
+        self.context_args = context_args
+        self.max_idle_per_user = (
+            max_idle_per_user
+            if max_idle_per_user is not None
+            else int(os.getenv("CONTEXT_POOL_MAX_IDLE_PER_USER", DEFAULT_MAX_IDLE_PER_USER))
+        )
+        if max_uses is None and os.getenv("CONTEXT_POOL_MAX_USES"):
+            max_uses = int(os.getenv("CONTEXT_POOL_MAX_USES"))
+        self.max_uses = max_uses
+        if reset_origins is None:
+            reset_origins = [self._origin(context_args["base_url"])] if context_args.get("base_url") else []
+        self.reset_origins = reset_origins
+        self._idle: dict[str, list[BrowserContext]] = {}
+        self._leased: dict[BrowserContext, str] = {}
+        self._uses: dict[BrowserContext, int] = {}
+
+    def lease(self, username: str) -> Page:
+        """
+        Leases a page in a context that is logged in as the user provided, reusing an idle context where possible.
+        The page is left on about:blank, so the test should navigate to where it needs to start.
+
+        Args:
+            username (str): The user details required, using the record key from users.json.
+
+        Returns:
+            playwright.sync_api.Page: A page in a context authenticated as the user.
+        """
+        idle = self._idle.get(username, [])
+        if idle:
+            context = idle.pop()
+            logger.debug(f"Leasing pooled context for [{username}]")
+        else:
+            context = UserTools().new_authenticated_context(
+                self.browser, username, use_cached_session=False, **self.context_args
+            )
+            logger.info(f"Created new pooled context for [{username}]")
+        self._leased[context] = username
+        self._uses[context] = self._uses.get(context, 0) + 1
+        return context.pages[0] if context.pages else context.new_page()
+
+    def release(self, page: Page, discard: bool = False) -> None:
+        """
+        Returns a leased page's context to the pool, resetting it for the next test.
+        The context is closed instead if asked to, if it has been used max_uses times, if its session has
+        been lost or has expired, if resetting it fails or if enough contexts are already idle for the user.
+
+        Args:
+            page (playwright.sync_api.Page): A page returned by lease().
+            discard (bool): If True, close the context rather than returning it to the pool (e.g. after a failure).
+        """
+        context = page.context
+        username = self._leased.pop(context, None)
+        if username is None:
+            raise ContextPoolException("The page provided was not leased from this pool")
+
+        keep = not discard
+        if keep and self.max_uses is not None and self._uses[context] >= self.max_uses:
+            logger.debug(f"Pooled context for [{username}] has reached {self.max_uses} uses")
+            keep = False
+        if keep and len(self._idle.get(username, [])) >= self.max_idle_per_user:
+            keep = False
+        if keep:
+            try:
+                keep = self.reset(context)
+            except Exception as ex:
+                logger.warning(f"Unable to reset pooled context for [{username}]: {ex}")
+                keep = False
+
+        if keep:
+            self._idle.setdefault(username, []).append(context)
+        else:
+            self._close(context)
+
+    def reset(self, context: BrowserContext) -> bool:
+        """
+        Resets a context so it can be leased to another test, keeping only its session cookies.
+        Any extra pages, routes and permissions are removed, and if base_url was provided the session is checked by
+        opening /bss, in case the test logged out. Storage is then cleared for each of the reset origins and the
+        remaining page is left on about:blank.
+
+        Args:
+            context (playwright.sync_api.BrowserContext): The context to reset.
+
+        Returns:
+            bool: True if the context is still logged in and can be reused, otherwise False.
+        """
+        cookies = context.cookies()
+        now = time.time()
+        if not cookies or any(0 < cookie.get("expires", -1) <= now for cookie in cookies):
+            logger.debug("Pooled context has no session, or its session has expired")
+            return False
+
+        pages = context.pages
+        for extra_page in pages[1:]:
+            extra_page.close()
+        page = pages[0] if pages else context.new_page()
+        context.unroute_all(behavior="ignoreErrors")
+        context.clear_permissions()
+
+        if self.context_args.get("base_url"):
+            page.goto(SESSION_CHECK_PATH)
+            if UserSessionCache.is_login_page(page):
+                logger.debug("Pooled context has been logged out")
+                return False
+
+        for origin in self.reset_origins:
+            reset_url = f"{origin}{STORAGE_RESET_PATH}"
+            page.route(reset_url, self._fulfill_blank_page)
+            page.goto(reset_url)
+            page.evaluate(CLEAR_STORAGE_SCRIPT)
+            page.unroute(reset_url)
+        page.goto("about:blank")
+        return True
+
+    def close(self) -> None:
+        """
+        Closes every context in the pool, including any still leased.
+        """
+        for contexts in self._idle.values():
+            for context in contexts:
+                self._close(context)
+        self._idle.clear()
+        for context in list(self._leased):
+            self._close(context)
+        self._leased.clear()
+
+    def _close(self, context: BrowserContext) -> None:
+        self._uses.pop(context, None)
+        try:
+            context.close()
+        except Exception as ex:
+            logger.debug(f"Unable to close pooled context: {ex}")
+
+    @staticmethod
+    def _fulfill_blank_page(route: Route) -> None:
+        route.fulfill(status=200, content_type="text/html", body="<html></html>")
+
+    @staticmethod
+    def _origin(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+
+class ContextPoolException(Exception):
+    pass
@@ -1,11 +1,33 @@
 import os
 import boto3
+import itertools
+import json
 import psycopg2
+import threading
 import time
 import subprocess
 import logging
+import zlib
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO
+from psycopg2 import sql
+from utils.backup_cache import BackupCache
 logger = logging.getLogger(__name__)
 
+# The pg_restore sections, in the order they are restored (schema, data, then indexes and constraints)
+RESTORE_SECTIONS = ["pre-data", "data", "post-data"]
+PROGRESS_LOG_INTERVAL = 10  # seconds
+
+# Streaming restores read the backup in chunks of this size, and detect compression from its magic bytes
+STREAM_CHUNK_SIZE = 1024 * 1024
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Prefix of the comment stored against the template database, recording which backup it was built from
+TEMPLATE_ETAG_COMMENT_PREFIX = "dbrestore etag="
+
+
 class DbRestore:
     def __init__(self):
         self.conn = None
@@ -14,18 +36,29 @@ class DbRestore:
         self.local_backup_path = (
             "./tmp/db_backup.dump"  # Local path to store downloaded backup
         )
+        # Downloaded backups are cached locally, keyed by their ETag
+        self.backup_cache = BackupCache(
+            os.getenv("DB_BACKUP_CACHE_DIR", "./tmp/backup_cache"),
+            int(float(os.getenv("DB_BACKUP_CACHE_MAX_GB", "10")) * 1024**3),
+        )
+        # Per-table extracts and fingerprints of the clean database, used by reset_changed_tables()
+        self.table_extract_dir = Path(os.getenv("DB_TABLE_EXTRACT_DIR", "./tmp/table_extracts"))
+        # Pristine copy of the restored database, used by snapshot_db_restore()
+        self.template_db_name = os.getenv(
+            "PG_TEMPLATE_DBNAME", f"{os.getenv('PG_DBNAME')}_template"
+        )
 
-    def connect(self, super: bool = False):
-        self.conn = self.create_connection(super=super)  # Connect as superuser to 'postgres'
+    def connect(self, super: bool = False, dbname: str = None):
+        self.conn = self.create_connection(super=super, dbname=dbname)  # Connect as superuser to 'postgres'
         self.conn.autocommit = True
 
-    def create_connection(self, super: bool = False):
+    def create_connection(self, super: bool = False, dbname: str = None):
         return psycopg2.connect(
             host=os.getenv("PG_HOST"),
             port=os.getenv("PG_PORT"),
             user=os.getenv("PG_SUPERUSER") if super else os.getenv("PG_USER"),
             password=os.getenv("PG_SUPERPASS") if super else os.getenv("PG_PASS"),
-            dbname="postgres" if super else os.getenv("PG_DBNAME"),
+            dbname=dbname or ("postgres" if super else os.getenv("PG_DBNAME")),
         )
 
     def recreate_db(self):
@@ -34,7 +67,8 @@ class DbRestore:
         with self.conn.cursor() as cur:
             cur.execute(f'ALTER DATABASE "{db_name}" OWNER TO {os.getenv("PG_SUPERUSER")};')
             logging.info(f"Dropping and recreating database: {db_name}")
-            cur.execute(f'DROP DATABASE IF EXISTS "{db_name}"')
+            # FORCE terminates any sessions as part of the drop, so nothing can reconnect in between
+            cur.execute(f'DROP DATABASE IF EXISTS "{db_name}" WITH (FORCE)')
             cur.execute(f'CREATE DATABASE "{db_name}"')
             cur.execute('CREATE SCHEMA IF NOT EXISTS bss')
             cur.execute(f'ALTER DATABASE "{db_name}" OWNER TO {os.getenv("PG_USER")};')
@@ -48,37 +82,170 @@ class DbRestore:
             except Exception as e:
                 logging.info(f"NO connection found to disconnect from! - {e}")
 
-    def download_backup_from_s3(self):
-        """Download the database backup from S3 to a local temporary file."""
+    def s3_client(self):
         session = boto3.Session(profile_name="bs-select-rw-user-730319765130")
-        s3 = session.client("s3")
-        s3.download_file(self.s3_bucket, self.s3_backup_key, self.local_backup_path)
+        return session.client("s3")
+
+    def download_backup_from_s3(self):
+        """Download the database backup from S3 (or use the cached copy, if it has not changed)."""
+        s3 = self.s3_client()
+        self.local_backup_path = str(
+            self.backup_cache.get(s3, self.s3_bucket, self.s3_backup_key)
+        )
+
+    def get_backup_etag(self) -> str:
+        """Return the ETag of the backup in S3, which changes whenever a new backup is uploaded."""
+        response = self.s3_client().head_object(Bucket=self.s3_bucket, Key=self.s3_backup_key)
+        return response["ETag"].strip('"')
 
     def restore_backup(self):
-        """Restore the database from the downloaded backup."""
-        logging.info("Restoring database from backup...")
+        """
+        Restore the database from the downloaded backup. Plain-text dumps are replayed using psql, whereas
+        custom and directory format dumps are restored using pg_restore, in parallel where the format allows.
+        """
+        dump_format = self.detect_dump_format(self.local_backup_path)
+        logging.info(f"Restoring database from {dump_format} format backup...")
         os.environ["PGPASSWORD"] = os.getenv("PG_PASS")
-        subprocess.run(
-            [
-                "psql", # for text dump file psql is used, for binary dump file pg_restore is used
-                "-q",
-                "-h",
-                os.getenv("PG_HOST"),
-                "-p",
-                os.getenv("PG_PORT"),
-                "-U",
-                os.getenv("PG_USER"),
-                "-d",
-                os.getenv("PG_DBNAME"),
-                "-f",
-                self.local_backup_path,
-            ],
-            check=False,
+        if dump_format == "plain":
+            self.run_restore_command(
+                "restore",
+                [
+                    "psql", # for text dump file psql is used, for binary dump file pg_restore is used
+                    "-q",
+                    # Stop at (and exit non-zero on) the first failing statement, rather than carrying on
+                    "-v",
+                    "ON_ERROR_STOP=1",
+                    *self.connection_args(),
+                    "-f",
+                    self.local_backup_path,
+                ],
+            )
+            return
+
+        # Only the custom and directory formats can be restored in parallel
+        jobs = self.restore_jobs() if dump_format in ("custom", "directory") else 1
+        logging.info(f"Restoring with {jobs} parallel job(s)")
+        for section in RESTORE_SECTIONS:
+            self.run_restore_command(
+                section,
+                [
+                    "pg_restore",
+                    "--verbose",
+                    "--no-owner",
+                    f"--section={section}",
+                    f"--jobs={jobs}",
+                    *self.connection_args(),
+                    self.local_backup_path,
+                ],
+            )
+
+    @staticmethod
+    def detect_dump_format(path: str) -> str:
+        """Return the format of the dump at the path provided: "directory", "custom", "tar" or "plain"."""
+        if os.path.isdir(path):
+            if not os.path.isfile(os.path.join(path, "toc.dat")):
+                raise DbRestoreException(f"{path} is a directory but not a directory format dump")
+            return "directory"
+        with open(path, "rb") as dump:
+            return DbRestore.dump_format_from_header(dump.read(512))
+
+    @staticmethod
+    def dump_format_from_header(header: bytes) -> str:
+        """Return the format of a (non-directory) dump from its first 512 bytes: "custom", "tar" or "plain"."""
+        if header.startswith(b"PGDMP"):
+            return "custom"
+        if header[257:262] == b"ustar":
+            return "tar"
+        return "plain"
+
+    @staticmethod
+    def restore_jobs() -> int:
+        """Return the number of parallel jobs to restore with (PG_RESTORE_JOBS, or the number of cores available)."""
+        return int(os.getenv("PG_RESTORE_JOBS", os.cpu_count() or 1))
+
+    @staticmethod
+    def connection_args() -> list[str]:
+        return [
+            "-h",
+            os.getenv("PG_HOST"),
+            "-p",
+            os.getenv("PG_PORT"),
+            "-U",
+            os.getenv("PG_USER"),
+            "-d",
+            os.getenv("PG_DBNAME"),
+        ]
+
+    @staticmethod
+    def run_restore_command(
+        phase: str, command: list[str], stdin_chunks: Iterator[bytes] | None = None
+    ):
+        """
+        Run a restore command, logging its progress and how long it took, and raise a DbRestoreException
+        if it exits with a non-zero code. If stdin_chunks is provided, they are written to the command's stdin
+        from a background thread whilst it runs.
+        """
+        logging.info(f"Starting {phase} phase...")
+        start_time = time.time()
+        last_progress = start_time
+        items = 0
+        last_lines = []
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE if stdin_chunks is not None else None,
+            stderr=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
         )
+        feed_errors = []
+        feeder = None
+        if stdin_chunks is not None:
+
+            def feed_stdin():
+                try:
+                    for chunk in stdin_chunks:
+                        process.stdin.write(chunk)
+                except BrokenPipeError:
+                    pass  # The command has exited early, which is picked up by its exit code
+                except Exception as e:
+                    feed_errors.append(e)
+                finally:
+                    try:
+                        process.stdin.close()
+                    except BrokenPipeError:
+                        pass
 
-    def kill_all_db_sessions(self):
-        """Terminate all active sessions for the target database."""
-        dbname = os.getenv("PG_DBNAME")
+            feeder = threading.Thread(target=feed_stdin, daemon=True)
+            feeder.start()
+
+        for raw_line in process.stderr:
+            line = raw_line.decode(errors="replace").rstrip()
+            logger.debug(line)
+            last_lines = (last_lines + [line])[-20:]
+            items += 1
+            if time.time() - last_progress >= PROGRESS_LOG_INTERVAL:
+                last_progress = time.time()
+                logging.info(
+                    f"{phase}: {items} items processed after {last_progress - start_time:.0f} seconds ({line})"
+                )
+        return_code = process.wait()
+        if feeder is not None:
+            feeder.join()
+        elapsed = time.time() - start_time
+        if feed_errors:
+            # The command may have succeeded on a truncated input, so this is always a failure
+            raise DbRestoreException(
+                f"{phase} phase failed after {elapsed:.2f} seconds reading the backup: {feed_errors[0]}"
+            ) from feed_errors[0]
+        if return_code != 0:
+            output = "\n".join(last_lines)
+            raise DbRestoreException(
+                f"{phase} phase failed with exit code {return_code} after {elapsed:.2f} seconds:\n{output}"
+            )
+        logging.info(f"Completed {phase} phase in {elapsed:.2f} seconds.")
+
+    def kill_all_db_sessions(self, dbname: str = None):
+        """Terminate all active sessions for the target database (or the database name provided)."""
+        dbname = dbname or os.getenv("PG_DBNAME")
         # Always connect to 'postgres' or another database, NOT the target db
         self.disconnect()
         self.connect(super=True)
@@ -101,16 +268,361 @@ class DbRestore:
         finally:
             self.disconnect()
 
+    def stream_restore_from_s3(self):
+        """
+        Restore the database by streaming the backup from S3 straight into psql / pg_restore, so the download
+        and restore overlap and nothing is written to disk.
+        """
+        body = self.s3_client().get_object(Bucket=self.s3_bucket, Key=self.s3_backup_key)["Body"]
+        try:
+            self.stream_restore(body)
+        finally:
+            body.close()
+
+    def stream_restore(self, source: BinaryIO):
+        """
+        Restore the database from a stream containing the backup (decompressing it if it is gzip or zstd compressed).
+        pg_restore cannot seek within a stream (and a dump written to a pipe has no data offsets to seek to), so custom
+        and tar format backups are always restored in a single pass with one job, whatever PG_RESTORE_JOBS is set to.
+        """
+        chunks = self.decompressed_chunks(source)
+        header = b""
+        for chunk in chunks:
+            header += chunk
+            if len(header) >= 512:
+                break
+        dump_format = self.dump_format_from_header(header)
+        logging.info(f"Streaming restore of {dump_format} format backup...")
+        os.environ["PGPASSWORD"] = os.getenv("PG_PASS")
+        if dump_format == "plain":
+            command = ["psql", "-q", "-v", "ON_ERROR_STOP=1", *self.connection_args(), "-f", "-"]
+        else:
+            command = [
+                "pg_restore",
+                "--verbose",
+                "--no-owner",
+                f"--format={dump_format}",
+                "--jobs=1",
+                *self.connection_args(),
+            ]
+        self.run_restore_command("restore", command, itertools.chain([header], chunks))
+
+    @staticmethod
+    def decompressed_chunks(source: BinaryIO) -> Iterator[bytes]:
+        """Read the stream in chunks, decompressing them if the stream is gzip or zstd compressed."""
+        chunk = source.read(STREAM_CHUNK_SIZE)
+        if chunk.startswith(GZIP_MAGIC):
+            decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        elif chunk.startswith(ZSTD_MAGIC):
+            try:
+                import zstandard
+            except ImportError as e:
+                raise DbRestoreException(
+                    "The backup is zstd compressed, which needs the zstandard package to be installed"
+                ) from e
+            decompressor = zstandard.ZstdDecompressor().decompressobj()
+        else:
+            decompressor = None
+
+        while chunk:
+            data = decompressor.decompress(chunk) if decompressor else chunk
+            if data:
+                yield data
+            chunk = source.read(STREAM_CHUNK_SIZE)
+        if decompressor:
+            data = decompressor.flush()
+            if data:
+                yield data
+
     def full_db_restore(self):
-        logging.info("Killing all active database sessions...")
-        self.kill_all_db_sessions()
         self.recreate_db()
         self.disconnect()
-        logging.info("Downloading backup from S3...")
-        self.download_backup_from_s3()
-        logging.info("Starting database restore...")
         start_time = time.time()
-        self.restore_backup()
+        if os.getenv("DB_RESTORE_STREAM", "false").lower() == "true":
+            logging.info("Streaming backup from S3 into the database...")
+            self.stream_restore_from_s3()
+        else:
+            logging.info("Downloading backup from S3...")
+            self.download_backup_from_s3()
+            logging.info("Starting database restore...")
+            start_time = time.time()
+            self.restore_backup()
         end_time = time.time()
         elapsed = end_time - start_time
         logging.info(f"Database restored in {elapsed:.2f} seconds.")
+
+    def get_template_etag(self) -> str | None:
+        """Return the ETag of the backup the template database was built from, or None if there is no template."""
+        self.connect(super=True)
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(
+                    "SELECT shobj_description(oid, 'pg_database') FROM pg_database WHERE datname = %s",
+                    (self.template_db_name,),
+                )
+                row = cur.fetchone()
+        finally:
+            self.disconnect()
+        if row is None or not row[0] or not row[0].startswith(TEMPLATE_ETAG_COMMENT_PREFIX):
+            return None
+        return row[0][len(TEMPLATE_ETAG_COMMENT_PREFIX):]
+
+    def create_template_from_db(self, etag: str):
+        """Replace the template database with a copy of the (freshly restored) target database."""
+        db_name = os.getenv("PG_DBNAME")
+        self.drop_template()
+        self.connect(super=True)
+        try:
+            with self.conn.cursor() as cur:
+                logging.info(f"Creating template database {self.template_db_name} from {db_name}")
+                # Copying needs the target database to have no sessions, so stop anything (such as the application or
+                # a connection pool) reconnecting between terminating its sessions and the copy
+                cur.execute(f'ALTER DATABASE "{db_name}" WITH ALLOW_CONNECTIONS false')
+                try:
+                    cur.execute(
+                        """
+                        SELECT pg_terminate_backend(pid)
+                        FROM pg_stat_activity
+                        WHERE datname = %s AND pid <> pg_backend_pid()
+                        """,
+                        (db_name,),
+                    )
+                    cur.execute(f'CREATE DATABASE "{self.template_db_name}" TEMPLATE "{db_name}"')
+                finally:
+                    cur.execute(f'ALTER DATABASE "{db_name}" WITH ALLOW_CONNECTIONS true')
+                # Stop anything connecting to the template, as copying it requires it to have no connections
+                cur.execute(
+                    f'ALTER DATABASE "{self.template_db_name}" WITH IS_TEMPLATE true ALLOW_CONNECTIONS false'
+                )
+                cur.execute(
+                    f'COMMENT ON DATABASE "{self.template_db_name}" IS %s',
+                    (f"{TEMPLATE_ETAG_COMMENT_PREFIX}{etag}",),
+                )
+        finally:
+            self.disconnect()
+
+    def drop_template(self):
+        """Drop the template database, if it exists."""
+        self.connect(super=True)
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (self.template_db_name,))
+                if cur.fetchone() is None:
+                    return
+                cur.execute(f'ALTER DATABASE "{self.template_db_name}" WITH IS_TEMPLATE false')
+                cur.execute(f'DROP DATABASE "{self.template_db_name}"')
+                logging.info(f"Dropped template database {self.template_db_name}")
+        finally:
+            self.disconnect()
+
+    def recreate_db_from_template(self):
+        """Drop the target database and recreate it as a file-level copy of the template database."""
+        db_name = os.getenv("PG_DBNAME")
+        self.connect(super=True)
+        try:
+            with self.conn.cursor() as cur:
+                logging.info(f"Recreating database {db_name} from template {self.template_db_name}")
+                # FORCE terminates any sessions as part of the drop, so nothing can reconnect in between
+                cur.execute(f'DROP DATABASE IF EXISTS "{db_name}" WITH (FORCE)')
+                cur.execute(
+                    f'CREATE DATABASE "{db_name}" TEMPLATE "{self.template_db_name}" OWNER {os.getenv("PG_USER")}'
+                )
+        finally:
+            self.disconnect()
+
+    def snapshot_db_restore(self):
+        """
+        Restore the database from a pristine template database, which is a file-level copy and much quicker than
+        replaying the backup. The template is (re)built from a full restore if it does not exist yet, or if the
+        backup in S3 has changed (based on its ETag) since the template was built.
+        """
+        start_time = time.time()
+        backup_etag = self.get_backup_etag()
+        template_etag = self.get_template_etag()
+        if template_etag != backup_etag:
+            logging.info(
+                f"Template database is out of date (template: {template_etag}, backup: {backup_etag}), rebuilding it..."
+            )
+            self.full_db_restore()
+            self.create_template_from_db(backup_etag)
+        else:
+            logging.info(f"Template database is up to date with backup {backup_etag}")
+            try:
+                self.recreate_db_from_template()
+            except psycopg2.Error as e:
+                # e.g. the template was dropped after its ETag was read, which leaves no target database either
+                logging.warning(f"Unable to recreate the database from the template ({e}), rebuilding it...")
+                self.full_db_restore()
+                self.create_template_from_db(backup_etag)
+        elapsed = time.time() - start_time
+        logging.info(f"Database restored from snapshot in {elapsed:.2f} seconds.")
+
+    # Selective table reset
+
+    def get_table_fingerprints(self) -> dict[str, list]:
+        """
+        Return a fingerprint (row count and a checksum of every row) for each table in the target database.
+        """
+        fingerprints = {}
+        with self.conn.cursor() as cur:
+            for table in self.get_tables():
+                cur.execute(
+                    sql.SQL(
+                        "SELECT count(*), md5(coalesce(string_agg(md5(t::text), '' ORDER BY md5(t::text)), '')) FROM {} t"
+                    ).format(sql.Identifier(*table.split(".")))
+                )
+                count, checksum = cur.fetchone()
+                fingerprints[table] = [count, checksum]
+        return fingerprints
+
+    def get_tables(self) -> list[str]:
+        """Return the schema qualified name of every user table in the target database."""
+        with self.conn.cursor() as cur:
+            cur.execute(
+                "SELECT schemaname, relname FROM pg_stat_user_tables ORDER BY schemaname, relname"
+            )
+            return [f"{schema}.{table}" for schema, table in cur.fetchall()]
+
+    def get_sequence_values(self) -> dict[str, list]:
+        """Return the current and start value of every sequence in the target database."""
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT schemaname, sequencename, last_value, start_value FROM pg_sequences")
+            return {f"{schema}.{name}": [last, start] for schema, name, last, start in cur.fetchall()}
+
+    def table_extract_path(self, table: str) -> Path:
+        return self.table_extract_dir / f"{table}.copy"
+
+    def table_baseline_path(self) -> Path:
+        return self.table_extract_dir / "baseline.json"
+
+    def record_table_baseline(self, etag: str = None):
+        """
+        Record a fingerprint and a binary extract of every table (and the value of every sequence) in the freshly
+        restored database, so reset_changed_tables() can later put back just the tables that have changed.
+
+        Args:
+            etag (str): The ETag of the backup that was restored, so an out of date baseline can be detected.
+        """
+        logging.info("Recording table baseline...")
+        start_time = time.time()
+        self.table_extract_dir.mkdir(parents=True, exist_ok=True)
+        self.connect(super=True, dbname=os.getenv("PG_DBNAME"))
+        try:
+            fingerprints = self.get_table_fingerprints()
+            with self.conn.cursor() as cur:
+                for table in fingerprints:
+                    with open(self.table_extract_path(table), "wb") as extract:
+                        cur.copy_expert(
+                            sql.SQL("COPY {} TO STDOUT (FORMAT binary)")
+                            .format(sql.Identifier(*table.split(".")))
+                            .as_string(self.conn),
+                            extract,
+                        )
+            baseline = {
+                "etag": etag,
+                "tables": fingerprints,
+                "sequences": self.get_sequence_values(),
+            }
+        finally:
+            self.disconnect()
+        self.table_baseline_path().write_text(json.dumps(baseline, default=str))
+        elapsed = time.time() - start_time
+        logging.info(f"Recorded baseline of {len(fingerprints)} tables in {elapsed:.2f} seconds.")
+
+    def load_table_baseline(self) -> dict | None:
+        """Return the recorded table baseline, or None if one has not been recorded."""
+        path = self.table_baseline_path()
+        if not path.is_file():
+            return None
+        return json.loads(path.read_text())
+
+    @staticmethod
+    def changed_tables(baseline: dict[str, list], current: dict[str, list]) -> list[str]:
+        """Return the tables whose fingerprints differ from the baseline (including tables missing from either)."""
+        return sorted(
+            table
+            for table in baseline.keys() | current.keys()
+            if baseline.get(table) != current.get(table)
+        )
+
+    def reset_changed_tables(self) -> list[str]:
+        """
+        Reset the tables that have changed since record_table_baseline() was called, by replacing their contents
+        with the extract taken at the time. Sequences are also put back to their recorded values.
+
+        Returns:
+            list[str]: The tables that were reset.
+        """
+        baseline = self.load_table_baseline()
+        if baseline is None:
+            raise DbRestoreException(
+                "No table baseline has been recorded, so run a full restore and record_table_baseline() first"
+            )
+        start_time = time.time()
+        self.connect(super=True, dbname=os.getenv("PG_DBNAME"))
+        try:
+            changed = self.changed_tables(baseline["tables"], self.get_table_fingerprints())
+            unknown = [table for table in changed if table not in baseline["tables"]]
+            if unknown:
+                raise DbRestoreException(
+                    f"Tables {unknown} were not in the baseline, so a full restore is needed"
+                )
+            logging.info(f"Resetting {len(changed)} changed table(s): {changed}")
+            self.conn.autocommit = False
+            with self.conn.cursor() as cur:
+                # Disable foreign key checks, so tables can be emptied and reloaded in any order
+                cur.execute("SET LOCAL session_replication_role = replica")
+                for table in changed:
+                    identifier = sql.Identifier(*table.split("."))
+                    cur.execute(sql.SQL("DELETE FROM {}").format(identifier))
+                    with open(self.table_extract_path(table), "rb") as extract:
+                        cur.copy_expert(
+                            sql.SQL("COPY {} FROM STDIN (FORMAT binary)")
+                            .format(identifier)
+                            .as_string(self.conn),
+                            extract,
+                        )
+                for sequence, (last_value, start_value) in baseline["sequences"].items():
+                    if last_value is None:
+                        cur.execute("SELECT setval(%s, %s, false)", (sequence, start_value))
+                    else:
+                        cur.execute("SELECT setval(%s, %s, true)", (sequence, last_value))
+            self.conn.commit()
+        except Exception:
+            if not self.conn.autocommit:
+                self.conn.rollback()
+            raise
+        finally:
+            self.disconnect()
+        elapsed = time.time() - start_time
+        logging.info(f"Reset {len(changed)} table(s) in {elapsed:.2f} seconds.")
+        return changed
+
+    def selective_db_restore(self, snapshot: bool = False):
+        """
+        Reset only the tables that have changed since the last restore, falling back to a full (or snapshot) restore
+        if there is no table baseline for the current backup. A baseline is recorded after any full restore.
+
+        Args:
+            snapshot (bool): If True, use snapshot_db_restore() rather than full_db_restore() when falling back.
+        """
+        backup_etag = self.get_backup_etag()
+        baseline = self.load_table_baseline()
+        if baseline is not None and baseline["etag"] == backup_etag:
+            try:
+                self.reset_changed_tables()
+                return
+            except DbRestoreException as e:
+                logging.warning(f"Unable to reset changed tables, falling back to a full restore: {e}")
+        else:
+            logging.info(f"No table baseline recorded for backup {backup_etag}, running a full restore")
+
+        if snapshot:
+            self.snapshot_db_restore()
+        else:
+            self.full_db_restore()
+        self.record_table_baseline(backup_etag)
+
+
+class DbRestoreException(Exception):
+    pass
@@ -1,20 +1,613 @@
+from __future__ import annotations
+import itertools
+import logging
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from collections.abc import Callable, Iterable, Iterator
+from typing import TYPE_CHECKING, Any
 import psycopg
-import pandas as pd
+from psycopg import sql
+from psycopg.rows import dict_row, tuple_row
+from psycopg_pool import ConnectionPool, PoolTimeout
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# The savepoint used to isolate work whilst in isolation mode
+ISOLATION_SAVEPOINT = "dbutil_isolation"
+
+# The channel that install_change_notifications() publishes table changes on, by default
+DB_CHANGES_CHANNEL = "dbutil_table_changes"
+# The trigger function, and the prefix of the triggers, installed by install_change_notifications()
+NOTIFY_FUNCTION = "dbutil_notify_change"
+NOTIFY_TRIGGER_PREFIX = "dbutil_notify_"
+
+
+def change_notifications_enabled() -> bool:
+    """
+    Returns:
+        bool: True if CI_INFRA_DB_NOTIFY_TRIGGERS is "true", meaning the notification triggers are installed for the run
+        (so wait_for() listens for changes, rather than only polling).
+    """
+    return os.getenv("CI_INFRA_DB_NOTIFY_TRIGGERS", "false").lower() == "true"
 
 
 class DbUtil:
     conn = None
 
-    def __init__(self, **conn_params) -> None:
-        self.conn = psycopg.connect(**conn_params)
+    def __init__(self, pool: ConnectionPool | None = None, **conn_params) -> None:
+        """
+        Args:
+            pool (ConnectionPool): If provided, a connection is borrowed from this pool rather than opening a new one.
+            **conn_params: The connection parameters to pass to psycopg.connect(), if not using a pool.
+        """
+        self.pool = pool
+        self.conn_params = conn_params
+        self.isolated = False
+        if pool is not None:
+            self.conn = pool.getconn()
+        else:
+            self.conn = psycopg.connect(**conn_params)
+
+    @staticmethod
+    def create_pool(
+        min_size: int = 1, max_size: int = 4, **conn_params
+    ) -> ConnectionPool:
+        """
+        Creates a connection pool that DbUtil instances can borrow connections from.
+        Connections are health checked before being handed out, so a connection dropped by the server is replaced.
+
+        Args:
+            min_size (int): The number of connections to keep open.
+            max_size (int): The maximum number of connections the pool can open.
+            **conn_params: The connection parameters to pass to psycopg.connect().
+
+        Returns:
+            ConnectionPool: The opened connection pool. Call close() on it once finished with.
+        """
+        pool = ConnectionPool(
+            kwargs=conn_params,
+            min_size=min_size,
+            max_size=max_size,
+            check=ConnectionPool.check_connection,
+            open=False,
+        )
+        pool.open()
+        logger.info(f"Opened database connection pool (min {min_size}, max {max_size})")
+        return pool
+
+    def close(self) -> None:
+        """
+        Returns the connection to the pool it was borrowed from (rolling back anything left uncommitted),
+        or closes it if it was not borrowed from a pool.
+        """
+        if self.conn is None:
+            return
+        self.end_isolation()
+        if self.pool is not None:
+            self.pool.putconn(self.conn)
+        else:
+            self.conn.close()
+        self.conn = None
+
+    def begin_isolation(self) -> None:
+        """
+        Starts isolating the work done through this DbUtil, so it can be undone by end_isolation().
+        Whilst isolated, commits made by DbUtil only release a savepoint within an outer transaction (and rollbacks
+        return to the last savepoint), so nothing is committed to the database.
+
+        Other connections (such as the application under test) cannot see changes made whilst isolated, so only use
+        this for tests that change data solely through DbUtil.
+        """
+        if self.conn is None:
+            return
+        if self.conn.autocommit:
+            raise DbUtilException("Cannot isolate a connection that is in autocommit mode")
+        self.conn.rollback()
+        self.conn.execute(f"SAVEPOINT {ISOLATION_SAVEPOINT}")
+        self.isolated = True
+        logger.debug("Started isolated transaction")
+
+    def end_isolation(self) -> None:
+        """
+        Rolls back everything done since begin_isolation() was called, and stops isolating.
+        """
+        if self.conn is not None and self.isolated:
+            self.conn.rollback()
+            logger.debug("Rolled back isolated transaction")
+        self.isolated = False
+
+    @contextmanager
+    def isolation(self) -> Iterator["DbUtil"]:
+        """
+        Isolates the work done through this DbUtil within the with block, rolling it back at the end.
+        """
+        self.begin_isolation()
+        try:
+            yield self
+        finally:
+            self.end_isolation()
+
+    def _commit(self) -> None:
+        """Commits the current transaction, or (if isolated) releases the current savepoint and starts a new one."""
+        if self.isolated:
+            self.conn.execute(f"RELEASE SAVEPOINT {ISOLATION_SAVEPOINT}")
+            self.conn.execute(f"SAVEPOINT {ISOLATION_SAVEPOINT}")
+        else:
+            self.conn.commit()
 
-    def get_results(self, query: str, params: list[any] = []):
+    def _rollback(self) -> None:
+        """Rolls back the current transaction, or (if isolated) rolls back to the current savepoint."""
+        if self.isolated:
+            self.conn.execute(f"ROLLBACK TO SAVEPOINT {ISOLATION_SAVEPOINT}")
+        else:
+            self.conn.rollback()
+
+    def __enter__(self) -> "DbUtil":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get_results(self, query: str, params: list[any] = []) -> pd.DataFrame | None:
+        """
+        Runs a query and returns the results as a DataFrame, for when the results need further analysis.
+        For simple lookups (such as counts), the fetch_* methods are much cheaper.
+        """
         if self.conn:
+            # pandas is only imported when a DataFrame is needed, as it is slow to import
+            import pandas as pd
+
             df = pd.read_sql_query(query, self.conn, params=params)
             return df
         else:
             return None
 
+    def fetch_scalar(self, query: str, params: list[any] | tuple = None) -> Any:
+        """
+        Runs a query and returns the first column of the first row (e.g. for "select count(1) ..." queries).
+
+        Args:
+            query (str): The query to run.
+            params (list | tuple): The parameters for the query.
+
+        Returns:
+            Any: The value from the first column of the first row, or None if no rows were returned.
+        """
+        row = self.fetch_one(query, params)
+        return None if row is None else row[0]
+
+    def fetch_one(
+        self, query: str, params: list[any] | tuple = None, as_dict: bool = False
+    ) -> tuple | dict | None:
+        """
+        Runs a query and returns the first row.
+
+        Args:
+            query (str): The query to run.
+            params (list | tuple): The parameters for the query.
+            as_dict (bool): If True, the row is returned as a dict keyed by column name rather than a tuple.
+
+        Returns:
+            tuple | dict | None: The first row, or None if no rows were returned.
+        """
+        if self.conn:
+            with self.conn.cursor(row_factory=dict_row if as_dict else tuple_row) as cursor:
+                cursor.execute(query, params)
+                return cursor.fetchone()
+        return None
+
+    def fetch_all(
+        self, query: str, params: list[any] | tuple = None, as_dict: bool = False
+    ) -> list[tuple] | list[dict]:
+        """
+        Runs a query and returns all of the rows.
+
+        Args:
+            query (str): The query to run.
+            params (list | tuple): The parameters for the query.
+            as_dict (bool): If True, each row is returned as a dict keyed by column name rather than a tuple.
+
+        Returns:
+            list[tuple] | list[dict]: The rows returned by the query.
+        """
+        if self.conn:
+            with self.conn.cursor(row_factory=dict_row if as_dict else tuple_row) as cursor:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+        return []
+
+    def fetch_column(self, query: str, params: list[any] | tuple = None) -> list:
+        """
+        Runs a query and returns the first column of every row.
+
+        Args:
+            query (str): The query to run.
+            params (list | tuple): The parameters for the query.
+
+        Returns:
+            list: The value from the first column of each row.
+        """
+        return [row[0] for row in self.fetch_all(query, params)]
+
+    def stream(
+        self,
+        query: str,
+        params: list[any] | tuple = None,
+        as_dict: bool = False,
+        chunk_size: int = 1000,
+    ) -> Iterator[tuple | dict]:
+        """
+        Runs a query using a server-side cursor and yields the rows one at a time, so large result sets
+        (such as audit tables) can be processed without holding every row in memory.
+
+        Args:
+            query (str): The query to run.
+            params (list | tuple): The parameters for the query.
+            as_dict (bool): If True, each row is yielded as a dict keyed by column name rather than a tuple.
+            chunk_size (int): The number of rows to fetch from the server at a time.
+
+        Returns:
+            Iterator[tuple | dict]: Each row returned by the query.
+        """
+        for chunk in self.stream_chunks(query, params, as_dict, chunk_size):
+            yield from chunk
+
+    def stream_chunks(
+        self,
+        query: str,
+        params: list[any] | tuple = None,
+        as_dict: bool = False,
+        chunk_size: int = 1000,
+        as_dataframe: bool = False,
+    ) -> Iterator[list[tuple] | list[dict] | pd.DataFrame]:
+        """
+        Runs a query using a server-side cursor and yields the rows in chunks of a fixed size.
+
+        Args:
+            query (str): The query to run.
+            params (list | tuple): The parameters for the query.
+            as_dict (bool): If True, each row is returned as a dict keyed by column name rather than a tuple.
+            chunk_size (int): The maximum number of rows in each chunk.
+            as_dataframe (bool): If True, each chunk is yielded as a DataFrame instead of a list of rows.
+
+        Returns:
+            Iterator[list[tuple] | list[dict] | pd.DataFrame]: Each chunk of rows returned by the query.
+        """
+        if not self.conn:
+            return
+        if as_dataframe:
+            import pandas as pd
+
+        # A server-side cursor needs a transaction to live in, unless it is held open past the commit (as in autocommit mode)
+        with self.conn.cursor(
+            name=f"dbutil_stream_{uuid.uuid4().hex}",
+            row_factory=dict_row if as_dict else tuple_row,
+            withhold=self.conn.autocommit,
+        ) as cursor:
+            cursor.itersize = chunk_size
+            cursor.execute(query, params)
+            total_rows = 0
+            while chunk := cursor.fetchmany(chunk_size):
+                total_rows += len(chunk)
+                if as_dataframe:
+                    columns = [column.name for column in cursor.description]
+                    yield pd.DataFrame.from_records(chunk, columns=columns)
+                else:
+                    yield chunk
+            logger.debug(f"Streamed {total_rows} rows in chunks of {chunk_size}")
+
+    def bulk_load(
+        self,
+        table: str,
+        rows: Iterable[dict] | pd.DataFrame,
+        columns: list[str] | None = None,
+        on_conflict: str | None = None,
+        conflict_columns: list[str] | None = None,
+    ) -> int:
+        """
+        Loads rows into a table using COPY ... FROM STDIN, in a single transaction. This is much quicker than
+        inserting rows one at a time, so is suited to seeding large volumes of test data.
+
+        Args:
+            table (str): The table to load into (optionally schema qualified, e.g. "bss.subjects").
+            rows (Iterable[dict] | pd.DataFrame): The rows to load, as dicts keyed by column name or a DataFrame.
+            columns (list[str] | None): The columns to load. Defaults to the keys of the first row (or the DataFrame columns).
+            on_conflict (str | None): None to COPY straight into the table, or "nothing" / "update" to COPY into a
+                staging table first and insert from it using ON CONFLICT DO NOTHING / DO UPDATE.
+            conflict_columns (list[str] | None): The columns that identify a conflict (required when on_conflict is "update").
+
+        Returns:
+            int: The number of rows loaded (excluding any skipped due to conflicts).
+        """
+        if on_conflict not in (None, "nothing", "update"):
+            raise ValueError(f"on_conflict must be None, 'nothing' or 'update', not {on_conflict!r}")
+        if on_conflict == "update" and not conflict_columns:
+            raise ValueError("conflict_columns must be provided when on_conflict is 'update'")
+        if not self.conn:
+            return 0
+
+        if hasattr(rows, "itertuples"):
+            # DataFrame: load the columns in order, converting NaN/NaT to NULL
+            columns = columns or [str(column) for column in rows.columns]
+            frame = rows[columns].astype(object)
+            values = frame.where(frame.notna(), None).itertuples(index=False, name=None)
+        else:
+            rows = iter(rows)
+            first_row = next(rows, None)
+            if first_row is None:
+                return 0
+            columns = columns or list(first_row.keys())
+            values = (
+                tuple(row.get(column) for column in columns)
+                for row in itertools.chain([first_row], rows)
+            )
+
+        target = sql.Identifier(*table.split("."))
+        column_list = sql.SQL(", ").join(sql.Identifier(column) for column in columns)
+        start_time = time.perf_counter()
+        try:
+            with self.conn.cursor() as cursor:
+                copy_target = target
+                if on_conflict is not None:
+                    # Only the loaded columns are staged, so identity and other NOT NULL columns left to the
+                    # target table's defaults do not make the COPY fail
+                    copy_target = sql.Identifier(f"dbutil_staging_{uuid.uuid4().hex}")
+                    cursor.execute(
+                        sql.SQL(
+                            "CREATE TEMPORARY TABLE {} ON COMMIT DROP AS SELECT {} FROM {} WITH NO DATA"
+                        ).format(copy_target, column_list, target)
+                    )
+
+                copied = 0
+                with cursor.copy(
+                    sql.SQL("COPY {} ({}) FROM STDIN").format(copy_target, column_list)
+                ) as copy:
+                    for row in values:
+                        copy.write_row(row)
+                        copied += 1
+
+                if on_conflict is not None:
+                    if on_conflict == "nothing":
+                        conflict_action = sql.SQL("ON CONFLICT DO NOTHING")
+                    else:
+                        conflict_action = sql.SQL("ON CONFLICT ({}) DO UPDATE SET {}").format(
+                            sql.SQL(", ").join(sql.Identifier(column) for column in conflict_columns),
+                            sql.SQL(", ").join(
+                                sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(column))
+                                for column in columns
+                                if column not in conflict_columns
+                            ),
+                        )
+                    cursor.execute(
+                        sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {} {}").format(
+                            target, column_list, column_list, copy_target, conflict_action
+                        )
+                    )
+                    copied = cursor.rowcount
+            self._commit()
+        except Exception:
+            self._rollback()
+            raise
+        logger.info(
+            f"Loaded {copied} rows into {table} in {time.perf_counter() - start_time:.2f}s"
+        )
+        return copied
+
+    def wait_for(
+        self,
+        condition: Callable[[], bool],
+        timeout: float = 90,
+        channel: str | None = DB_CHANGES_CHANNEL,
+        initial_interval: float = 0.1,
+        max_interval: float = 3,
+    ) -> bool:
+        """
+        Waits for a condition (usually one that queries the database) to become true.
+
+        Between checks the condition is rechecked using an exponential backoff, starting at initial_interval and
+        doubling up to max_interval. If CI_INFRA_DB_NOTIFY_TRIGGERS is "true" (see install_change_notifications()),
+        this also listens for notifications on the channel provided, so the condition is rechecked as soon as a change
+        is notified.
+
+        Notifications are listened for on a separate connection (borrowed from the pool, if there is one), so the
+        transaction on this connection is never committed or rolled back by waiting. When only polling, no other
+        connection is used.
+
+        Args:
+            condition (Callable[[], bool]): The condition to wait for.
+            timeout (float): The maximum time to wait, in seconds.
+            channel (str | None): The notification channel to listen on, or None to only use the backoff.
+            initial_interval (float): The time to wait before the first recheck, in seconds.
+            max_interval (float): The longest time to wait between rechecks, in seconds.
+
+        Returns:
+            bool: True if the condition was met, False if it timed out.
+        """
+        start_time = time.perf_counter()
+        end_time = start_time + timeout
+        interval = initial_interval
+        listen_conn = (
+            self._listen(channel)
+            if channel and self.conn and change_notifications_enabled()
+            else None
+        )
+        try:
+            while True:
+                if condition():
+                    logger.info(
+                        f"Condition met after {time.perf_counter() - start_time:.2f}s"
+                    )
+                    return True
+
+                remaining = end_time - time.perf_counter()
+                if remaining <= 0:
+                    logger.warning(
+                        f"Condition not met after {time.perf_counter() - start_time:.2f}s"
+                    )
+                    return False
+                wait = min(interval, remaining)
+                if listen_conn is not None:
+                    for notify in listen_conn.notifies(timeout=wait, stop_after=1):
+                        logger.debug(f"Change notified on {notify.channel}: {notify.payload}")
+                else:
+                    time.sleep(wait)
+                interval = min(interval * 2, max_interval)
+        finally:
+            if listen_conn is not None:
+                self._unlisten(listen_conn, channel)
+
+    def _listen(self, channel: str) -> psycopg.Connection | None:
+        """
+        Opens a separate connection (borrowing it from the pool, if there is one) listening on the channel provided.
+
+        Args:
+            channel (str): The notification channel to listen on.
+
+        Returns:
+            psycopg.Connection | None: The listening connection, or None if one could not be opened
+            (in which case wait_for() falls back to polling).
+        """
+        try:
+            if self.pool is not None:
+                listen_conn = self.pool.getconn(timeout=5)
+                listen_conn.autocommit = True
+            else:
+                listen_conn = psycopg.connect(**self.conn_params, autocommit=True)
+        except (PoolTimeout, psycopg.Error) as e:
+            logger.warning(f"Unable to open a connection to listen on {channel}, polling instead: {e}")
+            return None
+        listen_conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+        return listen_conn
+
+    def _unlisten(self, listen_conn: psycopg.Connection, channel: str) -> None:
+        """
+        Stops listening on the channel, and returns the connection to the pool (or closes it).
+
+        Args:
+            listen_conn (psycopg.Connection): The connection returned by _listen().
+            channel (str): The notification channel being listened on.
+        """
+        if self.pool is None:
+            listen_conn.close()
+            return
+        listen_conn.execute(sql.SQL("UNLISTEN {}").format(sql.Identifier(channel)))
+        listen_conn.autocommit = False
+        self.pool.putconn(listen_conn)
+
+    def install_change_notifications(
+        self, table: str, channel: str = DB_CHANGES_CHANNEL
+    ) -> bool:
+        """
+        Installs a trigger that sends a notification (with the table name as the payload) whenever rows in the table
+        are inserted or updated, so wait_for() can wake up as soon as the table changes.
+        This needs permission to create functions and triggers, so only use it against test databases, and remove the
+        trigger afterwards using remove_change_notifications().
+
+        Args:
+            table (str): The table to notify changes for.
+            channel (str): The notification channel to publish on.
+
+        Returns:
+            bool: True if the trigger was installed, False if not (in which case wait_for() falls back to polling).
+        """
+        if not self.conn:
+            return False
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    CREATE OR REPLACE FUNCTION {NOTIFY_FUNCTION}() RETURNS trigger AS $$
+                    BEGIN
+                        PERFORM pg_notify(TG_ARGV[0], TG_TABLE_NAME);
+                        RETURN NULL;
+                    END;
+                    $$ LANGUAGE plpgsql
+                    """
+                )
+                trigger = sql.Identifier(f"{NOTIFY_TRIGGER_PREFIX}{table}")
+                cursor.execute(
+                    sql.SQL("DROP TRIGGER IF EXISTS {} ON {}").format(
+                        trigger, sql.Identifier(table)
+                    )
+                )
+                cursor.execute(
+                    sql.SQL(
+                        "CREATE TRIGGER {} AFTER INSERT OR UPDATE ON {} "
+                        "FOR EACH STATEMENT EXECUTE FUNCTION {}({})"
+                    ).format(
+                        trigger,
+                        sql.Identifier(table),
+                        sql.Identifier(NOTIFY_FUNCTION),
+                        sql.Literal(channel),
+                    )
+                )
+            self._commit()
+        except psycopg.Error as e:
+            self._rollback()
+            logger.warning(f"Unable to install change notifications on {table}: {e}")
+            return False
+        logger.info(f"Installed change notifications on {table} (channel: {channel})")
+        return True
+
+    def remove_change_notifications(self, table: str) -> None:
+        """
+        Removes the trigger installed by install_change_notifications() from the table, and the trigger function
+        once no table is using it.
+
+        Args:
+            table (str): The table to stop notifying changes for.
+        """
+        if not self.conn:
+            return
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                sql.SQL("DROP TRIGGER IF EXISTS {} ON {}").format(
+                    sql.Identifier(f"{NOTIFY_TRIGGER_PREFIX}{table}"), sql.Identifier(table)
+                )
+            )
+            cursor.execute(
+                "SELECT count(1) FROM pg_trigger WHERE tgname LIKE %s",
+                [f"{NOTIFY_TRIGGER_PREFIX}%"],
+            )
+            if cursor.fetchone()[0] == 0:
+                cursor.execute(
+                    sql.SQL("DROP FUNCTION IF EXISTS {}()").format(sql.Identifier(NOTIFY_FUNCTION))
+                )
+        self._commit()
+        logger.info(f"Removed change notifications from {table}")
+
+    @contextmanager
+    def advisory_lock(self, name: str) -> Iterator["DbUtil"]:
+        """
+        Holds a Postgres advisory lock for the duration of the with block, waiting for anyone else holding it first.
+        Tests on any xdist worker (or in any other run against the same database) that take the same lock never
+        run at the same time, which serialises tests sharing a resource without pinning them to one worker.
+
+        Args:
+            name (str): The name of the lock.
+        """
+        if not self.conn:
+            yield self
+            return
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(hashtext(%s))", [name])
+        # The lock is held by the session, so committing does not release it
+        self._commit()
+        logger.debug(f"Acquired advisory lock {name}")
+        try:
+            yield self
+        finally:
+            self._rollback()
+            with self.conn.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(hashtext(%s))", [name])
+            self._commit()
+            logger.debug(f"Released advisory lock {name}")
+
     def insert(self, query: str, params: tuple = None):
         """
         Executes an INSERT query and commits the transaction.
@@ -22,4 +615,8 @@ class DbUtil:
         if self.conn:
             with self.conn.cursor() as cursor:
                 cursor.execute(query, params)
-                self.conn.commit()
+                self._commit()
+
+
+class DbUtilException(Exception):
+    pass
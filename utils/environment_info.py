@@ -0,0 +1,114 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from playwright.sync_api import Playwright, sync_playwright
+
+logger = logging.getLogger(__name__)
+
+ENVIRONMENT_INFO_CACHE_DIR = Path(os.getcwd()) / "test-results" / ".environment_info"
+DEFAULT_TTL_SECONDS = 300
+
+
+class EnvironmentInfoCache:
+    """
+    Retrieves the environment information from /bss/info, caching it on disk for a short time so that
+    repeated runs (and every xdist worker in a run) only need to make the request once.
+    """
+
+    def __init__(
+        self, cache_dir: Path = ENVIRONMENT_INFO_CACHE_DIR, ttl_seconds: float | None = None
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.ttl_seconds = (
+            ttl_seconds
+            if ttl_seconds is not None
+            else float(os.getenv("ENVIRONMENT_INFO_TTL", DEFAULT_TTL_SECONDS))
+        )
+
+    def get(self, base_url: str) -> dict:
+        """
+        Returns the environment information for the base URL, from the cache if it is recent enough.
+        Playwright is only started if the information needs to be requested.
+
+        Args:
+            base_url (str): The base URL of the environment.
+
+        Returns:
+            dict: The environment information returned by /bss/info.
+        """
+        cached = self.load(base_url)
+        if cached is not None:
+            logger.info(f"Using cached environment information for {base_url}")
+            return cached
+        with sync_playwright() as playwright:
+            info = self.fetch(playwright, base_url)
+        self.save(base_url, info)
+        return info
+
+    @staticmethod
+    def fetch(playwright: Playwright, base_url: str) -> dict:
+        """
+        Requests the environment information using a browserless request context.
+
+        Args:
+            playwright (Playwright): The Playwright object to make the request with.
+            base_url (str): The base URL of the environment.
+
+        Returns:
+            dict: The environment information returned by /bss/info.
+        """
+        request_context = playwright.request.new_context(
+            base_url=base_url, ignore_https_errors=True
+        )
+        try:
+            result = request_context.get(
+                "/bss/info",
+                headers={
+                    "Host": f"{base_url}".replace("https://", "").replace("/", ""),
+                    "Accept": "*/*",
+                    "Accept-Encoding": "gzip, deflate, br",
+                },
+            )
+            return result.json()
+        finally:
+            request_context.dispose()
+
+    def cache_file(self, base_url: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha256(base_url.encode()).hexdigest()}.json"
+
+    def load(self, base_url: str) -> dict | None:
+        """
+        Returns the cached environment information for the base URL, or None if there is none within the TTL.
+
+        Args:
+            base_url (str): The base URL of the environment.
+
+        Returns:
+            dict | None: The cached environment information.
+        """
+        cache_file = self.cache_file(base_url)
+        try:
+            cached = json.loads(cache_file.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if time.time() - cached["retrieved"] > self.ttl_seconds:
+            return None
+        return cached["info"]
+
+    def save(self, base_url: str, info: dict) -> None:
+        """
+        Caches the environment information for the base URL.
+
+        Args:
+            base_url (str): The base URL of the environment.
+            info (dict): The environment information to cache.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_file = self.cache_file(base_url)
+        # Write to a temporary file first, so other workers never read a partially written file
+        temp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        temp_file.write_text(json.dumps({"retrieved": time.time(), "info": info}))
+        temp_file.replace(cache_file)
@@ -0,0 +1,279 @@
+import base64
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from playwright.sync_api import BrowserContext, Route
+
+logger = logging.getLogger(__name__)
+
+HAR_DIR = Path(os.getcwd()) / "test-results" / "har"
+HAR_MODES = ["off", "record", "replay"]
+DEFAULT_URL_PATTERN = "**/*"
+# Parameters that change on every request (the DataTables draw counter and the jQuery cache buster timestamp)
+DEFAULT_IGNORED_PARAMS = ["draw", "_"]
+# Parameters that are never written to a recording, or used when matching requests
+SENSITIVE_PARAM_PATTERN = re.compile(r"password|secret|token", re.IGNORECASE)
+# Only the headers needed to replay a response are kept, so session cookies are never written to a recording
+RECORDED_RESPONSE_HEADERS = ["content-type", "location", "content-disposition"]
+TEXT_CONTENT_TYPES = ["text/", "json", "javascript", "xml"]
+
+
+class HarReplay:
+    """
+    Records the requests made by a browser context to a HAR file, or replays the responses from a previously recorded
+    HAR file instead of making the requests. Requests are matched on their method, URL and body, ignoring any
+    parameters that change from run to run (such as the DataTables draw counter).
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        har_file: Path,
+        url_pattern: str | None = None,
+        ignored_params: list[str] | None = None,
+        not_found: str | None = None,
+    ) -> None:
+        """
+        Args:
+            mode (str): One of "off", "record" or "replay".
+            har_file (Path): The HAR file to record to, or replay from.
+            url_pattern (str | None): A glob for the requests to record or replay (defaults to HAR_URL_PATTERN, or all requests).
+            ignored_params (list[str] | None): Query string and form parameters to ignore when matching requests
+                (defaults to HAR_IGNORED_PARAMS, a comma separated list, or "draw" and "_").
+            not_found (str | None): What to do with requests that are not in the recording when replaying, either "abort"
+                (so the run is fully offline) or "fallback" (to make the request as normal). Defaults to HAR_NOT_FOUND, or "abort".
+        """
+        if mode not in HAR_MODES:
+            raise HarReplayException(
+                f"Unknown HAR mode [{mode}], expected one of: {', '.join(HAR_MODES)}"
+            )
+        self.mode = mode
+        self.har_file = har_file
+        self.url_pattern = url_pattern or os.getenv("HAR_URL_PATTERN", DEFAULT_URL_PATTERN)
+        if ignored_params is None:
+            ignored_params = (
+                os.getenv("HAR_IGNORED_PARAMS").split(",")
+                if os.getenv("HAR_IGNORED_PARAMS")
+                else DEFAULT_IGNORED_PARAMS
+            )
+        self.ignored_params = {param.strip() for param in ignored_params}
+        self.not_found = not_found or os.getenv("HAR_NOT_FOUND", "abort")
+        self.entries: list[dict] = []
+        self.recorded: dict[str, list[dict]] = {}
+        self.stats = {"recorded": 0, "replayed": 0, "not_found": 0}
+
+    @classmethod
+    def for_test(cls, mode: str, nodeid: str, har_dir: Path | None = None) -> "HarReplay":
+        """
+        Returns a HarReplay using a HAR file named after the test provided.
+
+        Args:
+            mode (str): One of "off", "record" or "replay".
+            nodeid (str): The pytest node ID of the test.
+            har_dir (Path | None): The directory to keep HAR files in (defaults to HAR_DIR, or test-results/har).
+
+        Returns:
+            HarReplay: The HarReplay for the test.
+        """
+        har_dir = har_dir or Path(os.getenv("HAR_DIR", HAR_DIR))
+        file_name = re.sub(r"[^A-Za-z0-9.]+", "_", nodeid).strip("_")
+        return cls(mode, har_dir / f"{file_name}.har")
+
+    def attach(self, context: BrowserContext) -> None:
+        """
+        Starts recording or replaying the requests made by the context provided (does nothing if the mode is "off").
+
+        Args:
+            context (playwright.sync_api.BrowserContext): The context to record or replay requests for.
+        """
+        if self.mode == "record":
+            context.route(self.url_pattern, self._record)
+        elif self.mode == "replay":
+            if not self.recorded:
+                self.load()
+            context.route(self.url_pattern, self._replay)
+
+    def load(self) -> None:
+        """
+        Reads the recorded responses from the HAR file, ready to be replayed.
+        """
+        if not self.har_file.is_file():
+            raise HarReplayException(
+                f"No recording found at {self.har_file}, run with har_mode=record first"
+            )
+        har = json.loads(self.har_file.read_text())
+        self.recorded = {}
+        for entry in har["log"]["entries"]:
+            request = entry["request"]
+            key = self.request_key(
+                request["method"], request["url"], request.get("postData", {}).get("text")
+            )
+            self.recorded.setdefault(key, []).append(entry["response"])
+
+    def save(self) -> None:
+        """
+        Writes the recorded requests to the HAR file (does nothing if not recording).
+        """
+        if self.mode != "record":
+            return
+        self.har_file.parent.mkdir(parents=True, exist_ok=True)
+        har = {
+            "log": {
+                "version": "1.2",
+                "creator": {"name": "HarReplay", "version": "1.0"},
+                "entries": self.entries,
+            }
+        }
+        self.har_file.write_text(json.dumps(har, indent=1))
+        logger.info(f"Recorded {len(self.entries)} requests to {self.har_file}")
+
+    def request_key(self, method: str, url: str, post_data: str | None) -> str:
+        """
+        Returns the key used to match a request to a recorded response, made up of the method, the URL and the body,
+        with any ignored or sensitive parameters removed and the remaining parameters in a consistent order.
+
+        Args:
+            method (str): The request method.
+            url (str): The request URL.
+            post_data (str | None): The request body.
+
+        Returns:
+            str: The key for the request.
+        """
+        return f"{method.upper()} {self._normalise_url(url)} {self._normalise_body(post_data)}".rstrip()
+
+    def summary(self) -> str:
+        if self.mode == "record":
+            return f"{self.stats['recorded']} requests recorded"
+        return f"{self.stats['replayed']} requests replayed, {self.stats['not_found']} not found in the recording"
+
+    def _record(self, route: Route) -> None:
+        request = route.request
+        started = datetime.now(timezone.utc)
+        start_time = time.perf_counter()
+        response = route.fetch()
+        body = response.body()
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() in RECORDED_RESPONSE_HEADERS
+        }
+        content_type = headers.get("content-type", "")
+        content = {"size": len(body), "mimeType": content_type}
+        if any(text_type in content_type for text_type in TEXT_CONTENT_TYPES):
+            content["text"] = body.decode("utf-8", errors="replace")
+        else:
+            content["text"] = base64.b64encode(body).decode()
+            content["encoding"] = "base64"
+
+        # The URL and body are stored as they are matched, so sensitive parameters are never written to the recording.
+        # Request headers and cookies are left empty for the same reason.
+        url = self._normalise_url(request.url)
+        post_data = self._normalise_body(request.post_data)
+        entry = {
+            "startedDateTime": started.isoformat(),
+            "time": elapsed_ms,
+            "request": {
+                "method": request.method,
+                "url": url,
+                "httpVersion": "HTTP/1.1",
+                "cookies": [],
+                "headers": [],
+                "queryString": [
+                    {"name": name, "value": value}
+                    for name, value in parse_qsl(urlsplit(url).query, keep_blank_values=True)
+                ],
+                "headersSize": -1,
+                "bodySize": len(post_data.encode()) if post_data else 0,
+            },
+            "response": {
+                "status": response.status,
+                "statusText": response.status_text,
+                "httpVersion": "HTTP/1.1",
+                "cookies": [],
+                "headers": [{"name": name, "value": value} for name, value in headers.items()],
+                "content": content,
+                "redirectURL": headers.get("location", ""),
+                "headersSize": -1,
+                "bodySize": len(body),
+            },
+            "cache": {},
+            # Only the total time is known, as the request is made through route.fetch()
+            "timings": {"send": 0, "wait": elapsed_ms, "receive": 0},
+        }
+        if post_data:
+            entry["request"]["postData"] = {
+                "mimeType": request.headers.get("content-type", ""),
+                "text": post_data,
+            }
+        self.entries.append(entry)
+        self.stats["recorded"] += 1
+        route.fulfill(response=response, body=body)
+
+    def _replay(self, route: Route) -> None:
+        request = route.request
+        key = self.request_key(request.method, request.url, request.post_data)
+        responses = self.recorded.get(key)
+        if not responses:
+            self.stats["not_found"] += 1
+            logger.debug(f"Not found in recording: {key}")
+            if self.not_found == "fallback":
+                route.fallback()
+            else:
+                route.abort("internetdisconnected")
+            return
+
+        # Identical requests are replayed in the order they were recorded, with the last response repeated after that
+        response = responses.pop(0) if len(responses) > 1 else responses[0]
+        content = response["content"]
+        body = (
+            base64.b64decode(content["text"])
+            if content.get("encoding") == "base64"
+            else content.get("text", "").encode()
+        )
+        self.stats["replayed"] += 1
+        route.fulfill(
+            status=response["status"],
+            headers={header["name"]: header["value"] for header in response["headers"]},
+            body=body,
+        )
+
+    def _normalise_url(self, url: str) -> str:
+        parts = urlsplit(url)
+        return urlunsplit(
+            (parts.scheme, parts.netloc, parts.path, self._normalise_params(parts.query), "")
+        )
+
+    def _normalise_params(self, query: str) -> str:
+        params = [
+            (name, value)
+            for name, value in parse_qsl(query, keep_blank_values=True)
+            if name not in self.ignored_params and not SENSITIVE_PARAM_PATTERN.search(name)
+        ]
+        return urlencode(sorted(params))
+
+    def _normalise_body(self, post_data: str | None) -> str:
+        if not post_data:
+            return ""
+        try:
+            body = json.loads(post_data)
+        except ValueError:
+            # Treat anything that is not JSON as a form body
+            return self._normalise_params(post_data)
+        if isinstance(body, dict):
+            body = {
+                name: value
+                for name, value in body.items()
+                if name not in self.ignored_params and not SENSITIVE_PARAM_PATTERN.search(name)
+            }
+        return json.dumps(body, sort_keys=True)
+
+
+class HarReplayException(Exception):
+    pass
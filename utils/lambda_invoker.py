@@ -0,0 +1,324 @@
+import importlib
+import json
+import logging
+import os
+import time
+import urllib.request
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from utils.db_util import DbUtil
+
+logger = logging.getLogger(__name__)
+
+AWS_PROFILE = "bs-select-rw-user-730319765130"
+AWS_REGION = "eu-west-2"
+# The invocation URL used by the AWS Lambda Runtime Interface Emulator, which serves a single function
+LOCAL_INVOCATION_PATH = "/2015-03-31/functions/function/invocations"
+STUB_RESPONSES_FILE = (
+    Path(os.getcwd()) / "tests" / "ui" / "cohort_manager" / "resources" / "cohort_manager_stub_responses.json"
+)
+# The pi_changes column each participant field returned by the cohort manager is written to
+PI_CHANGES_COLUMNS = {
+    "nhs_number": "nhs_number",
+    "superseded_by_nhs_number": "superseded_by_nhs_number",
+    "name_prefix": "name_prefix",
+    "given_name": "first_name",
+    "other_given_names": "other_names",
+    "family_name": "family_name",
+    "previous_family_name": "previous_family_name",
+    "birth_date": "date_of_birth",
+    "death_date": "date_of_death",
+    "gender_code": "gender_code",
+    "address_line_1": "address_line_1",
+    "address_line_2": "address_line_2",
+    "address_line_3": "address_line_3",
+    "address_line_4": "address_line_4",
+    "address_line_5": "address_line_5",
+    "postcode": "postcode",
+    "primary_care_provider": "gp_practice_code",
+    "reason_for_removal": "nhais_deduction_reason",
+    "reason_removal_eff_from_date": "nhais_deduction_date",
+    "telephone_number_home": "telephone_number_home",
+    "telephone_number_mobile": "telephone_number_mobile",
+    "email_address_home": "email_address_home",
+    "preferred_language": "preferred_language",
+    "interpreter_required": "interpreter_required",
+    "usual_address_eff_from_date": "usual_address_eff_from_date",
+    "telephone_number_home_eff_from_date": "tel_number_home_eff_from_date",
+    "telephone_number_mobile_eff_from_date": "tel_number_mob_eff_from_date",
+    "email_address_home_eff_from_date": "email_addr_home_eff_from_date",
+}
+# Participant fields sent by the cohort manager as YYYYMMDD strings
+DATE_FIELDS = {
+    "birth_date",
+    "death_date",
+    "reason_removal_eff_from_date",
+    "usual_address_eff_from_date",
+    "telephone_number_home_eff_from_date",
+    "telephone_number_mobile_eff_from_date",
+    "email_address_home_eff_from_date",
+}
+
+
+class LambdaInvoker(ABC):
+    """
+    Invokes a Lambda function and returns its response. Use LambdaInvoker.from_env() to get the invoker
+    for the backend selected using the LAMBDA_BACKEND environment variable.
+    """
+
+    def invoke(self, function_name: str, payload: dict) -> dict:
+        """
+        Invokes the Lambda function synchronously.
+
+        Args:
+            function_name (str): The name of the function to invoke.
+            payload (dict): The event to pass to the function.
+
+        Returns:
+            dict: The response payload returned by the function.
+        """
+        start_time = time.perf_counter()
+        response = self._invoke(function_name, payload)
+        logger.info(
+            f"Invoked {function_name} via {self.__class__.__name__} in {time.perf_counter() - start_time:.2f}s"
+        )
+        return response
+
+    def message_inserted(self, message_id: str) -> None:
+        """
+        Tells the invoker that a message has been queued for the function to process (e.g. a pi_changes row inserted).
+        Deployed and local functions read their messages from the database themselves, so by default this does nothing.
+
+        Args:
+            message_id (str): The ID of the message inserted.
+        """
+
+    @abstractmethod
+    def _invoke(self, function_name: str, payload: dict) -> dict:
+        pass
+
+    @staticmethod
+    def from_env() -> "LambdaInvoker":
+        """
+        Returns the invoker for the backend set in LAMBDA_BACKEND:
+        - "aws" (default): invokes the deployed function using boto3.
+        - "local": invokes a containerised function via the Runtime Interface Emulator at LAMBDA_LOCAL_URL.
+        - "inprocess": calls the handler set in LAMBDA_LOCAL_HANDLER (as "module:function") directly.
+        - "stub": stands in for the cohort manager Lambda using the responses in LAMBDA_STUB_RESPONSES, writing the
+          participants to pi_changes in the ci-infra database (set using the CI_INFRA_DB_* variables).
+
+        Returns:
+            LambdaInvoker: The invoker for the selected backend.
+        """
+        backend = os.getenv("LAMBDA_BACKEND", "aws").lower()
+        if backend == "aws":
+            return AwsLambdaInvoker()
+        if backend == "local":
+            return LocalLambdaInvoker(os.getenv("LAMBDA_LOCAL_URL", "http://localhost:9000"))
+        if backend == "inprocess":
+            handler_path = os.getenv("LAMBDA_LOCAL_HANDLER")
+            if not handler_path:
+                raise LambdaInvokerException(
+                    "LAMBDA_LOCAL_HANDLER must be set (as module:function) to use the inprocess backend"
+                )
+            return InProcessLambdaInvoker.from_path(handler_path)
+        if backend == "stub":
+            return CohortManagerStubInvoker.from_file(
+                Path(os.getenv("LAMBDA_STUB_RESPONSES", STUB_RESPONSES_FILE)),
+                lambda: DbUtil(
+                    host=os.getenv("CI_INFRA_DB_HOST"),
+                    port=os.getenv("CI_INFRA_DB_PORT"),
+                    dbname=os.getenv("CI_INFRA_DBNAME"),
+                    user=os.getenv("CI_INFRA_DB_USER"),
+                    password=os.getenv("CI_INFRA_DB_PASSWORD"),
+                ),
+            )
+        raise LambdaInvokerException(f"Unknown LAMBDA_BACKEND: {backend}")
+
+
+class AwsLambdaInvoker(LambdaInvoker):
+    """
+    Invokes a deployed Lambda function using boto3.
+    """
+
+    def __init__(self, profile_name: str = AWS_PROFILE, region: str = AWS_REGION) -> None:
+        self.profile_name = profile_name
+        self.region = region
+        self.client = None
+
+    def _invoke(self, function_name: str, payload: dict) -> dict:
+        if self.client is None:
+            # boto3 is only needed (and the client only created) when invoking the deployed function
+            import boto3
+
+            session = boto3.Session(profile_name=self.profile_name)
+            self.client = session.client("lambda", region_name=self.region)
+        response = self.client.invoke(
+            FunctionName=function_name,
+            InvocationType="RequestResponse",
+            Payload=json.dumps(payload),
+        )
+        return json.loads(response["Payload"].read())
+
+
+class LocalLambdaInvoker(LambdaInvoker):
+    """
+    Invokes a Lambda function running locally in a container, using the AWS Lambda Runtime Interface Emulator
+    (e.g. a container image started with "docker run -p 9000:8080 <image>").
+    """
+
+    def __init__(self, base_url: str) -> None:
+        self.url = base_url.rstrip("/") + LOCAL_INVOCATION_PATH
+
+    def _invoke(self, function_name: str, payload: dict) -> dict:
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+
+
+class InProcessLambdaInvoker(LambdaInvoker):
+    """
+    Invokes a Lambda handler function directly, in the same process.
+    """
+
+    def __init__(self, handler: Callable[[dict, object], dict]) -> None:
+        self.handler = handler
+
+    @staticmethod
+    def from_path(handler_path: str) -> "InProcessLambdaInvoker":
+        """
+        Creates an invoker for a handler given as "module:function" (e.g. "cohort_stub.handler:lambda_handler").
+
+        Args:
+            handler_path (str): The module and function name of the handler.
+
+        Returns:
+            InProcessLambdaInvoker: The invoker for the handler.
+        """
+        module_name, _, function_name = handler_path.partition(":")
+        if not function_name:
+            raise LambdaInvokerException(
+                f"Lambda handler must be given as module:function, not {handler_path}"
+            )
+        return InProcessLambdaInvoker(
+            getattr(importlib.import_module(module_name), function_name)
+        )
+
+    def _invoke(self, function_name: str, payload: dict) -> dict:
+        context = SimpleNamespace(
+            function_name=function_name, aws_request_id=str(uuid.uuid4())
+        )
+        # Round trip the event and response through JSON, as they would be when invoked via AWS
+        response = self.handler(json.loads(json.dumps(payload)), context)
+        return json.loads(json.dumps(response))
+
+
+class CohortManagerStubInvoker(LambdaInvoker):
+    """
+    Stands in for the cohort manager integration Lambda, without AWS or the cohort manager. For each message ID, the
+    responses hold either the participants the cohort manager stub returns for it, or the error the Lambda reports.
+    Message IDs are submitted as their pi_changes rows are inserted, and the next invocation writes the participants
+    for every message submitted since the last one to pi_changes (as the real Lambda does), ready for BS-Select to
+    process them.
+    """
+
+    def __init__(self, responses: dict[str, dict], connect: Callable[[], DbUtil]) -> None:
+        """
+        Args:
+            responses (dict[str, dict]): The response for each message ID, either {"request_id": ..., "participants": [...]}
+                or {"status": "error", "message": ...}.
+            connect (Callable[[], DbUtil]): Opens a connection to the database to write pi_changes rows to.
+        """
+        self.responses = responses
+        self.connect = connect
+        self.pending: list[str] = []
+
+    @staticmethod
+    def from_file(
+        responses_file: Path, connect: Callable[[], DbUtil]
+    ) -> "CohortManagerStubInvoker":
+        """
+        Creates an invoker using the responses in a JSON file, keyed by message ID.
+
+        Args:
+            responses_file (Path): The JSON file of responses.
+            connect (Callable[[], DbUtil]): Opens a connection to the database to write pi_changes rows to.
+
+        Returns:
+            CohortManagerStubInvoker: The invoker.
+        """
+        return CohortManagerStubInvoker(json.loads(responses_file.read_text()), connect)
+
+    def message_inserted(self, message_id: str) -> None:
+        """
+        Adds a message ID to be processed by the next invocation.
+
+        Args:
+            message_id (str): The message ID of the pi_changes row inserted.
+
+        Raises:
+            LambdaInvokerException: If there is no response for the message ID.
+        """
+        if message_id not in self.responses:
+            raise LambdaInvokerException(f"No stub response for message ID {message_id}")
+        self.pending.append(message_id)
+
+    def _invoke(self, function_name: str, payload: dict) -> dict:
+        responses = [self.responses[message_id] for message_id in self.pending]
+        self.pending = []
+        # The Lambda stops at the first error, otherwise it writes the participants for every message
+        for response in responses:
+            if response.get("status") == "error":
+                return dict(response)
+        rows = [
+            self.pi_changes_row(response["request_id"], participant)
+            for response in responses
+            for participant in response["participants"]
+        ]
+        if rows:
+            db = self.connect()
+            try:
+                db.bulk_load("pi_changes", rows)
+            finally:
+                db.close()
+        return {"status": "success", "inserted": len(rows)}
+
+    @staticmethod
+    def pi_changes_row(request_id: str, participant: dict) -> dict:
+        """
+        Converts a participant returned by the cohort manager into a pi_changes row, as the Lambda does.
+        Blank fields are written as NULL, and dates are converted from YYYYMMDD.
+
+        Args:
+            request_id (str): The request ID the cohort manager returned the participant for.
+            participant (dict): The participant's fields, as returned by the cohort manager.
+
+        Returns:
+            dict: The pi_changes row, keyed by column name.
+        """
+        row = {
+            "inserted_date_time": datetime.now(timezone.utc),
+            "message_id": request_id,
+        }
+        for field, column in PI_CHANGES_COLUMNS.items():
+            value = participant.get(field)
+            if value == "":
+                value = None
+            elif value is not None and field in DATE_FIELDS:
+                value = datetime.strptime(value, "%Y%m%d").date()
+            elif value is not None and field == "interpreter_required":
+                value = bool(int(value))
+            row[column] = value
+        return row
+
+
+class LambdaInvokerException(Exception):
+    pass
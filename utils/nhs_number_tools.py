@@ -42,6 +42,44 @@ class NHSNumberTools:
 
         return f"{formatted_nhs_number[:3]} {formatted_nhs_number[3:6]} {formatted_nhs_number[6:]}"
 
+    @staticmethod
+    def calculate_check_digit(first_nine_digits: int | str) -> int | None:
+        """
+        This will calculate the check digit for the first nine digits of an NHS number (using the modulus 11 algorithm).
+
+        Args:
+            first_nine_digits (int | str): The first nine digits of the NHS number.
+
+        Returns:
+            int | None: The check digit, or None if there is no valid NHS number starting with these digits.
+        """
+        digits = str(first_nine_digits).zfill(9)
+        total = sum(int(digit) * (10 - position) for position, digit in enumerate(digits))
+        check_digit = 11 - (total % 11)
+        if check_digit == 11:
+            return 0
+        if check_digit == 10:
+            return None
+        return check_digit
+
+    @staticmethod
+    def is_valid_nhs_number(nhs_number: int | str) -> bool:
+        """
+        This will check whether the provided NHS number is 10 digits long and has a valid check digit.
+
+        Args:
+            nhs_number (int | str): The NHS number to check.
+
+        Returns:
+            bool: True if the NHS number is valid.
+        """
+        formatted_nhs_number = str(nhs_number).replace(" ", "")
+        if not formatted_nhs_number.isnumeric() or len(formatted_nhs_number) != 10:
+            return False
+        return NHSNumberTools.calculate_check_digit(formatted_nhs_number[:9]) == int(
+            formatted_nhs_number[9]
+        )
+
 
 class NHSNumberToolsException(Exception):
     pass
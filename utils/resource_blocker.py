@@ -0,0 +1,195 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+from playwright.sync_api import BrowserContext, Request, Route
+
+logger = logging.getLogger(__name__)
+
+STATIC_ASSET_CACHE_DIR = Path(os.getcwd()) / "test-results" / ".static_assets"
+DEFAULT_STATIC_ASSET_TTL_SECONDS = 3600
+ANALYTICS_HOSTS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "eum.instana.io",
+]
+
+# abort: resource types that are never requested, cache: resource types served from the static asset cache,
+# abort_hosts: hosts (and their subdomains) whose requests are always aborted
+RESOURCE_BLOCKING_PROFILES = {
+    "off": None,
+    "assets": {
+        "abort": {"image", "font", "media"},
+        "cache": {"script", "stylesheet"},
+        "abort_hosts": [],
+    },
+    "strict": {
+        "abort": {"image", "font", "media", "texttrack", "manifest", "beacon"},
+        "cache": {"script", "stylesheet"},
+        "abort_hosts": ANALYTICS_HOSTS,
+    },
+}
+
+
+class StaticAssetCache:
+    """
+    An on-disk cache of static assets (e.g. JS and CSS bundles), shared between every context and xdist worker
+    in a run, so each asset is only downloaded once within the TTL.
+    """
+
+    def __init__(
+        self, cache_dir: Path = STATIC_ASSET_CACHE_DIR, ttl_seconds: float | None = None
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.ttl_seconds = (
+            ttl_seconds
+            if ttl_seconds is not None
+            else float(os.getenv("STATIC_ASSET_CACHE_TTL", DEFAULT_STATIC_ASSET_TTL_SECONDS))
+        )
+
+    def cache_files(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.cache_dir / f"{key}.body", self.cache_dir / f"{key}.json"
+
+    def load(self, url: str) -> tuple[dict, bytes] | None:
+        """
+        Returns the cached response for the URL, or None if there is none within the TTL.
+
+        Args:
+            url (str): The URL of the asset.
+
+        Returns:
+            tuple[dict, bytes] | None: The cached response headers and body.
+        """
+        body_file, meta_file = self.cache_files(url)
+        try:
+            meta = json.loads(meta_file.read_text())
+            if time.time() - meta["retrieved"] > self.ttl_seconds:
+                return None
+            return meta["headers"], body_file.read_bytes()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def save(self, url: str, headers: dict, body: bytes) -> None:
+        """
+        Caches a response for the URL.
+
+        Args:
+            url (str): The URL of the asset.
+            headers (dict): The response headers to replay.
+            body (bytes): The response body.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        body_file, meta_file = self.cache_files(url)
+        # Write to temporary files first, so other workers never read a partially written asset.
+        # The metadata is written last, so the body is always in place when the metadata is found.
+        for cache_file, content in (
+            (body_file, body),
+            (meta_file, json.dumps({"retrieved": time.time(), "url": url, "headers": headers}).encode()),
+        ):
+            temp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            temp_file.write_bytes(content)
+            temp_file.replace(cache_file)
+
+
+class ResourceBlocker:
+    """
+    Intercepts the requests made by a browser context, aborting the resource types the profile does not need
+    and serving static assets from a StaticAssetCache, whilst counting the requests saved and the bytes served from the cache.
+    Aborted requests are never made, so their size is unknown and is not counted in the bytes.
+    """
+
+    def __init__(self, profile: str, cache: StaticAssetCache | None = None) -> None:
+        if profile not in RESOURCE_BLOCKING_PROFILES:
+            raise ResourceBlockerException(
+                f"Unknown resource blocking profile [{profile}], expected one of: {', '.join(RESOURCE_BLOCKING_PROFILES)}"
+            )
+        self.profile = profile
+        self.rules = RESOURCE_BLOCKING_PROFILES[profile]
+        self.cache = cache or StaticAssetCache()
+        self.stats = {
+            "requests_aborted": 0,
+            "requests_cached": 0,
+            "bytes_served_from_cache": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.rules is not None
+
+    def attach(self, context: BrowserContext) -> None:
+        """
+        Starts intercepting the requests made by the context provided (does nothing if the profile is "off").
+
+        Args:
+            context (playwright.sync_api.BrowserContext): The context to intercept requests for.
+        """
+        if self.enabled:
+            context.route("**/*", self.handle)
+
+    def handle(self, route: Route) -> None:
+        """
+        Handles an intercepted request, aborting, serving from the cache or continuing it as the profile requires.
+
+        Args:
+            route (playwright.sync_api.Route): The intercepted request.
+        """
+        request = route.request
+        if self.should_abort(request):
+            self.stats["requests_aborted"] += 1
+            route.abort("blockedbyclient")
+            return
+
+        if request.method != "GET" or request.resource_type not in self.rules["cache"]:
+            route.fallback()
+            return
+
+        cached = self.cache.load(request.url)
+        if cached is not None:
+            headers, body = cached
+            self.stats["requests_cached"] += 1
+            self.stats["bytes_served_from_cache"] += len(body)
+            route.fulfill(status=200, headers=headers, body=body)
+            return
+
+        response = route.fetch()
+        if response.status == 200:
+            headers = {
+                name: value
+                for name, value in response.headers.items()
+                if name.lower() in ("content-type", "cache-control", "etag", "last-modified")
+            }
+            self.cache.save(request.url, headers, response.body())
+        route.fulfill(response=response)
+
+    def should_abort(self, request: Request) -> bool:
+        """
+        Checks if the profile aborts the request provided, either by its resource type or its host.
+
+        Args:
+            request (playwright.sync_api.Request): The request to check.
+
+        Returns:
+            bool: True if the request should be aborted.
+        """
+        if request.resource_type in self.rules["abort"]:
+            return True
+        host = urlsplit(request.url).hostname or ""
+        return any(
+            host == blocked or host.endswith(f".{blocked}")
+            for blocked in self.rules["abort_hosts"]
+        )
+
+    def summary(self) -> str:
+        return (
+            f"{self.stats['requests_aborted']} requests aborted, {self.stats['requests_cached']} requests "
+            f"({self.stats['bytes_served_from_cache']} bytes) served from the static asset cache"
+        )
+
+
+class ResourceBlockerException(Exception):
+    pass
@@ -1,7 +1,11 @@
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
-from db_restore import DbRestore
+
+# Allow this to be run as a script (python utils/run_db_restore.py), whilst importing from the utils package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils.db_restore import DbRestore
 import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
@@ -9,6 +13,12 @@ LOCAL_ENV_PATH = Path(os.getcwd()) / "local.env"
 logging.info(f"Checking for local.env file at: {LOCAL_ENV_PATH}")
 if Path.is_file(LOCAL_ENV_PATH):
     load_dotenv(LOCAL_ENV_PATH, override=False)
-    DbRestore().full_db_restore()
+    snapshot = os.getenv("DB_RESTORE_SNAPSHOT", "false").lower() == "true"
+    if os.getenv("DB_RESTORE_SELECTIVE", "false").lower() == "true":
+        DbRestore().selective_db_restore(snapshot=snapshot)
+    elif snapshot:
+        DbRestore().snapshot_db_restore()
+    else:
+        DbRestore().full_db_restore()
 else:
     logging.info("No local.env file found. Skipping database restore.")
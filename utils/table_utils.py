@@ -1,10 +1,52 @@
 import logging
+from collections.abc import Callable
 from datetime import datetime
 from secrets import randbelow
 from playwright.sync_api import Page, expect, Locator
 
 logger = logging.getLogger(__name__)
 
+# Reads the header row and every visible body row of a table in a single call to the browser
+TABLE_EXTRACT_SCRIPT = """
+table => {
+    const headerRow = table.querySelector(":scope > thead tr");
+    const headers = headerRow ? Array.from(headerRow.cells, cell => cell.innerText) : [];
+    const rows = Array.from(
+        table.querySelectorAll(":scope > tbody tr"),
+        row => Array.from(row.cells, cell => cell.innerText)
+    );
+    return { headers, rows };
+}
+"""
+
+# Marks the table (or its wrapper) as waiting for a redraw, listening for the DataTables draw event if jQuery is
+# available, otherwise recording the current "Showing X to Y of Z entries" text so a change to it can be detected
+REDRAW_LISTENER_SCRIPT = """
+table => {
+    table.dataset.bssRedrawn = "false";
+    if (window.jQuery) {
+        window.jQuery(table).one("draw.dt", () => { table.dataset.bssRedrawn = "true"; });
+    } else {
+        const info = table.querySelector(".dataTables_info") || document.getElementById(table.id + "_info");
+        table.dataset.bssInfo = info ? info.innerText : "";
+    }
+}
+"""
+
+REDRAW_COMPLETE_SCRIPT = """
+table => {
+    if (table.dataset.bssRedrawn === "true") {
+        return true;
+    }
+    if (window.jQuery) {
+        return false;
+    }
+    const info = table.querySelector(".dataTables_info") || document.getElementById(table.id + "_info");
+    return info !== null && info.innerText !== table.dataset.bssInfo;
+}
+"""
+REDRAW_TIMEOUT = 10000
+
 
 class TableUtils:
     """
@@ -125,11 +167,54 @@ class TableUtils:
         Returns:
             A dict object with keys representing the rows, with values being a dict representing a header key / column value pair.
         """
+        table_data = self._extract_table()
         full_results = {}
-        for row in range(self.get_row_count()):
-            full_results[row + 1] = self.get_row_data_with_headers(row)
+        for row_number, row in enumerate(table_data["rows"], start=1):
+            full_results[row_number] = self._row_with_headers(table_data["headers"], row)
         return full_results
 
+    def get_table_columns(self) -> dict:
+        """
+        This returns the visible table in a columnar format, reading the headers and all cells in a single call to the browser.
+
+        Returns:
+            A dict object with keys representing the headers, and values being a list of that column's contents for each visible row.
+        """
+        table_data = self._extract_table()
+        columns = {header: [] for header in table_data["headers"]}
+        for row in table_data["rows"]:
+            for header, value in self._row_with_headers(table_data["headers"], row).items():
+                columns[header].append(value)
+        return columns
+
+    def _row_with_headers(self, headers: list, row: list) -> dict:
+        """
+        This pairs the cells of a row with the headers, in the same way as get_row_data_with_headers.
+
+        Args:
+            headers (list): The header text, in column order.
+            row (list): The cell text of the row, in column order.
+
+        Returns:
+            A dict object with keys representing the headers, and values representing the row contents.
+        """
+        row_data = dict(enumerate(row, start=1))
+        results = {}
+
+        for key, header in enumerate(headers, start=1):
+            results[header] = row_data[key]
+
+        return results
+
+    def _extract_table(self) -> dict:
+        """
+        This reads the header row and every visible body row of the table in a single evaluate call.
+
+        Returns:
+            A dict with "headers" (a list of the header text) and "rows" (a list of lists of cell text for each row).
+        """
+        return self.page.locator(self.table_id).first.evaluate(TABLE_EXTRACT_SCRIPT)
+
     def wait_for_table_to_populate(self) -> None:
         """
         This checks that the following phrases are no longer present in the body of the table:
@@ -156,8 +241,7 @@ class TableUtils:
             next_button = self.page.locator(f'{self.table_id} li.paginate_button.next')
             is_disabled = "disabled" in next_button.get_attribute("class").split()
             if next_button.count() > 0 and not is_disabled:
-                next_button.locator('a').click()
-                self.page.wait_for_timeout(1500)  # Wait for page load
+                self.perform_and_wait_for_redraw(next_button.locator('a').click)
             else:
                 break
 
@@ -179,8 +263,9 @@ class TableUtils:
         first_page = self.page.locator(f'{self.table_id} li.paginate_button a[data-dt-idx="1"]').first
         first_page.wait_for()
         if first_page.count() > 0:
-            first_page.click()
-            self.page.wait_for_timeout(1000)
+            # DataTables does not redraw when the current page is clicked again
+            if "active" not in (first_page.locator("xpath=..").get_attribute("class") or "").split():
+                self.perform_and_wait_for_redraw(first_page.click)
         else:
             # Keep clicking Previous until disabled
             while True:
@@ -188,8 +273,7 @@ class TableUtils:
                 is_disabled = "disabled" in prev_button.get_attribute("class").split()
                 if prev_button.count() > 0 and not is_disabled:
                     prev_button.wait_for()
-                    prev_button.click()
-                    self.page.wait_for_timeout(1000)
+                    self.perform_and_wait_for_redraw(prev_button.click)
                 else:
                     break
 
@@ -197,9 +281,25 @@ class TableUtils:
         """Set number of entries per page"""
         dropdown = self.page.locator(f'{self.table_id} .dataTables_length select').first
         dropdown.wait_for()
-        if dropdown.count() > 0:
-            dropdown.select_option(str(entries))
-            self.page.wait_for_timeout(1500)
+        if dropdown.count() > 0 and dropdown.input_value() != str(entries):
+            self.perform_and_wait_for_redraw(lambda: dropdown.select_option(str(entries)))
+
+    def perform_and_wait_for_redraw(self, action: Callable[[], None], timeout: float = REDRAW_TIMEOUT) -> None:
+        """
+        This performs the action provided and then waits for the table to redraw, either by listening for the
+        DataTables draw event or by waiting for the "Showing X to Y of Z entries" text to change.
+
+        Args:
+            action (Callable[[], None]): The action that causes the table to redraw (e.g. clicking a paging button).
+            timeout (float): The maximum time to wait for the redraw, in milliseconds.
+
+        Raises:
+            TimeoutError: If no redraw is detected within the timeout.
+        """
+        table = self.page.locator(self.table_id).first.element_handle()
+        table.evaluate(REDRAW_LISTENER_SCRIPT)
+        action()
+        self.page.wait_for_function(REDRAW_COMPLETE_SCRIPT, arg=table, timeout=timeout)
 
     def is_sorted(self, data, column_type, ascending=True, **kwargs) -> bool:
         """Check if data is sorted"""
@@ -1,14 +1,31 @@
 import json
 import os
 import logging
+import re
+import time
+from html.parser import HTMLParser
 from pathlib import Path
-from playwright.sync_api import Page
+from urllib.parse import urljoin
+from playwright.sync_api import (
+    APIRequestContext,
+    APIResponse,
+    Browser,
+    BrowserContext,
+    Page,
+    Playwright,
+)
 from pages.login.cognito_authentication import CognitoAuthenticationPage
 from pages.login.org_selection import OrgSelectionPage
 from pages.main_menu import MainMenuPage
 
 logger = logging.getLogger(__name__)
 USERS_FILE = Path(os.getcwd()) / "users.json"
+# Kept outside test-results/, which is uploaded as a CI artifact (and to Jira), as the saved state holds auth cookies
+AUTH_STATE_DIR = Path(os.getcwd()) / ".auth"
+CIS2_USERNAME_FIELD = "//input[@data-vv-as='User Name']"
+ORG_CHOICE_FIELD = "chosenOrgCode"
+# Options for the request contexts used to call the API (also used by ApiUtils for its concurrent requests)
+API_CONTEXT_OPTIONS = {"ignore_https_errors": True}
 
 
 class UserTools:
@@ -16,30 +33,48 @@ class UserTools:
     A utility class for retrieving and doing common actions with users.
     """
 
-    def user_login(self, page: Page, username: str) -> None:
+    def user_login(
+        self, page: Page, username: str, use_cached_session: bool = True
+    ) -> None:
         """
         Logs into the BS-Select application and selects the applicable org (if required).
+        If a session for this user has already been established during this run, the cached
+        session is reused instead of going through the login form again.
 
         Args:
             page (playwright.sync_api.Page): The Playwright page object to interact with.
             user (str): The user details required, in the format "Role Type" or "Role Type - Organisation".
+            use_cached_session (bool): If True, reuse a cached session for this user where one is available.
         """
-        page.goto("/bss")
         user = self.retrieve_user(username)
 
+        if use_cached_session and USER_SESSION_CACHE.restore(page.context, username):
+            page.goto("/bss")
+            if not USER_SESSION_CACHE.is_login_page(page):
+                logger.info(f"Reusing cached session for: {username}")
+                OrgSelectionPage(page).org_selection(user["role_to_select"])
+                return
+            logger.info(f"Cached session for [{username}] has expired, logging in again")
+            USER_SESSION_CACHE.invalidate(username)
+            page.context.clear_cookies()
+
+        page.goto("/bss")
         if "cognito" in page.url:
             CognitoAuthenticationPage(page).cognito_login(
                 user["username"], os.getenv("COGNITO_USER_PASSWORD")
             )
         else:
             # CIS2 Simple Realm
-            page.locator("//input[@data-vv-as='User Name']").fill(user["uuid"])
+            page.locator(CIS2_USERNAME_FIELD).fill(user["uuid"])
             page.locator("//input[@data-vv-as='Password']").fill(
                 os.getenv("USER_PASSWORD")
             )
             page.locator("//button[@class='nhsuk-button']").click()
         OrgSelectionPage(page).org_selection(user["role_to_select"])
 
+        if use_cached_session:
+            USER_SESSION_CACHE.save(page.context, username)
+
     def login_and_navigate(self, page: Page, user: str, main_menu: str, sub_menu: str):
         """
         Logs in as the specified user and navigates to a specific section of the app.
@@ -53,6 +88,142 @@ class UserTools:
         self.user_login(page, user)
         MainMenuPage(page).select_menu_option(main_menu, sub_menu)
 
+    def new_authenticated_context(
+        self, browser: Browser, username: str, use_cached_session: bool = True, **context_args
+    ) -> BrowserContext:
+        """
+        Creates a new browser context that is already logged in as the user provided.
+        The first call for a user logs in through the browser and caches the storage state,
+        with later calls creating the context directly from the cached state.
+
+        Args:
+            browser (playwright.sync_api.Browser): The browser to create the context from.
+            username (str): The user details required, using the record key from users.json.
+            use_cached_session (bool): If False, the context logs in with its own session (left on about:blank),
+                rather than sharing the cached session, so logging out elsewhere does not affect it.
+            **context_args: Any additional arguments to pass to browser.new_context() (e.g. base_url).
+
+        Returns:
+            playwright.sync_api.BrowserContext: A browser context authenticated as the user.
+        """
+        if not use_cached_session:
+            context = browser.new_context(**context_args)
+            try:
+                page = context.new_page()
+                self.user_login(page, username, use_cached_session=False)
+                page.goto("about:blank")
+            except Exception:
+                context.close()
+                raise
+            return context
+
+        state_file = USER_SESSION_CACHE.state_file_for(username)
+        if state_file is None:
+            login_context = browser.new_context(**context_args)
+            try:
+                self.user_login(login_context.new_page(), username)
+            finally:
+                login_context.close()
+            state_file = USER_SESSION_CACHE.state_file_for(username)
+
+        return browser.new_context(storage_state=state_file, **context_args)
+
+    def api_user_login(
+        self, playwright: Playwright, base_url: str, username: str
+    ) -> APIRequestContext:
+        """
+        Logs into the BS-Select application without a browser, by posting the Cognito / CIS2 login form
+        and the organisation selection form through a Playwright APIRequestContext.
+
+        Args:
+            playwright (playwright.sync_api.Playwright): The Playwright object to create the request context from.
+            base_url (str): The base URL of the BS-Select application.
+            username (str): The user details required, using the record key from users.json.
+
+        Returns:
+            playwright.sync_api.APIRequestContext: A request context holding the authenticated session.
+        """
+        user = self.retrieve_user(username)
+        request_context = playwright.request.new_context(
+            base_url=base_url, **API_CONTEXT_OPTIONS
+        )
+
+        response = request_context.get("/bss")
+        if "cognito" in response.url:
+            logger.info(f"Logging in (API) as: {user['username']}")
+            credentials = (user["username"], os.getenv("COGNITO_USER_PASSWORD"))
+        else:
+            # CIS2 Simple Realm
+            logger.info(f"Logging in (API) as: {user['uuid']}")
+            credentials = (user["uuid"], os.getenv("USER_PASSWORD"))
+        response = self._submit_login_form(request_context, response, *credentials)
+
+        if response.url.endswith("/bss/orgChoice"):
+            response = self._submit_org_choice_form(
+                request_context, response, user["role_to_select"]
+            )
+
+        if not response.ok or _LoginFormParser.parse(response.text()).login_form:
+            request_context.dispose()
+            raise UserToolsException(
+                f"Unable to log in as [{username}] via the API (status: {response.status}, url: {response.url})"
+            )
+        return request_context
+
+    @staticmethod
+    def _submit_login_form(
+        request_context: APIRequestContext,
+        response: APIResponse,
+        user_id: str,
+        password: str,
+    ) -> APIResponse:
+        """
+        Fills in and submits the login form found in the response provided.
+
+        Args:
+            request_context (playwright.sync_api.APIRequestContext): The request context to post the form with.
+            response (playwright.sync_api.APIResponse): The response containing the login form.
+            user_id (str): The value to enter into the username field.
+            password (str): The value to enter into the password field.
+
+        Returns:
+            playwright.sync_api.APIResponse: The response after submitting the form.
+        """
+        form = _LoginFormParser.parse(response.text()).login_form
+        if form is None or form.username_field() is None:
+            raise UserToolsException(f"No login form found at: {response.url}")
+
+        form_data = form.hidden_fields()
+        form_data[form.username_field()] = user_id
+        form_data[form.password_field()] = password
+        return request_context.post(urljoin(response.url, form.action), form=form_data)
+
+    @staticmethod
+    def _submit_org_choice_form(
+        request_context: APIRequestContext, response: APIResponse, role: str
+    ) -> APIResponse:
+        """
+        Selects the role provided on the organisation selection form found in the response provided.
+
+        Args:
+            request_context (playwright.sync_api.APIRequestContext): The request context to post the form with.
+            response (playwright.sync_api.APIResponse): The response containing the /bss/orgChoice form.
+            role (str): The organisation role to select.
+
+        Returns:
+            playwright.sync_api.APIResponse: The response after submitting the form.
+        """
+        form = _LoginFormParser.parse(response.text()).form_with_field(ORG_CHOICE_FIELD)
+        if form is None:
+            raise UserToolsException(f"No organisation form found at: {response.url}")
+        if role not in form.select_options.get(ORG_CHOICE_FIELD, []):
+            raise AssertionError(f"Role '{role}' not found on /orgChoice screen.")
+
+        logger.info(f"Selecting role (API): {role}")
+        form_data = form.hidden_fields()
+        form_data[ORG_CHOICE_FIELD] = role
+        return request_context.post(urljoin(response.url, form.action), form=form_data)
+
     @staticmethod
     def retrieve_user(user: str) -> dict:
         """
@@ -74,5 +245,256 @@ class UserTools:
         return user_data[user]
 
 
+class UserSessionCache:
+    """
+    Caches the Playwright storage state for each user logged in during a run, so that
+    subsequent logins for the same user can reuse the existing session.
+
+    State files are written to a directory per xdist worker, and only state saved by the
+    current process is ever reused, so each run (or worker) logs in once per user.
+    """
+
+    def __init__(self, state_dir: Path = AUTH_STATE_DIR) -> None:
+        self.state_dir = state_dir / os.getenv("PYTEST_XDIST_WORKER", "main")
+        self._saved_sessions: dict[str, Path] = {}
+
+    def _state_file_path(self, username: str) -> Path:
+        """
+        Returns the path to the storage state file for the user provided.
+
+        Args:
+            username (str): The record key from users.json.
+
+        Returns:
+            Path: The path of the storage state file for this user.
+        """
+        file_name = re.sub(r"[^A-Za-z0-9]+", "_", username).strip("_").lower()
+        return self.state_dir / f"{file_name}.json"
+
+    def state_file_for(self, username: str) -> Path | None:
+        """
+        Returns the storage state file for the user, if a valid session has been cached during this run.
+
+        Args:
+            username (str): The record key from users.json.
+
+        Returns:
+            Path | None: The path to the storage state file, or None if no valid session is cached.
+        """
+        state_file = self._saved_sessions.get(username)
+        if state_file is None or not state_file.is_file():
+            return None
+
+        with open(state_file, "r") as file:
+            state = json.loads(file.read())
+        if self._has_expired_cookies(state):
+            logger.info(f"Cached session for [{username}] contains expired cookies")
+            self.invalidate(username)
+            return None
+
+        return state_file
+
+    def save(self, context: BrowserContext, username: str) -> Path:
+        """
+        Saves the storage state of the context provided against the user.
+
+        Args:
+            context (playwright.sync_api.BrowserContext): The authenticated context to save.
+            username (str): The record key from users.json.
+
+        Returns:
+            Path: The path to the storage state file written.
+        """
+        state_file = self._state_file_path(username)
+        state_file.parent.mkdir(parents=True, exist_ok=True)
+        context.storage_state(path=state_file)
+        self._saved_sessions[username] = state_file
+        logger.debug(f"Saved session for [{username}] to: {state_file}")
+        return state_file
+
+    def restore(self, context: BrowserContext, username: str) -> bool:
+        """
+        Adds the cached session cookies for the user to the context provided.
+
+        Args:
+            context (playwright.sync_api.BrowserContext): The context to add the cookies to.
+            username (str): The record key from users.json.
+
+        Returns:
+            bool: True if a cached session was applied to the context, otherwise False.
+        """
+        state_file = self.state_file_for(username)
+        if state_file is None:
+            return False
+
+        with open(state_file, "r") as file:
+            state = json.loads(file.read())
+        context.clear_cookies()
+        context.add_cookies(state["cookies"])
+        return True
+
+    def invalidate(self, username: str) -> None:
+        """
+        Removes any cached session for the user provided.
+
+        Args:
+            username (str): The record key from users.json.
+        """
+        state_file = self._saved_sessions.pop(username, None)
+        if state_file is not None:
+            state_file.unlink(missing_ok=True)
+
+    @staticmethod
+    def is_login_page(page: Page) -> bool:
+        """
+        Checks if the page provided has been redirected to either the Cognito or CIS2 login screen.
+
+        Args:
+            page (playwright.sync_api.Page): The page to check.
+
+        Returns:
+            bool: True if the page is showing a login screen, otherwise False.
+        """
+        return "cognito" in page.url or page.locator(CIS2_USERNAME_FIELD).count() > 0
+
+    @staticmethod
+    def _has_expired_cookies(state: dict) -> bool:
+        """
+        Checks if any cookie in the storage state provided has expired.
+        Session cookies (with an expiry of -1) are never considered expired.
+
+        Args:
+            state (dict): A Playwright storage state.
+
+        Returns:
+            bool: True if any cookie has expired, otherwise False.
+        """
+        now = time.time()
+        return any(
+            0 < cookie.get("expires", -1) <= now for cookie in state.get("cookies", [])
+        )
+
+
+USER_SESSION_CACHE = UserSessionCache()
+
+
+class _HtmlForm:
+    """
+    A representation of a HTML form, as read by _LoginFormParser.
+    """
+
+    def __init__(self, action: str) -> None:
+        self.action = action
+        self.inputs: list[dict] = []
+        self.select_options: dict[str, list[str]] = {}
+
+    def hidden_fields(self) -> dict:
+        """
+        Returns:
+            dict: The name / value pairs of all the hidden inputs on the form.
+        """
+        return {
+            field["name"]: field.get("value") or ""
+            for field in self.inputs
+            if field.get("type") == "hidden" and field.get("name")
+        }
+
+    def password_field(self) -> str:
+        """
+        Returns:
+            str: The name of the password input on the form.
+        """
+        return next(
+            field["name"] for field in self.inputs if field.get("type") == "password"
+        )
+
+    def username_field(self) -> str | None:
+        """
+        Returns:
+            str | None: The name of the username input on the form (or the first text input), if present.
+        """
+        for field in self.inputs:
+            if field.get("data-vv-as") == "User Name" or field.get("name") == "username":
+                return field["name"]
+        return next(
+            (
+                field["name"]
+                for field in self.inputs
+                if field.get("type", "text") in ("text", "email")
+            ),
+            None,
+        )
+
+
+class _LoginFormParser(HTMLParser):
+    """
+    A minimal HTML parser that reads the forms (and their inputs / select options) from a page.
+    """
+
+    def __init__(self) -> None:
+        HTMLParser.__init__(self)
+        self.forms: list[_HtmlForm] = []
+        self._current_select = None
+
+    @classmethod
+    def parse(cls, html: str) -> "_LoginFormParser":
+        parser = cls()
+        parser.feed(html)
+        return parser
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        attributes = dict(attrs)
+        if tag == "form":
+            self.forms.append(_HtmlForm(attributes.get("action") or ""))
+        elif not self.forms:
+            return
+        elif tag == "input" and attributes.get("name"):
+            self.forms[-1].inputs.append(attributes)
+        elif tag == "select":
+            self._current_select = attributes.get("name")
+            self.forms[-1].select_options[self._current_select] = []
+        elif tag == "option" and self._current_select is not None:
+            self.forms[-1].select_options[self._current_select].append(
+                attributes.get("value") or ""
+            )
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "select":
+            self._current_select = None
+
+    @property
+    def login_form(self) -> _HtmlForm | None:
+        """
+        Returns:
+            _HtmlForm | None: The first form containing a password input, if present.
+        """
+        return next(
+            (
+                form
+                for form in self.forms
+                if any(field.get("type") == "password" for field in form.inputs)
+            ),
+            None,
+        )
+
+    def form_with_field(self, field_name: str) -> _HtmlForm | None:
+        """
+        Args:
+            field_name (str): The name of the input or select to look for.
+
+        Returns:
+            _HtmlForm | None: The first form containing the field provided, if present.
+        """
+        return next(
+            (
+                form
+                for form in self.forms
+                if field_name in form.select_options
+                or any(field.get("name") == field_name for field in form.inputs)
+            ),
+            None,
+        )
+
+
 class UserToolsException(Exception):
     pass